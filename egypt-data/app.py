@@ -4,7 +4,12 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
-from data_utils import load_data, precompute_aggregations, filter_dataframe
+from data_utils import (
+    load_data, load_sample, filter_dataframe, facet_counts, facet_values, met_url, load_related, artist_table,
+    tag_matrix, tag_values, Tables, cached_tables, exact_tables, schedule_exact, warm_up, record_usage, prefetch,
+    DATE_MATCHES, DEFAULT_FILTERS, SAMPLE_RATE, HAS_SCIPY,
+)
+from profiling import start_trace, finish_trace, span, summarize, PROFILE_MEMORY
 
 # ---------------------------------------------------------------------------
 # Plotly availability
@@ -34,15 +39,67 @@ PAGES = [
     "Mediums",
     "Geography",
     "Art History",
+    "Tags",
     "Object Explorer",
 ]
 
 
+def plotly_chart(fig):
+    """Render a Plotly figure inside a timing span (serialization is a large share of render time)."""
+    with span("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def metric(col, label, estimate):
+    """st.metric for a Tables.total() result; estimates get a ~ and their interval."""
+    count, low, high = estimate
+    if low == high:
+        col.metric(label, f"{count:,}")
+    else:
+        col.metric(label, f"~{count:,}", help=f"95% interval {low:,} – {high:,}")
+
+
+def ci_caption(table):
+    """Caption under a chart drawn from an estimated count table (one with Low/High columns)."""
+    if "Low" not in table.columns or table.empty:
+        return
+    rel = ((table["High"] - table["Low"]) / 2 / table["Count"].clip(lower=1)).median()
+    st.caption(
+        f"≈ Estimated from a {SAMPLE_RATE:.0%} stratified sample (by department) — "
+        f"95% interval typically ±{rel:.0%} per value. Exact counts are computing in the background."
+    )
+
+
 # ---------------------------------------------------------------------------
 # Sidebar
 # ---------------------------------------------------------------------------
-def sidebar_filters(df):
-    """Render sidebar and return filters dict."""
+def _build_filters(values):
+    """Turn raw sidebar widget values into a filters dict for filter_dataframe."""
+    filters = {}
+
+    for key in ("department", "culture", "classification", "century", "tags"):
+        if values.get(key):
+            filters[key] = values[key]
+
+    for key, default in DEFAULT_FILTERS.items():
+        filters[key] = values.get(key, default)
+
+    for key in ("public_domain", "on_view"):
+        opt = values.get(key, "All")
+        if opt == "Yes":
+            filters[key] = True
+        elif opt == "No":
+            filters[key] = False
+
+    search = values.get("search_text", "")
+    if search.strip():
+        filters["search_text"] = search.strip()
+
+    return filters
+
+
+def sidebar_filters(df, source):
+    """Render sidebar and return filters dict. Facet counts come from `source` (df or its sample)."""
     st.sidebar.title("Met Museum Explorer")
     st.sidebar.markdown("---")
 
@@ -50,51 +107,83 @@ def sidebar_filters(df):
     st.sidebar.markdown("---")
     st.sidebar.subheader("Filters")
 
-    filters = {}
+    # Widget values from the previous interaction are already in session_state,
+    # so facet counts can reflect the current filters before widgets are drawn.
+    state = {k[len("f_"):]: v for k, v in st.session_state.items() if k.startswith("f_")}
+    with span("facet_counts"):
+        counts = facet_counts(source, _build_filters(state))
+    approx = "~" if source is not df else ""
+
+    def with_count(facet):
+        return lambda v: f"{v} ({approx}{counts[facet].get(v, 0):,})"
+
+    def yes_no_count(facet):
+        c = counts[facet]
+        labels = {"Yes": c.get(True, 0), "No": c.get(False, 0)}
+        return lambda v: f"{v} ({approx}{labels[v]:,})" if v in labels else v
+
+    values = {}
+
+    # Facets
+    for key, facet, label in [
+        ("department", "Department", "Department"),
+        ("culture", "Culture", "Culture"),
+        ("classification", "Classification", "Classification"),
+        ("century", "Century", "Century"),
+    ]:
+        values[key] = st.sidebar.multiselect(
+            label, facet_values(df, facet), format_func=with_count(facet), key=f"f_{key}"
+        )
 
-    # Department
-    all_depts = sorted(df["Department"].dropna().unique())
-    dept_sel = st.sidebar.multiselect("Department", all_depts)
-    if dept_sel:
-        filters["department"] = dept_sel
+    if "Tags" in counts:
+        values["tags"] = st.sidebar.multiselect(
+            "Tags", tag_values(df), format_func=with_count("Tags"), key="f_tags",
+            help="Objects with any of the selected tags",
+        )
 
     # Date range
     col1, col2 = st.sidebar.columns(2)
-    date_min = col1.number_input("Date from", value=-3000, step=100)
-    date_max = col2.number_input("Date to", value=2025, step=100)
-    filters["date_min"] = date_min
-    filters["date_max"] = date_max
+    values["date_min"] = col1.number_input("Date from", value=DEFAULT_FILTERS["date_min"], step=100, key="f_date_min")
+    values["date_max"] = col2.number_input("Date to", value=DEFAULT_FILTERS["date_max"], step=100, key="f_date_max")
+    values["date_match"] = st.sidebar.radio(
+        "Made", DATE_MATCHES, horizontal=True, key="f_date_match",
+        format_func={"overlap": "Any time in range", "within": "Entirely in range"}.get,
+    )
 
     # Accession year range
     col3, col4 = st.sidebar.columns(2)
-    acc_min = col3.number_input("Acquired from", value=1870, step=10)
-    acc_max = col4.number_input("Acquired to", value=2025, step=10)
-    filters["acc_year_min"] = acc_min
-    filters["acc_year_max"] = acc_max
+    values["acc_year_min"] = col3.number_input(
+        "Acquired from", value=DEFAULT_FILTERS["acc_year_min"], step=10, key="f_acc_year_min")
+    values["acc_year_max"] = col4.number_input(
+        "Acquired to", value=DEFAULT_FILTERS["acc_year_max"], step=10, key="f_acc_year_max")
 
     # Public domain
-    pd_opt = st.sidebar.selectbox("Public domain", ["All", "Yes", "No"])
-    if pd_opt == "Yes":
-        filters["public_domain"] = True
-    elif pd_opt == "No":
-        filters["public_domain"] = False
+    values["public_domain"] = st.sidebar.selectbox(
+        "Public domain", ["All", "Yes", "No"],
+        format_func=yes_no_count("Is Public Domain"), key="f_public_domain",
+    )
 
     # On view
-    ov_opt = st.sidebar.selectbox("On view", ["All", "Yes", "No"])
-    if ov_opt == "Yes":
-        filters["on_view"] = True
-    elif ov_opt == "No":
-        filters["on_view"] = False
+    values["on_view"] = st.sidebar.selectbox(
+        "On view", ["All", "Yes", "No"],
+        format_func=yes_no_count("On View"), key="f_on_view",
+    )
 
     # Text search
-    search = st.sidebar.text_input("Search (title/artist/object/medium)")
-    if search.strip():
-        filters["search_text"] = search.strip()
+    values["search_text"] = st.sidebar.text_input(
+        "Search (title/artist/object/medium)", key="f_search_text"
+    )
+
+    st.sidebar.toggle(
+        "Approximate mode", key="approximate",
+        help=f"Answer charts from a {SAMPLE_RATE:.0%} stratified sample while exact "
+             "results are computed in the background. For very large datasets.",
+    )
 
     st.sidebar.markdown("---")
     st.sidebar.caption(f"Dataset: {len(df):,} objects")
 
-    return page, filters
+    return page, _build_filters(values)
 
 
 # ===========================================================================
@@ -104,33 +193,28 @@ def sidebar_filters(df):
 # ---------------------------------------------------------------------------
 # 1. Overview
 # ---------------------------------------------------------------------------
-def page_overview(fdf, agg):
+def page_overview(tables):
     st.header("Collection Overview")
 
-    total = len(fdf)
-    public = fdf["Is Public Domain"].sum()
-    on_view = fdf["On View"].sum()
-    has_artist = fdf["Has Artist"].sum()
-    depts = fdf["Department"].nunique()
+    dept_data = tables.counts(["Department"]).sort_values("Count", ascending=False, kind="stable")
 
     c1, c2, c3, c4, c5 = st.columns(5)
-    c1.metric("Total Objects", f"{total:,}")
-    c2.metric("Public Domain", f"{int(public):,}")
-    c3.metric("On View", f"{int(on_view):,}")
-    c4.metric("With Artist", f"{int(has_artist):,}")
-    c5.metric("Departments", depts)
+    metric(c1, "Total Objects", tables.total())
+    metric(c2, "Public Domain", tables.total([("Is Public Domain", "==", True)]))
+    metric(c3, "On View", tables.total([("On View", "==", True)]))
+    metric(c4, "With Artist", tables.total([("Has Artist", "==", True)]))
+    c5.metric("Departments", len(dept_data))
 
     col_left, col_right = st.columns([3, 2])
 
     with col_left:
         st.subheader("Objects by Department")
-        dept_data = fdf["Department"].value_counts().reset_index()
-        dept_data.columns = ["Department", "Count"]
+        ci_caption(dept_data)
         if HAS_PLOTLY:
             fig = px.bar(dept_data, x="Count", y="Department", orientation="h",
                          color="Count", color_continuous_scale="Viridis")
             fig.update_layout(height=550, yaxis=dict(autorange="reversed"), showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.bar_chart(dept_data.set_index("Department")["Count"])
 
@@ -139,19 +223,19 @@ def page_overview(fdf, agg):
         if HAS_PLOTLY:
             fig = px.pie(dept_data.head(12), values="Count", names="Department", hole=0.4)
             fig.update_layout(height=550)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.dataframe(dept_data)
 
     st.subheader("Public Domain Rate by Department")
-    pd_rate = fdf.groupby("Department", observed=True)["Is Public Domain"].mean().reset_index()
+    pd_rate = tables.means(["Department"], "Is Public Domain")
     pd_rate.columns = ["Department", "Rate"]
     pd_rate = pd_rate.sort_values("Rate", ascending=False)
     if HAS_PLOTLY:
         fig = px.bar(pd_rate, x="Department", y="Rate", color="Rate",
                      color_continuous_scale="RdYlGn", text_auto=".0%")
         fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig)
     else:
         st.bar_chart(pd_rate.set_index("Department")["Rate"])
 
@@ -159,16 +243,15 @@ def page_overview(fdf, agg):
 # ---------------------------------------------------------------------------
 # 2. Timeline
 # ---------------------------------------------------------------------------
-def page_timeline(fdf, agg):
+def page_timeline(tables):
     st.header("Timeline")
 
     tab1, tab2, tab3 = st.tabs(["By Century", "By Era", "Acquisitions"])
 
     with tab1:
-        cent = fdf[fdf["Century"] != "Undated"].groupby(
-            ["Century", "Century Sort"], observed=True
-        ).size().reset_index(name="Count")
+        cent = tables.counts(["Century", "Century Sort"], where=[("Century", "!=", "Undated")])
         cent = cent.sort_values("Century Sort")
+        ci_caption(cent)
 
         show_bce = st.checkbox("Include BCE centuries", value=True, key="bce_toggle")
         if not show_bce:
@@ -178,30 +261,25 @@ def page_timeline(fdf, agg):
             fig = px.bar(cent, x="Century", y="Count", color="Count",
                          color_continuous_scale="Plasma")
             fig.update_layout(height=500, xaxis_tickangle=-45)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.bar_chart(cent.set_index("Century")["Count"])
 
     with tab2:
-        era_order = [
-            "Prehistoric", "Ancient (3000-1200 BCE)", "Iron Age (1200-500 BCE)",
-            "Classical (500 BCE-500 CE)", "Medieval (500-1400)", "Renaissance (1400-1600)",
-            "Early Modern (1600-1800)", "19th Century", "20th Century", "21st Century",
-        ]
-        era = fdf[fdf["Era"] != "Unknown"]["Era"].value_counts().reindex(era_order).dropna().reset_index()
-        era.columns = ["Era", "Count"]
+        era = tables.counts(["Era"], where=[("Era", "!=", "Unknown")])
+        ci_caption(era)
         if HAS_PLOTLY:
             fig = px.bar(era, x="Era", y="Count", color="Count",
                          color_continuous_scale="Inferno")
             fig.update_layout(height=500, xaxis_tickangle=-30)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.bar_chart(era.set_index("Era")["Count"])
 
     with tab3:
-        acq = fdf[fdf["AccessionYear"].notna()].groupby("AccessionYear").size().reset_index(name="Count")
-        acq = acq.sort_values("AccessionYear")
+        acq = tables.counts(["AccessionYear"]).sort_values("AccessionYear")
         acq["Cumulative"] = acq["Count"].cumsum()
+        ci_caption(acq)
 
         if HAS_PLOTLY:
             from plotly.subplots import make_subplots
@@ -220,7 +298,7 @@ def page_timeline(fdf, agg):
             fig.update_xaxes(title_text="Year")
             fig.update_yaxes(title_text="Yearly Count", secondary_y=False)
             fig.update_yaxes(title_text="Cumulative", secondary_y=True)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.line_chart(acq.set_index("AccessionYear")[["Count", "Cumulative"]])
 
@@ -228,68 +306,70 @@ def page_timeline(fdf, agg):
 # ---------------------------------------------------------------------------
 # 3. Departments
 # ---------------------------------------------------------------------------
-def page_departments(fdf, agg):
+def page_departments(tables):
     st.header("Department Deep Dive")
 
-    all_depts = sorted(fdf["Department"].dropna().unique())
+    all_depts = sorted(tables.counts(["Department"])["Department"])
     if not all_depts:
         st.warning("No departments in filtered data.")
         return
     dept = st.selectbox("Select department", all_depts)
-    ddf = fdf[fdf["Department"] == dept]
+    in_dept = [("Department", "==", dept)]
 
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Objects", f"{len(ddf):,}")
-    c2.metric("Public Domain", f"{int(ddf['Is Public Domain'].sum()):,}")
-    c3.metric("On View", f"{int(ddf['On View'].sum()):,}")
-    c4.metric("With Artist", f"{int(ddf['Has Artist'].sum()):,}")
+    metric(c1, "Objects", tables.total(in_dept))
+    metric(c2, "Public Domain", tables.total(in_dept + [("Is Public Domain", "==", True)]))
+    metric(c3, "On View", tables.total(in_dept + [("On View", "==", True)]))
+    metric(c4, "With Artist", tables.total(in_dept + [("Has Artist", "==", True)]))
 
     col_l, col_r = st.columns(2)
 
     with col_l:
         st.subheader("Top Mediums")
-        med = ddf[ddf["Medium Simple"].notna()]["Medium Simple"].value_counts().head(15).reset_index()
-        med.columns = ["Medium", "Count"]
+        med = tables.counts(["Medium Simple"], where=in_dept, top=15)
+        med = med.rename(columns={"Medium Simple": "Medium"})
+        ci_caption(med)
         if HAS_PLOTLY:
             fig = px.bar(med, x="Count", y="Medium", orientation="h")
             fig.update_layout(height=450, yaxis=dict(autorange="reversed"))
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.bar_chart(med.set_index("Medium")["Count"])
 
     with col_r:
         st.subheader("Top Classifications")
-        cls = ddf[ddf["Classification"].notna()]["Classification"].value_counts().head(15).reset_index()
-        cls.columns = ["Classification", "Count"]
+        cls = tables.counts(["Classification"], where=in_dept, top=15)
+        ci_caption(cls)
         if HAS_PLOTLY:
             fig = px.bar(cls, x="Count", y="Classification", orientation="h")
             fig.update_layout(height=450, yaxis=dict(autorange="reversed"))
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.bar_chart(cls.set_index("Classification")["Count"])
 
     st.subheader("Date Distribution")
-    dates = ddf[(ddf["Object Begin Date"].notna()) & (ddf["Object Begin Date"] != 0)]["Object Begin Date"]
-    if len(dates) > 0:
+    hist = tables.histogram("Object Begin Date", 50, in_dept + [("Object Begin Date", "!=", 0)])
+    if hist["Count"].sum() > 0:
+        hist["Object Begin Date"] = (hist["Start"] + hist["End"]) / 2
         if HAS_PLOTLY:
-            fig = px.histogram(dates, nbins=50, labels={"value": "Object Begin Date"})
-            fig.update_layout(height=350, showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
+            fig = px.bar(hist, x="Object Begin Date", y="Count", hover_data=["Start", "End"])
+            fig.update_layout(height=350, showlegend=False, yaxis_title="count", bargap=0)
+            plotly_chart(fig)
         else:
-            st.bar_chart(dates.value_counts().sort_index())
+            st.bar_chart(hist.set_index("Object Begin Date")["Count"])
     else:
         st.info("No dated objects in this department.")
 
     st.subheader("Top Cultures")
-    cult = ddf[ddf["Culture"].notna()]["Culture"].value_counts().head(15).reset_index()
-    cult.columns = ["Culture", "Count"]
-    fill = ddf["Culture"].notna().mean()
+    cult = tables.counts(["Culture"], where=in_dept, top=15)
+    fill = tables.fill_rate("Culture", in_dept)
     st.caption(f"Culture field filled for {fill:.0%} of objects in this department")
+    ci_caption(cult)
     if len(cult) > 0:
         if HAS_PLOTLY:
             fig = px.bar(cult, x="Count", y="Culture", orientation="h")
             fig.update_layout(height=400, yaxis=dict(autorange="reversed"))
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.bar_chart(cult.set_index("Culture")["Count"])
 
@@ -297,90 +377,84 @@ def page_departments(fdf, agg):
 # ---------------------------------------------------------------------------
 # 4. Artists
 # ---------------------------------------------------------------------------
-def page_artists(fdf, agg):
+def page_artists(tables):
     st.header("Artists")
 
     top_n = st.slider("Top N artists", 10, 100, 30, key="artist_top_n")
 
-    artists = fdf[fdf["Has Artist"]].groupby("Artist Display Name").agg(
-        Count=("Object ID", "size"),
-        Nationality=("Primary Nationality", "first"),
-    ).reset_index().sort_values("Count", ascending=False).head(top_n)
+    artists = tables.artist_counts(["Artist ID"], top=top_n)
 
     st.subheader(f"Top {top_n} Artists by Number of Objects")
+    ci_caption(artists)
     if HAS_PLOTLY:
-        fig = px.bar(artists, x="Count", y="Artist Display Name", orientation="h",
-                     color="Nationality", hover_data=["Nationality"])
+        fig = px.bar(artists, x="Count", y="Artist", orientation="h",
+                     color="Nationality", hover_data=["Nationality", "Gender"])
         fig.update_layout(height=max(400, top_n * 18), yaxis=dict(autorange="reversed"))
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig)
     else:
-        st.bar_chart(artists.set_index("Artist Display Name")["Count"])
+        st.bar_chart(artists.set_index("Artist")["Count"])
 
     col_l, col_r = st.columns(2)
 
     with col_l:
         st.subheader("Artist Nationality")
-        nat = fdf[fdf["Primary Nationality"].notna()]["Primary Nationality"].value_counts().head(20).reset_index()
-        nat.columns = ["Nationality", "Count"]
+        nat = tables.artist_counts(["Nationality"], top=20)
+        ci_caption(nat)
         if HAS_PLOTLY:
             fig = px.bar(nat, x="Count", y="Nationality", orientation="h")
             fig.update_layout(height=500, yaxis=dict(autorange="reversed"))
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.bar_chart(nat.set_index("Nationality")["Count"])
 
     with col_r:
         st.subheader("Gender Distribution")
-        gender = fdf[fdf["Gender Clean"].notna()]["Gender Clean"].value_counts().reset_index()
-        gender.columns = ["Gender", "Count"]
+        gender = tables.artist_counts(["Gender"]).sort_values("Count", ascending=False, kind="stable")
+        ci_caption(gender)
         if HAS_PLOTLY:
             fig = px.pie(gender, values="Count", names="Gender", hole=0.35)
             fig.update_layout(height=350)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.dataframe(gender)
 
         st.subheader("Gender Representation Over Time")
-        gt = fdf[(fdf["Gender Clean"].notna()) & (fdf["Century"] != "Undated")].groupby(
-            ["Century", "Century Sort", "Gender Clean"], observed=True
-        ).size().reset_index(name="Count")
+        gt = tables.artist_counts(["Century", "Century Sort", "Gender"], where=[("Century", "!=", "Undated")])
         gt = gt.sort_values("Century Sort")
         # Only show CE centuries for readability
         gt_ce = gt[gt["Century Sort"] > 0]
         if len(gt_ce) > 0:
             if HAS_PLOTLY:
-                fig = px.line(gt_ce, x="Century", y="Count", color="Gender Clean", markers=True)
+                fig = px.line(gt_ce, x="Century", y="Count", color="Gender", markers=True)
                 fig.update_layout(height=350, xaxis_tickangle=-45)
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig)
             else:
-                pivot = gt_ce.pivot_table(index="Century", columns="Gender Clean", values="Count", fill_value=0)
+                pivot = gt_ce.pivot_table(index="Century", columns="Gender", values="Count", fill_value=0)
                 st.line_chart(pivot)
 
 
 # ---------------------------------------------------------------------------
 # 5. Mediums
 # ---------------------------------------------------------------------------
-def page_mediums(fdf, agg):
+def page_mediums(tables):
     st.header("Mediums & Materials")
 
     top_n = st.slider("Top N mediums", 10, 60, 25, key="med_top_n")
-    med = fdf[fdf["Medium Simple"].notna()]["Medium Simple"].value_counts().head(top_n).reset_index()
-    med.columns = ["Medium", "Count"]
+    med = tables.counts(["Medium Simple"], top=top_n).rename(columns={"Medium Simple": "Medium"})
 
     st.subheader(f"Top {top_n} Mediums")
+    ci_caption(med)
     if HAS_PLOTLY:
         fig = px.bar(med, x="Count", y="Medium", orientation="h", color="Count",
                      color_continuous_scale="Viridis")
         fig.update_layout(height=max(400, top_n * 20), yaxis=dict(autorange="reversed"))
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig)
     else:
         st.bar_chart(med.set_index("Medium")["Count"])
 
     st.subheader("Department × Medium Heatmap")
-    top15_mediums = list(med["Medium"].head(15))
-    dm = fdf[fdf["Medium Simple"].isin(top15_mediums)].groupby(
-        ["Department", "Medium Simple"], observed=True
-    ).size().reset_index(name="Count")
+    top15_mediums = tuple(med["Medium"].head(15))
+    dm = tables.counts(["Department", "Medium Simple"], where=[("Medium Simple", "in", top15_mediums)])
 
     if len(dm) > 0:
         pivot = dm.pivot_table(index="Department", columns="Medium Simple", values="Count", fill_value=0)
@@ -388,7 +462,7 @@ def page_mediums(fdf, agg):
             fig = px.imshow(pivot, color_continuous_scale="YlOrRd", aspect="auto",
                             labels=dict(color="Count"))
             fig.update_layout(height=550)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.dataframe(pivot)
     else:
@@ -398,50 +472,52 @@ def page_mediums(fdf, agg):
 # ---------------------------------------------------------------------------
 # 6. Geography
 # ---------------------------------------------------------------------------
-def page_geography(fdf, agg):
+def page_geography(tables):
     st.header("Geography & Cultures")
 
     col_l, col_r = st.columns(2)
 
     with col_l:
         st.subheader("Top Cultures")
-        fill = fdf["Culture"].notna().mean()
+        fill = tables.fill_rate("Culture")
         st.caption(f"Culture field filled for {fill:.0%} of objects")
-        cult = fdf[fdf["Culture"].notna()]["Culture"].value_counts().head(25).reset_index()
-        cult.columns = ["Culture", "Count"]
+        cult = tables.counts(["Culture"], top=25)
+        ci_caption(cult)
         if HAS_PLOTLY:
             fig = px.bar(cult, x="Count", y="Culture", orientation="h", color="Count",
                          color_continuous_scale="Teal")
             fig.update_layout(height=600, yaxis=dict(autorange="reversed"))
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.bar_chart(cult.set_index("Culture")["Count"])
 
     with col_r:
         st.subheader("Top Countries of Origin")
-        fill_c = fdf["Country"].notna().mean()
+        fill_c = tables.fill_rate("Country")
         st.caption(f"Country field filled for {fill_c:.0%} of objects")
-        country = fdf[fdf["Country"].notna()]["Country"].value_counts().head(25).reset_index()
-        country.columns = ["Country", "Count"]
+        country = tables.counts(["Country"], top=25)
+        ci_caption(country)
         if HAS_PLOTLY:
             fig = px.bar(country, x="Count", y="Country", orientation="h", color="Count",
                          color_continuous_scale="Oranges")
             fig.update_layout(height=600, yaxis=dict(autorange="reversed"))
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.bar_chart(country.set_index("Country")["Count"])
 
     st.subheader("Cultures Across Centuries")
-    top10_cultures = list(fdf[fdf["Culture"].notna()]["Culture"].value_counts().head(10).index)
-    cult_time = fdf[(fdf["Culture"].isin(top10_cultures)) & (fdf["Century"] != "Undated")].groupby(
-        ["Century", "Century Sort", "Culture"], observed=True
-    ).size().reset_index(name="Count")
+    top10_cultures = tuple(tables.counts(["Culture"], top=10)["Culture"])
+    cult_time = tables.counts(
+        ["Century", "Century Sort", "Culture"],
+        where=[("Culture", "in", top10_cultures), ("Century", "!=", "Undated")],
+    )
     cult_time = cult_time.sort_values("Century Sort")
+    ci_caption(cult_time)
     if len(cult_time) > 0:
         if HAS_PLOTLY:
             fig = px.line(cult_time, x="Century", y="Count", color="Culture", markers=True)
             fig.update_layout(height=500, xaxis_tickangle=-45)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             pivot = cult_time.pivot_table(index="Century", columns="Culture", values="Count", fill_value=0)
             st.line_chart(pivot)
@@ -450,77 +526,115 @@ def page_geography(fdf, agg):
 # ---------------------------------------------------------------------------
 # 7. Art History
 # ---------------------------------------------------------------------------
-def page_art_history(fdf, agg):
+def page_art_history(tables):
     st.header("Art History")
 
     col_l, col_r = st.columns(2)
 
     with col_l:
         st.subheader("Periods")
-        periods = fdf[fdf["Period"].notna()]["Period"].value_counts().head(25).reset_index()
-        periods.columns = ["Period", "Count"]
-        fill_p = fdf["Period"].notna().mean()
+        periods = tables.counts(["Period"], top=25)
+        fill_p = tables.fill_rate("Period")
         st.caption(f"Period field filled for {fill_p:.0%} of objects")
+        ci_caption(periods)
         if HAS_PLOTLY:
             fig = px.bar(periods, x="Count", y="Period", orientation="h")
             fig.update_layout(height=600, yaxis=dict(autorange="reversed"))
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.bar_chart(periods.set_index("Period")["Count"])
 
     with col_r:
         st.subheader("Dynasties")
-        dyn = fdf[fdf["Dynasty"].notna()]["Dynasty"].value_counts().head(25).reset_index()
-        dyn.columns = ["Dynasty", "Count"]
-        fill_d = fdf["Dynasty"].notna().mean()
+        dyn = tables.counts(["Dynasty"], top=25)
+        fill_d = tables.fill_rate("Dynasty")
         st.caption(f"Dynasty field filled for {fill_d:.0%} of objects")
+        ci_caption(dyn)
         if HAS_PLOTLY:
             fig = px.bar(dyn, x="Count", y="Dynasty", orientation="h")
             fig.update_layout(height=600, yaxis=dict(autorange="reversed"))
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             st.bar_chart(dyn.set_index("Dynasty")["Count"])
 
     st.subheader("Classification Over Centuries")
-    top10_class = list(fdf[fdf["Classification"].notna()]["Classification"].value_counts().head(10).index)
-    class_time = fdf[(fdf["Classification"].isin(top10_class)) & (fdf["Century"] != "Undated")].groupby(
-        ["Century", "Century Sort", "Classification"], observed=True
-    ).size().reset_index(name="Count")
+    top10_class = tuple(tables.counts(["Classification"], top=10)["Classification"])
+    class_time = tables.counts(
+        ["Century", "Century Sort", "Classification"],
+        where=[("Classification", "in", top10_class), ("Century", "!=", "Undated")],
+    )
     class_time = class_time.sort_values("Century Sort")
+    ci_caption(class_time)
     if len(class_time) > 0:
         if HAS_PLOTLY:
             fig = px.area(class_time, x="Century", y="Count", color="Classification")
             fig.update_layout(height=500, xaxis_tickangle=-45)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             pivot = class_time.pivot_table(index="Century", columns="Classification", values="Count", fill_value=0)
             st.line_chart(pivot)
 
     st.subheader("Era × Department")
-    era_dept = fdf[fdf["Era"] != "Unknown"].groupby(
-        ["Era", "Department"], observed=True
-    ).size().reset_index(name="Count")
-    era_order = [
-        "Prehistoric", "Ancient (3000-1200 BCE)", "Iron Age (1200-500 BCE)",
-        "Classical (500 BCE-500 CE)", "Medieval (500-1400)", "Renaissance (1400-1600)",
-        "Early Modern (1600-1800)", "19th Century", "20th Century", "21st Century",
-    ]
-    era_dept["Era"] = pd.Categorical(era_dept["Era"], categories=era_order, ordered=True)
-    era_dept = era_dept.sort_values("Era")
+    era_dept = tables.counts(["Era", "Department"], where=[("Era", "!=", "Unknown")])
+    era_dept = era_dept.sort_values("Era", kind="stable")
+    ci_caption(era_dept)
     if len(era_dept) > 0:
         if HAS_PLOTLY:
             fig = px.bar(era_dept, x="Era", y="Count", color="Department", barmode="stack")
             fig.update_layout(height=550, xaxis_tickangle=-30)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig)
         else:
             pivot = era_dept.pivot_table(index="Era", columns="Department", values="Count", fill_value=0)
             st.bar_chart(pivot)
 
 
 # ---------------------------------------------------------------------------
-# 8. Object Explorer
+# 8. Tags
 # ---------------------------------------------------------------------------
-def page_explorer(fdf, agg):
+def page_tags(tables):
+    st.header("Tags")
+
+    top_n = st.slider("Top N tags", 10, 60, 30, key="tag_top_n")
+    try:
+        tags = tables.tag_counts(top=top_n)
+    except ImportError:
+        st.info("Tag analytics need scipy (`pip install scipy`).")
+        return
+    st.caption(f"Tags on {tables.fill_rate('Tags'):.0%} of objects")
+
+    st.subheader(f"Top {top_n} Tags")
+    ci_caption(tags)
+    if HAS_PLOTLY:
+        fig = px.bar(tags, x="Count", y="Tag", orientation="h", color="Count",
+                     color_continuous_scale="Teal")
+        fig.update_layout(height=max(400, top_n * 18), yaxis=dict(autorange="reversed"))
+        plotly_chart(fig)
+    else:
+        st.bar_chart(tags.set_index("Tag")["Count"])
+
+    st.subheader("Tag Co-occurrence")
+    top20 = tuple(tags["Tag"].head(20))
+    pairs = tables.tag_cooccurrence(top20)
+    if len(pairs) > 0:
+        st.caption("Objects carrying both tags; the diagonal is each tag's own count.")
+        pivot = pairs.pivot_table(index="Tag", columns="Other Tag", values="Count", fill_value=0)
+        order = [t for t in top20 if t in pivot.index]
+        pivot = pivot.reindex(index=order, columns=order, fill_value=0)
+        if HAS_PLOTLY:
+            fig = px.imshow(pivot, color_continuous_scale="YlOrRd", aspect="auto",
+                            labels=dict(color="Count"))
+            fig.update_layout(height=600)
+            plotly_chart(fig)
+        else:
+            st.dataframe(pivot)
+    else:
+        st.info("No tagged objects under the current filters.")
+
+
+# ---------------------------------------------------------------------------
+# 9. Object Explorer
+# ---------------------------------------------------------------------------
+def page_explorer(tables):
     st.header("Object Explorer")
 
     col1, col2, col3 = st.columns([3, 1, 1])
@@ -531,19 +645,13 @@ def page_explorer(fdf, agg):
     with col3:
         sort_asc = st.selectbox("Order", ["Ascending", "Descending"]) == "Ascending"
 
-    results = fdf.copy()
-    if search.strip():
-        s = search.strip().lower()
-        results = results[
-            results["Title"].fillna("").str.lower().str.contains(s, regex=False)
-            | results["Artist Display Name"].fillna("").str.lower().str.contains(s, regex=False)
-            | results["Object Name"].fillna("").str.lower().str.contains(s, regex=False)
-        ]
-
-    results = results.sort_values(sort_by, ascending=sort_asc, na_position="last")
-    total = len(results)
-    st.caption(f"{total:,} results found (showing up to 100)")
-    results = results.head(100)
+    matches, results = tables.search(search, sort_by, sort_asc, limit=100)
+    if tables.approximate:
+        st.caption(f"~{matches:,} results estimated; showing sampled objects only "
+                   "(switch off approximate mode to browse every match)")
+    else:
+        st.caption(f"{matches:,} results found (showing up to 100)")
+    results = results.assign(**{"Met URL": lambda r: met_url(r["Object ID"])})
 
     view = st.radio("View", ["Table", "Cards"], horizontal=True)
 
@@ -565,6 +673,12 @@ def page_explorer(fdf, agg):
     else:
         # Card view — 3 columns, up to 30 results
         card_results = results.head(30)
+        related = load_related()
+        neighbors = {
+            int(oid): [nid for nid, _ in related.get(int(oid), [])[:3]] for oid in card_results["Object ID"]
+        }
+        neighbor_ids = sorted({nid for ids in neighbors.values() for nid in ids})
+        neighbor_titles = tables.first_values("Object ID", neighbor_ids, "Title") if neighbor_ids else {}
         cols = st.columns(3)
         for idx, (_, row) in enumerate(card_results.iterrows()):
             with cols[idx % 3]:
@@ -584,35 +698,103 @@ def page_explorer(fdf, agg):
                         st.markdown(f"_{' · '.join(info_parts)}_")
                     if url and str(url).startswith("http"):
                         st.markdown(f"[View on Met Museum]({url})")
+                    similar = [neighbor_titles.get(nid) for nid in neighbors[int(row["Object ID"])]]
+                    similar = [t for t in similar if isinstance(t, str) and t]
+                    if similar:
+                        st.caption("More like this: " + " · ".join(similar))
 
 
 # ===========================================================================
 # Main
 # ===========================================================================
+def debug_panel(trace):
+    """Hidden sidebar panel with the latest rerun's timing breakdown. Enable with ?debug=1."""
+    if st.query_params.get("debug") != "1" or trace is None:
+        return
+    with st.sidebar.expander(f"Debug: rerun took {trace['total_ms']:,.0f} ms", expanded=True):
+        # Rows are slowest first, not in call order, so nesting is shown as a column
+        rows = pd.DataFrame(summarize(trace))
+        rows["share"] = rows["share"] * 100
+        cols = ["name", "depth", "calls", "total_ms", "share"]
+        if PROFILE_MEMORY:
+            cols += [c for c in ("mem_delta_bytes", "rss_delta_bytes") if c in rows.columns]
+        st.dataframe(
+            rows[cols],
+            column_config={"share": st.column_config.ProgressColumn("share", format="%.0f%%",
+                                                                    min_value=0, max_value=100)},
+            hide_index=True,
+            use_container_width=True,
+        )
+
+
+@st.fragment(run_every=1.0)
+def await_exact(df, filters):
+    """Poll for the background exact tables; rerun the app once they are ready."""
+    if exact_tables(df, filters) is not None:
+        st.rerun()
+    st.caption("⏳ Showing estimates — computing exact results in the background…")
+
+
 def main():
-    df = load_data()
-    page, filters = sidebar_filters(df)
-    fdf = filter_dataframe(df, filters)
-    agg = precompute_aggregations(fdf)
-
-    st.sidebar.caption(f"Filtered: {len(fdf):,} / {len(df):,} objects")
-
-    if page == "Overview":
-        page_overview(fdf, agg)
-    elif page == "Timeline":
-        page_timeline(fdf, agg)
-    elif page == "Departments":
-        page_departments(fdf, agg)
-    elif page == "Artists":
-        page_artists(fdf, agg)
-    elif page == "Mediums":
-        page_mediums(fdf, agg)
-    elif page == "Geography":
-        page_geography(fdf, agg)
-    elif page == "Art History":
-        page_art_history(fdf, agg)
-    elif page == "Object Explorer":
-        page_explorer(fdf, agg)
+    start_trace("rerun")
+
+    with span("load_data"):
+        df = load_data()
+    warm_up(df)
+    approximate = st.session_state.get("approximate", False)
+    source = df
+    if approximate:
+        with span("load_sample"):
+            source = load_sample()
+    with span("sidebar"):
+        page, filters = sidebar_filters(df, source)
+
+    if approximate:
+        tables = exact_tables(df, filters)
+        if tables is None:
+            with span("filter_dataframe"):
+                tags = tag_matrix(source) if HAS_SCIPY else None
+                tables = Tables(filter_dataframe(source, filters), artist_table(source), tags)
+    else:
+        with span("cached_tables"):
+            tables = cached_tables(df, filters)
+    # A per-render view, so tables.requests lists exactly what this page asked for
+    tables = tables.view()
+
+    count, _, _ = tables.total()
+    st.sidebar.caption(f"Filtered: {'~' if tables.approximate else ''}{count:,} / {len(df):,} objects")
+
+    status = st.container()
+    with span(f"page:{page}"):
+        if page == "Overview":
+            page_overview(tables)
+        elif page == "Timeline":
+            page_timeline(tables)
+        elif page == "Departments":
+            page_departments(tables)
+        elif page == "Artists":
+            page_artists(tables)
+        elif page == "Mediums":
+            page_mediums(tables)
+        elif page == "Geography":
+            page_geography(tables)
+        elif page == "Art History":
+            page_art_history(tables)
+        elif page == "Tags":
+            page_tags(tables)
+        elif page == "Object Explorer":
+            page_explorer(tables)
+
+    if tables.approximate:
+        # Replay this page's requests against the full data, then swap the results in
+        schedule_exact(df, filters, tables.requests)
+        with status:
+            await_exact(df, filters)
+    else:
+        record_usage(filters, page, tables.requests)
+        prefetch(df, filters, page)
+
+    debug_panel(finish_trace())
 
 
 if __name__ == "__main__":
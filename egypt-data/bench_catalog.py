@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Encode/decode throughput and per-record memory of catalog records: plain
+dicts through the stdlib json module vs CatalogRecord through the
+catalog_schema codec (msgspec when installed). Also times check_record and
+checks that every record round-trips unchanged. Exits 1 on any mismatch.
+
+    python3 bench_catalog.py                 # 20k synthetic records
+    python3 bench_catalog.py --records 100000 --repeat 5
+    python3 bench_catalog.py --csv MetObjects.csv
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import catalog_schema as cs
+import egypt_scraper as es
+from bench_scraper import synthetic_objects
+
+WORDS = ["Egyptian", "Faience", "amulet", "Thebes", "New Kingdom", "Dynasty 18", "limestone",
+         "Rogers Fund, 1915", "Hathor", "scarab", "inscribed", "Amenhotep III", "Memphis", "Osiris"]
+
+
+def synthetic_records(n: int, seed: int = 0) -> list[dict]:
+    """bench_scraper's objects with every text field filled, as catalog records."""
+    rng = random.Random(seed)
+    records = []
+    for obj in synthetic_objects(n).values():
+        record = es.catalog_record(obj)
+        for key, value in record.items():
+            if isinstance(value, str) and not value:
+                record[key] = " ".join(rng.choices(WORDS, k=rng.randint(1, 4)))
+        record["description"] = " ".join(rng.choices(WORDS, k=rng.randint(20, 80)))
+        record["tags"] = rng.sample(WORDS, rng.randint(0, 4))
+        records.append(record)
+    return records
+
+
+def timed(fn, items, repeat) -> tuple[list, float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = [fn(item) for item in items]
+        times.append(time.perf_counter() - t0)
+    return out, statistics.median(times)
+
+
+def bytes_per_record(build, n) -> float:
+    """Traced allocation per record of build(), which must return the records."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del records
+    return size / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--csv", type=Path, help="use records read from a CSV instead of synthetic ones")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.csv:
+        with contextlib.redirect_stdout(io.StringIO()):
+            records = [es.catalog_record(obj) for obj in es.read_csv(args.csv).values()]
+    else:
+        records = synthetic_records(args.records)
+    n = len(records)
+    lines = [json.dumps(r, ensure_ascii=False).encode() for r in records]
+    typed = [cs.CatalogRecord(**r) for r in records]
+
+    rows = []
+    _, t = timed(cs.check_record, records, args.repeat)
+    rows.append(("check_record", t))
+    _, t = timed(lambda r: json.dumps(r, ensure_ascii=False).encode(), records, args.repeat)
+    rows.append(("encode dict   json.dumps", t))
+    encoded, t = timed(cs.encode_json, typed, args.repeat)
+    rows.append(("encode record encode_json", t))
+    _, t = timed(json.loads, lines, args.repeat)
+    rows.append(("decode dict   json.loads", t))
+    decoded, t = timed(cs.decode_json, encoded, args.repeat)
+    rows.append(("decode record decode_json", t))
+    if cs.HAS_MSGSPEC:
+        packed, t = timed(cs.encode_msgpack, typed, args.repeat)
+        rows.append(("encode record msgpack", t))
+        unpacked, t = timed(cs.decode_msgpack, packed, args.repeat)
+        rows.append(("decode record msgpack", t))
+        decoded += unpacked
+
+    codec = "msgspec" if cs.HAS_MSGSPEC else "stdlib json (msgspec not installed)"
+    print(f"{n:,} records, codec: {codec}, {sum(map(len, lines)) / n:,.0f} JSON bytes/record")
+    for name, seconds in rows:
+        print(f"  {name:<28} {n / seconds:>11,.0f} records/s")
+
+    dict_bytes = bytes_per_record(lambda: [json.loads(line) for line in lines], n)
+    typed_bytes = bytes_per_record(lambda: [cs.decode_json(line) for line in lines], n)
+    print(f"  memory: dict {dict_bytes:,.0f} B/record, CatalogRecord {typed_bytes:,.0f} B/record "
+          f"({typed_bytes / dict_bytes:.2f}x)")
+
+    expected = records * (len(decoded) // n)
+    mismatches = sum(1 for r, d in zip(expected, decoded) if list(cs.to_dict(d).items()) != list(r.items()))
+    if mismatches:
+        print(f"ROUND TRIP FAILED: {mismatches} records differ")
+        sys.exit(1)
+    print("  round trip: identical records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for data_utils on synthetic Met-schema collections.
+
+Generates (or reuses) a synthetic CSV per size, then measures:
+  - load_data wall time and peak traced memory
+  - filter_dataframe latency per filter type (cold mask cache)
+  - facet_counts latency
+  - precompute_aggregations latency
+
+    python3 bench_data_utils.py                      # 10k and 100k
+    python3 bench_data_utils.py 10k 100k 1m 5m --out bench_results.jsonl
+    python3 bench_data_utils.py 375k --memory-report  # bytes per column, before/after
+    python3 bench_data_utils.py 1m --backend duckdb     # Parquet + DuckDB instead of pandas
+    python3 bench_data_utils.py 1m --workers 1 4 8      # load_data scaling with processes
+    python3 bench_data_utils.py --check-parity          # Century/Era vs the old mask-based code
+    python3 bench_data_utils.py 100k --check-duckdb     # same results from both backends?
+    python3 bench_data_utils.py 100k --check-intervals  # date interval index vs a full scan
+
+Synthetic CSVs are cached in .bench/ next to this file.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_utils
+from synthetic_data import SIZES, write_csv
+
+BENCH_DIR = Path(__file__).resolve().parent / ".bench"
+
+# One representative filters dict per filter type, plus everything at once.
+FILTER_CASES = {
+    "department": {"department": ["Egyptian Art", "Asian Art"]},
+    "date_range": {"date_min": -1500, "date_max": 500},
+    "date_within": {"date_min": -1350, "date_max": -1200, "date_match": "within"},
+    "accession_range": {"acc_year_min": 1900, "acc_year_max": 1950},
+    "public_domain": {"public_domain": True},
+    "on_view": {"on_view": True},
+    "search_text": {"search_text": "portrait"},
+    "sidebar_default": {"date_min": -3000, "date_max": 2025, "acc_year_min": 1870, "acc_year_max": 2025},
+}
+FILTER_CASES["combined"] = {k: v for case in FILTER_CASES.values() for k, v in case.items()}
+
+
+def timed(fn, repeat=5):
+    """Run fn `repeat` times; return (last result, {min_ms, median_ms})."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return result, {"min_ms": round(min(times), 2), "median_ms": round(statistics.median(times), 2)}
+
+
+def dataset(size: str) -> Path:
+    path = BENCH_DIR / f"synthetic_{size}.csv"
+    if not path.exists():
+        BENCH_DIR.mkdir(exist_ok=True)
+        print(f"  generating {path.name} ...")
+        write_csv(path, SIZES[size])
+    return path
+
+
+def legacy_layout(df):
+    """The same data in the frame layout load_data used before memory compaction:
+    object strings, float64 dates, Int64 years and a stored Met URL column
+    (twice, counting the Link Resource it was copied from)."""
+    old = df.copy()
+    for col in data_utils.TEXT_COLUMNS + data_utils.DERIVED_CATEGORY_COLUMNS + ["Century", "Era"]:
+        old[col] = old[col].astype(object)
+    old["Object ID"] = old["Object ID"].astype("int64")
+    old["AccessionYear"] = old["AccessionYear"].astype("Int64")
+    for col in ("Object Begin Date", "Object End Date", "Century Sort"):
+        old[col] = old[col].astype("float64")
+    old["Link Resource"] = ("http://www.metmuseum.org/art/collection/search/" + df["Object ID"].astype(str)).astype(object)
+    old["Met URL"] = old["Link Resource"].copy()
+    return old
+
+
+def legacy_century_era(begin: pd.Series):
+    """Century, Century Sort and Era as _derive_columns computed them before the
+    lookup tables: one boolean mask and string concatenation per label group."""
+    def ordinal_suffix(s):
+        suffix = pd.Series("th", index=s.index)
+        suffix[s % 10 == 1] = "st"
+        suffix[s % 10 == 2] = "nd"
+        suffix[s % 10 == 3] = "rd"
+        suffix[(s % 100 >= 11) & (s % 100 <= 13)] = "th"
+        return suffix
+
+    century = pd.Series(np.nan, index=begin.index, dtype="object")
+    century_sort = pd.Series(np.nan, index=begin.index, dtype="float64")
+    valid = begin.notna() & (begin != 0)
+    before_3000 = valid & (begin < -3000)
+    bce = valid & (begin < 0) & (begin >= -3000)
+    ce = valid & (begin > 0)
+    century[before_3000] = "Before 3000 BCE"
+    century_sort[before_3000] = -40
+    bce_c = ((begin[bce].abs() - 1) // 100 + 1).astype(int)
+    century[bce] = bce_c.astype(str) + ordinal_suffix(bce_c) + " c. BCE"
+    century_sort[bce] = -bce_c.astype(float)
+    ce_c = ((begin[ce] - 1) // 100 + 1).astype(int)
+    century[ce] = ce_c.astype(str) + ordinal_suffix(ce_c) + " c."
+    century_sort[ce] = ce_c.astype(float)
+    undated = begin.isna() | (begin == 0)
+    century[undated] = "Undated"
+    century_sort[undated] = 999
+    order = century_sort.groupby(century).first().sort_values()
+
+    era = pd.Series("Unknown", index=begin.index, dtype="object")
+    v = begin[valid]
+    era[valid & (v < -3000)] = "Prehistoric"
+    era[valid & (v >= -3000) & (v < -1200)] = "Ancient (3000-1200 BCE)"
+    era[valid & (v >= -1200) & (v < -500)] = "Iron Age (1200-500 BCE)"
+    era[valid & (v >= -500) & (v < 500)] = "Classical (500 BCE-500 CE)"
+    era[valid & (v >= 500) & (v < 1400)] = "Medieval (500-1400)"
+    era[valid & (v >= 1400) & (v < 1600)] = "Renaissance (1400-1600)"
+    era[valid & (v >= 1600) & (v < 1800)] = "Early Modern (1600-1800)"
+    era[valid & (v >= 1800) & (v < 1900)] = "19th Century"
+    era[valid & (v >= 1900) & (v < 2000)] = "20th Century"
+    era[valid & (v >= 2000)] = "21st Century"
+    return (
+        pd.Categorical(century, categories=order.index),
+        century_sort,
+        pd.Categorical(era, categories=data_utils.ERA_ORDER + ["Unknown"], ordered=True),
+    )
+
+
+def check_parity() -> list[str]:
+    """Compare the lookup-table Century/Era with legacy_century_era over every year
+    from -5000 to 2100, the era and century edges, 0, missing and far-future dates."""
+    years = np.arange(-5000, 2101, dtype="float64")
+    edges = np.concatenate([data_utils.ERA_BOUNDS, np.arange(-3100, 2200, 100)])
+    extra = [np.nan, 0.0, -0.0, 9999.0, 12345.0, -99999.0, -3000.5, -2999.5, 0.5, -0.5, 99.5, 100.5]
+    begin = np.concatenate([years, edges - 1, edges, edges + 1, extra])
+    problems = []
+    # Whole range at once, and in a shuffled order so category order can't follow input order
+    for label, values in (("sorted", begin), ("shuffled", np.random.default_rng(0).permutation(begin))):
+        century, century_sort = data_utils._assign_century(values)
+        new_era = data_utils._assign_era(values)
+        old_century, old_sort, old_era = legacy_century_era(pd.Series(values))
+        # The old code ordered categories with an unstable sort on Century Sort, so
+        # labels sharing a sort value (0th c. BCE / 0th c., from |year| < 1) could
+        # come in either order; compare the order as a sequence of sort values.
+        sort_of = dict(zip(old_century, old_sort))
+        checks = [
+            ("Century", pd.Series(century, dtype=object), pd.Series(old_century, dtype=object)),
+            ("Century order", pd.Series([sort_of[c] for c in century.categories]),
+             pd.Series([sort_of[c] for c in old_century.categories])),
+            ("Century Sort", pd.Series(century_sort), old_sort),
+            ("Era", pd.Series(new_era), pd.Series(old_era)),
+        ]
+        for name, new, old in checks:
+            try:
+                pd.testing.assert_series_equal(new, old, check_names=False)
+            except AssertionError as e:
+                problems.append(f"{label} {name}: " + " ".join(str(e).split())[:300])
+    return problems
+
+
+def check_intervals(size: str, windows: int = 200) -> list[str]:
+    """Compare DateIntervals bounds, overlap/within rows and counts with a full scan
+    over random windows, BCE and reversed ones included; print the timings."""
+    df = data_utils.load_data.__wrapped__(dataset(size))
+    intervals = data_utils.date_intervals(df)
+    begin = df["Object Begin Date"].astype("float64")
+    end = df["Object End Date"].astype("float64")
+    begin, end = begin.fillna(end).fillna(0), end.fillna(begin).fillna(0)
+    lo, hi = np.minimum(begin, end).to_numpy(), np.maximum(begin, end).to_numpy()
+
+    rng = np.random.default_rng(0)
+    problems = []
+    scan_s = index_s = 0.0
+    timed_windows = 0
+    for start, stop in rng.integers(-4000, 2100, size=(windows, 2)):
+        expected = {
+            ("date_min", "overlap"): hi >= start, ("date_min", "within"): lo >= start,
+            ("date_max", "overlap"): lo <= stop, ("date_max", "within"): hi <= stop,
+        }
+        for (name, match), mask in expected.items():
+            value = start if name == "date_min" else stop
+            if not np.array_equal(intervals.bound_mask(name, value, match), mask):
+                problems.append(f"{name} {match} {value}")
+        t0 = time.perf_counter()
+        overlap = np.flatnonzero((lo <= stop) & (hi >= start))
+        within = np.flatnonzero((lo >= start) & (hi <= stop))
+        t1 = time.perf_counter()
+        n = intervals.count_overlapping(start, stop)
+        t2 = time.perf_counter()
+        if start <= stop:  # reversed windows fall back to a scan; only time the ordered ones
+            scan_s, index_s, timed_windows = scan_s + t1 - t0, index_s + t2 - t1, timed_windows + 1
+        if n != len(overlap) or not np.array_equal(intervals.overlapping(start, stop), overlap):
+            problems.append(f"overlapping [{start}, {stop}]")
+        if not np.array_equal(intervals.within(start, stop), within):
+            problems.append(f"within [{start}, {stop}]")
+    print(f"{size}: {windows} windows, overlap+within scan {scan_s / timed_windows * 1e3:.3f} ms, "
+          f"count_overlapping {index_s / timed_windows * 1e6:.1f} µs")
+    return problems
+
+
+def memory_report(df) -> pd.DataFrame:
+    """Deep bytes per column before and after compaction."""
+    before = legacy_layout(df).memory_usage(deep=True, index=False)
+    after = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        "before_bytes": before,
+        "after_bytes": after.reindex(before.index, fill_value=0),
+        "before_dtype": legacy_layout(df.head(1)).dtypes.astype(str),
+        "after_dtype": df.dtypes.astype(str).reindex(before.index, fill_value="(derived)"),
+    })
+    report.loc["TOTAL"] = [report["before_bytes"].sum(), report["after_bytes"].sum(), "", ""]
+    report["ratio"] = (report["before_bytes"] / report["after_bytes"].where(report["after_bytes"] > 0)).round(1)
+    return report
+
+
+def print_memory_report(size, report):
+    print(f"\n── {size}: memory by column ──")
+    print(f"  {'column':<22}{'before':>10} {'after':>10}  {'ratio':>6}   dtype")
+    for col, r in report.iterrows():
+        ratio = "" if pd.isna(r["ratio"]) else f"{r['ratio']:.1f}x"
+        dtypes = f"{r['before_dtype']} → {r['after_dtype']}" if col != "TOTAL" else ""
+        print(f"  {col:<22}{r['before_bytes'] / 1e6:>8,.1f}MB {r['after_bytes'] / 1e6:>8,.1f}MB  {ratio:>6}   {dtypes}")
+
+
+def _drop_parquet(path: Path):
+    shutil.rmtree(path.with_suffix(".parquet"), ignore_errors=True)
+
+
+def bench_load_scaling(size: str, workers: list[int]) -> dict:
+    """Cold load_data time per worker count (pandas backend)."""
+    path = dataset(size)
+    load = data_utils.load_data.__wrapped__
+    times = {}
+    for n in workers:
+        t0 = time.perf_counter()
+        load(path, "pandas", n)
+        times[n] = round((time.perf_counter() - t0) * 1000, 1)
+        print(f"  {size} load_data workers={n:<3} {times[n]:>10,.1f} ms   ({times[workers[0]] / times[n]:.2f}x)")
+    return times
+
+
+def bench_size(size: str, repeat: int, backend: str = "pandas") -> dict:
+    path = dataset(size)
+    load = data_utils.load_data.__wrapped__
+    aggregate = data_utils.precompute_aggregations.__wrapped__
+    duck = backend == "duckdb"
+
+    # Peak memory in a separate run: tracemalloc slows allocation-heavy code a lot.
+    # For duckdb both runs convert the CSV afresh; DuckDB's own memory is not traced.
+    if duck:
+        _drop_parquet(path)
+    tracemalloc.start()
+    load(path, backend)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    if duck:
+        _drop_parquet(path)
+    t0 = time.perf_counter()
+    df = load(path, backend)
+    load_ms = (time.perf_counter() - t0) * 1000
+
+    result = {
+        "backend": backend,
+        "rows": len(df),
+        "csv_bytes": path.stat().st_size,
+        "load_ms": round(load_ms, 1),
+        "load_peak_mb": round(peak / 1e6, 1),
+        "frame_mb": 0.0 if duck else round(df.memory_usage(deep=True).sum() / 1e6, 1),
+        "filter": {},
+    }
+
+    for name, filters in FILTER_CASES.items():
+        # A DuckSource filters lazily, so time it through to the row count
+        def cold_filter():
+            data_utils._MASK_CACHE.clear()
+            fdf = data_utils.filter_dataframe(df, filters)
+            return fdf, len(fdf)
+        (_, rows), stats = timed(cold_filter, repeat)
+        _, warm = timed(lambda: len(data_utils.filter_dataframe(df, filters)), repeat)
+        result["filter"][name] = {**stats, "warm_median_ms": warm["median_ms"], "rows": rows}
+
+    filters = FILTER_CASES["sidebar_default"]
+    _, result["facet_counts"] = timed(lambda: data_utils.facet_counts(df, filters), repeat)
+    _, result["precompute_aggregations"] = timed(lambda: aggregate(df), max(1, repeat // 2))
+    return result
+
+
+def check_duckdb(size: str) -> list[str]:
+    """Compare facet counts and every pre-computed table between the two backends."""
+    path = dataset(size)
+    df = data_utils.load_data.__wrapped__(path, "pandas")
+    source = data_utils.load_data.__wrapped__(path, "duckdb")
+    aggregate = data_utils.precompute_aggregations.__wrapped__
+    pairs = [(f"aggregations[{k}]", v, aggregate(source)[k]) for k, v in aggregate(df).items()]
+    for name, filters in FILTER_CASES.items():
+        expected = data_utils.facet_counts(df, filters)
+        actual = data_utils.facet_counts(source, filters)
+        pairs += [(f"facet_counts[{name}][{col}]", expected[col], actual[col]) for col in expected]
+
+    problems = []
+    for label, expected, actual in pairs:
+        try:
+            if isinstance(expected, pd.DataFrame):
+                pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True),
+                                              check_dtype=False, check_categorical=False)
+            elif isinstance(expected, pd.Series):
+                pd.testing.assert_series_equal(expected, actual, check_dtype=False, check_names=False,
+                                               check_index_type=False, check_categorical=False)
+            elif expected != actual:
+                raise AssertionError(f"{expected!r} != {actual!r}")
+        except AssertionError as e:
+            problems.append(f"{label}: {str(e).splitlines()[0]}")
+    return problems
+
+
+def print_result(size, r):
+    print(f"\n── {size}: {r['rows']:,} rows ({r['csv_bytes'] / 1e6:.0f} MB CSV, {r['backend']}) ──")
+    print(f"  load_data             {r['load_ms']:>10,.1f} ms   peak {r['load_peak_mb']:,.1f} MB"
+          f"   frame {r['frame_mb']:,.1f} MB")
+    for name, f in r["filter"].items():
+        print(f"  filter:{name:<15}{f['median_ms']:>9,.2f} ms   warm {f['warm_median_ms']:,.2f} ms"
+              f"   → {f['rows']:,} rows")
+    print(f"  facet_counts          {r['facet_counts']['median_ms']:>10,.2f} ms")
+    print(f"  precompute_aggs       {r['precompute_aggregations']['median_ms']:>10,.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sizes", nargs="*", help=f"any of {', '.join(SIZES)} (default: 10k 100k)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--memory-report", action="store_true",
+                        help="only report bytes per column, before/after compaction")
+    parser.add_argument("--backend", choices=["pandas", "duckdb"], default="pandas")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        help="only time load_data with each number of worker processes")
+    parser.add_argument("--check-duckdb", action="store_true",
+                        help="only check that the duckdb backend matches pandas")
+    parser.add_argument("--check-parity", action="store_true",
+                        help="only check Century/Century Sort/Era against the legacy implementation")
+    parser.add_argument("--check-intervals", action="store_true",
+                        help="only check the date interval index against a full scan")
+    parser.add_argument("--out", help="append results as one JSON line to this file")
+    args = parser.parse_args()
+    args.sizes = args.sizes or ["10k", "100k"]
+    if unknown := [s for s in args.sizes if s not in SIZES]:
+        parser.error(f"unknown sizes {unknown}; choose from {', '.join(SIZES)}")
+
+    if args.check_parity:
+        problems = check_parity()
+        print("Century/Era parity: " + ("identical" if not problems else f"{len(problems)} mismatches"))
+        for p in problems:
+            print("  " + p)
+        raise SystemExit(1 if problems else 0)
+
+    if args.check_intervals:
+        failed = False
+        for size in args.sizes:
+            problems = check_intervals(size)
+            print(f"{size}: " + ("interval index matches" if not problems else f"{len(problems)} mismatches"))
+            for p in problems[:10]:
+                print("  " + p)
+            failed = failed or bool(problems)
+        raise SystemExit(1 if failed else 0)
+
+    if args.check_duckdb:
+        failed = False
+        for size in args.sizes:
+            problems = check_duckdb(size)
+            print(f"{size}: " + ("backends match" if not problems else f"{len(problems)} mismatches"))
+            for p in problems[:10]:
+                print("  " + p)
+            failed = failed or bool(problems)
+        raise SystemExit(1 if failed else 0)
+
+    if args.memory_report:
+        for size in args.sizes:
+            df = data_utils.load_data.__wrapped__(dataset(size))
+            print_memory_report(size, memory_report(df))
+        return
+
+    if args.workers:
+        if os.path.getsize(dataset(args.sizes[0])) < data_utils.LOAD_PARALLEL_MIN_BYTES:
+            print(f"note: CSVs under {data_utils.LOAD_PARALLEL_MIN_BYTES / 1e6:.0f} MB always load serially")
+        for size in args.sizes:
+            bench_load_scaling(size, args.workers)
+        return
+
+    results = {}
+    for size in args.sizes:
+        results[size] = bench_size(size, args.repeat, args.backend)
+        print_result(size, results[size])
+
+    if args.out:
+        record = {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        with open(args.out, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
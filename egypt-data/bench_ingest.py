@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Parity check and timing for the scraper's CSV readers.
+
+Writes a synthetic CSV in the scraper's COLUMN_MAP schema — padded values,
+quoted newlines, messy tag lists, odd integers, a BOM, duplicate ids — then
+runs read_csv_stdlib and read_csv_arrow on it, times both and checks that
+every record is identical, key order included. Exits 1 on any mismatch.
+
+    python3 bench_ingest.py                   # 50k rows
+    python3 bench_ingest.py --rows 500000 --repeat 3
+    python3 bench_ingest.py --csv MetObjects.csv
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import egypt_scraper as es
+
+# Values chosen to hit every branch of the legacy parsers.
+INT_VALUES = ["-2500", "1450", " 12 ", "+7", "0", "", "1_000", "abc", "3.5", "٣٤", "99999999999999999999"]
+BOOL_VALUES = ["True", "False", "TRUE", " true ", "", "yes"]
+TAG_VALUES = ["", "Men|Hieroglyphs", "Gods | Animals |", "|", " Birds ", "Kings||Queens"]
+TEXT_VALUES = ["", "Egyptian", " Coptic ", "Faience,\tglaze", 'He said "hi",\nthen left', " Thebes　"]
+
+
+def write_scraper_csv(path: Path, n: int, seed: int = 0, bom: bool = True):
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8-sig" if bom else "utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(es.COLUMN_MAP))
+        writer.writeheader()
+        for i in range(n):
+            row = {col: rng.choice(TEXT_VALUES) for col in es.COLUMN_MAP}
+            row["Object ID"] = str(540_000 + i) if rng.random() > 0.01 else rng.choice(INT_VALUES)
+            if rng.random() < 0.005:
+                row["Object ID"] = "540000"  # duplicate id: later row wins, first position kept
+            for col in ("Is Highlight", "Is Timeline Work", "Is Public Domain"):
+                row[col] = rng.choice(BOOL_VALUES)
+            row["Object Begin Date"] = rng.choice(INT_VALUES)
+            row["Object End Date"] = rng.choice(INT_VALUES)
+            row["Tags"] = rng.choice(TAG_VALUES)
+            writer.writerow(row)
+
+
+def timed(fn, path, repeat):
+    times = []
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            result = fn(path)
+            times.append(time.perf_counter() - t0)
+    return result, statistics.median(times)
+
+
+def compare(expected: dict, actual: dict) -> list[str]:
+    problems = []
+    if list(expected) != list(actual):
+        problems.append(f"object ids/order differ ({len(expected)} vs {len(actual)} records)")
+    for oid, record in expected.items():
+        other = actual.get(oid)
+        if other is None or list(record.items()) != list(other.items()):
+            problems.append(f"record {oid} differs:\n    stdlib {record}\n    arrow  {other}")
+        if len(problems) >= 5:
+            break
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--csv", type=Path, help="use an existing CSV instead of a synthetic one")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not es.HAS_PYARROW:
+        print("pyarrow is not installed; only the stdlib reader is available.")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory(prefix="bench_ingest_") as tmp:
+        path = args.csv
+        if path is None:
+            path = Path(tmp) / "scraper_schema.csv"
+            write_scraper_csv(path, args.rows)
+        size_mb = path.stat().st_size / 1e6
+
+        expected, stdlib_s = timed(es.read_csv_stdlib, path, args.repeat)
+        actual, arrow_s = timed(es.read_csv_arrow, path, args.repeat)
+
+    print(f"{path.name}: {size_mb:.1f} MB, {len(expected):,} public-domain records")
+    print(f"  read_csv_stdlib  {stdlib_s * 1000:>9,.1f} ms")
+    print(f"  read_csv_arrow   {arrow_s * 1000:>9,.1f} ms   ({stdlib_s / arrow_s:.1f}x)")
+
+    problems = compare(expected, actual)
+    if problems:
+        print("PARITY FAILED")
+        for p in problems:
+            print("  " + p)
+        sys.exit(1)
+    print("  parity: identical records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the scraper pipeline against mock_met_server.
+
+Runs phase1_scrape, phase2_images and build_catalog_and_indexes on synthetic
+objects, with all paths redirected to a temp dir and the mock server running
+in its own process. Reports objects/sec and exact latency percentiles for
+each concurrency setting.
+
+    python3 bench_scraper.py --objects 500 --concurrency 5:10 10:20 20:40
+    python3 bench_scraper.py --rate-429 0.05 --rate-timeout 0.01 --timeout 2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import egypt_scraper as es
+from mock_met_server import MockConfig, MockMetServer
+from scraper_metrics import ScrapeMetrics
+
+
+def synthetic_objects(n: int, start_id: int = 540_000) -> dict[int, dict]:
+    """Records shaped like read_csv() output, enough for all three phases."""
+    cultures = ["Egyptian", "Coptic", "Roman Egypt", ""]
+    classes = ["Stone-Sculpture", "Faience", "Papyrus", "Jewelry", ""]
+    objects = {}
+    for i in range(n):
+        oid = start_id + i
+        record = {snake: "" for snake in es.COLUMN_MAP.values() if snake != "tags_csv"}
+        record.update({
+            "object_id": oid,
+            "is_highlight": i % 97 == 0,
+            "is_timeline_work": i % 211 == 0,
+            "is_public_domain": True,
+            "department": "Egyptian Art",
+            "culture": cultures[i % len(cultures)],
+            "classification": classes[i % len(classes)],
+            "medium": ["Limestone", "Faience", "Bronze"][i % 3],
+            "date_begin": -2500 + (i * 37) % 3000,
+            "date_end": -2400 + (i * 37) % 3000,
+            "tags": ["Hieroglyphs", "Men"][: i % 3],
+            "description": "",
+            "inscriptions": "",
+            "provenance": "",
+            "image_file": "",
+            "image_url": "",
+            "additional_images": [],
+            "met_url": f"https://www.metmuseum.org/art/collection/search/{oid}",
+        })
+        objects[oid] = record
+    return objects
+
+
+def _serve(config: MockConfig, conn):
+    async def run():
+        server = MockMetServer(config)
+        await server.start()
+        conn.send(server.base_url)
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+def percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {}
+    qs = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else samples * 99
+    return {
+        "p50_ms": round(qs[49] * 1000, 1),
+        "p95_ms": round(qs[94] * 1000, 1),
+        "p99_ms": round(qs[98] * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+async def run_pipeline(base_url: str, n: int, scrape_conc: int, image_conc: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="bench_scraper_") as tmp:
+        tmp = Path(tmp)
+        es.SITE_BASE = es.IMAGE_BASE = base_url
+        es.SCRAPE_CONCURRENCY = scrape_conc
+        es.IMAGE_CONCURRENCY = image_conc
+        es.IMAGES_DIR = tmp / "images"
+        es.INDEX_DIR = tmp / "index"
+        es.CATALOG_PATH = tmp / "catalog_egyptian.json"
+        es.CATALOG_NDJSON_PATH = tmp / "catalog_egyptian.ndjson"
+        es.MANIFEST_PATH = tmp / ".catalog_manifest.json"
+        es.BUNDLES_DIR = tmp / "bundles"
+        es.CHECKPOINT_PATH = tmp / ".checkpoint.json"
+        es.JOURNAL_PATH = tmp / ".journal.jsonl"
+        es.DEAD_LETTER_PATH = tmp / ".dead_letter.json"
+        es.FAILED_REPORT_PATH = tmp / "failed_objects.json"
+        es.IMAGES_DIR.mkdir()
+        es.INDEX_DIR.mkdir()
+        es.METRICS = metrics = ScrapeMetrics(keep_samples=True)
+
+        objects = synthetic_objects(n)
+        checkpoint = {"scrape_done": [], "image_done": []}
+        dead = es.DeadLetters()
+        timings = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            checkpoint = await es.phase1_scrape(objects, checkpoint, dead)
+            t1 = time.perf_counter()
+            await es.phase2_images(objects, checkpoint, dead)
+            t2 = time.perf_counter()
+            es.build_catalog_and_indexes(objects)
+            t3 = time.perf_counter()
+        timings = {"scrape_s": t1 - t0, "images_s": t2 - t1, "catalog_s": t3 - t2, "total_s": t3 - t0}
+
+    result = {
+        "objects": n,
+        "scrape_concurrency": scrape_conc,
+        "image_concurrency": image_conc,
+        **{k: round(v, 2) for k, v in timings.items()},
+        "scrape_objects_per_s": round(n / timings["scrape_s"], 1),
+        "images_per_s": round(n / timings["images_s"], 1),
+        "pipeline_objects_per_s": round(n / timings["total_s"], 1),
+        "scraped_ok": metrics.outcomes[("scrape", "ok")],
+        "images_ok": metrics.outcomes[("images", "ok")],
+        "retries": {"|".join(k): v for k, v in metrics.retries.items()},
+        "connections": metrics.snapshot()["connections"],
+        "recovered": metrics.outcomes[("scrape_retry", "ok")] + metrics.outcomes[("images_retry", "ok")],
+        "failed": {phase: sorted(dead.entries[phase]) for phase in dead.PHASES if dead.entries[phase]},
+    }
+    for (phase, _host), samples in (metrics.samples or {}).items():
+        result[f"{phase}_latency"] = percentiles(samples)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=300)
+    parser.add_argument("--concurrency", nargs="+", default=["5:10", "10:20", "20:40"],
+                        help="scrape:image concurrency pairs")
+    parser.add_argument("--latency-ms", type=float, default=MockConfig.latency_ms)
+    parser.add_argument("--image-latency-ms", type=float, default=MockConfig.image_latency_ms)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-timeout", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=5.0, help="client timeout per request (s)")
+    parser.add_argument("--backoff", type=float, default=0.1, help="BACKOFF_BASE for the run (s)")
+    parser.add_argument("--retry-backoff", type=float, default=0.5,
+                        help="RETRY_BACKOFF_BASE for the dead-letter retry pass (s)")
+    parser.add_argument("--out", help="append results as one JSON line to this file")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        image_latency_ms=args.image_latency_ms,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        rate_timeout=args.rate_timeout,
+        hang_s=args.timeout * 4,
+    )
+    es.SCRAPE_TIMEOUT = es.IMAGE_TIMEOUT = args.timeout
+    es.BACKOFF_BASE = args.backoff
+    es.RETRY_BACKOFF_BASE = args.retry_backoff
+
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=_serve, args=(config, child), daemon=True)
+    server.start()
+    base_url = parent.recv()
+
+    results = []
+    try:
+        for pair in args.concurrency:
+            scrape_conc, image_conc = (int(x) for x in pair.split(":"))
+            r = asyncio.run(run_pipeline(base_url, args.objects, scrape_conc, image_conc))
+            results.append(r)
+            sl, il = r.get("scrape_latency", {}), r.get("images_latency", {})
+            print(
+                f"scrape={scrape_conc:>3} images={image_conc:>3} | "
+                f"pipeline {r['pipeline_objects_per_s']:>7.1f} obj/s "
+                f"(scrape {r['scrape_objects_per_s']:.1f}/s, images {r['images_per_s']:.1f}/s, "
+                f"catalog {r['catalog_s']:.2f}s) | "
+                f"scrape p50/p95/p99 {sl.get('p50_ms')}/{sl.get('p95_ms')}/{sl.get('p99_ms')} ms | "
+                f"images p95 {il.get('p95_ms')} ms | ok {r['scraped_ok']}/{r['images_ok']} | "
+                f"conn reuse {r['connections'].get('scrape', {}).get('reuse_ratio')}/"
+                f"{r['connections'].get('images', {}).get('reuse_ratio')}"
+                + (f" | retries {r['retries']}" if r["retries"] else "")
+                + (f" | recovered {r['recovered']}" if r["recovered"] else "")
+                + (f" | failed {r['failed']}" if r["failed"] else "")
+            )
+    finally:
+        server.terminate()
+
+    if args.out:
+        with open(args.out, "a") as f:
+            f.write(json.dumps({"timestamp": time.time(), "config": vars(args), "results": results}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
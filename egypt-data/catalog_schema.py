@@ -0,0 +1,189 @@
+"""
+Typed catalog record shared by the scraper and Python readers of the catalog.
+
+CatalogRecord has one slot per catalog key, in catalog order. Phase 3 checks
+every record against it with check_record() before writing, so a mistyped
+or misspelled field fails the build instead of reaching the game. The codec
+functions encode and decode one record at a time: msgspec (if installed)
+encodes JSON and MessagePack and decodes straight into CatalogRecord,
+validating as it goes; without it JSON goes through the stdlib and
+check_record().
+
+    from catalog_schema import iter_catalog
+    for record in iter_catalog("catalog_egyptian.ndjson"):
+        print(record.object_id, record.title)
+"""
+
+import json
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+try:
+    import msgspec
+    HAS_MSGSPEC = True
+except ImportError:
+    HAS_MSGSPEC = False
+
+
+class SchemaError(ValueError):
+    """A catalog record with missing, unknown or mistyped fields."""
+
+
+@dataclass(slots=True)
+class CatalogRecord:
+    object_number: str
+    is_highlight: bool
+    is_timeline_work: bool
+    is_public_domain: bool
+    object_id: int
+    gallery_number: str
+    department: str
+    accession_year: str
+    object_name: str
+    title: str
+    culture: str
+    period: str
+    dynasty: str
+    reign: str
+    portfolio: str
+    constituent_id: str
+    artist_role: str
+    artist_prefix: str
+    artist_display_name: str
+    artist_display_bio: str
+    artist_suffix: str
+    artist_alpha_sort: str
+    artist_nationality: str
+    artist_begin_date: str
+    artist_end_date: str
+    artist_gender: str
+    artist_ulan_url: str
+    artist_wikidata_url: str
+    date: str
+    date_begin: int | None
+    date_end: int | None
+    medium: str
+    dimensions: str
+    credit_line: str
+    geography_type: str
+    city: str
+    state: str
+    county: str
+    country: str
+    region: str
+    subregion: str
+    locale: str
+    locus: str
+    excavation: str
+    river: str
+    classification: str
+    rights_and_reproduction: str
+    object_wikidata_url: str
+    metadata_date: str
+    repository: str
+    tags_aat_url: str
+    tags_wikidata_url: str
+    tags: list[str]
+    description: str
+    inscriptions: str
+    provenance: str
+    image_file: str
+    image_url: str
+    additional_images: list[str]
+    met_url: str
+
+
+FIELD_NAMES = tuple(f.name for f in fields(CatalogRecord))
+
+# Allowed exact types per field (bool is not accepted where an int is expected).
+_FIELD_TYPES = {
+    f.name: {str: (str,), bool: (bool,), int: (int,), int | None: (int, type(None)), list[str]: (list,)}[f.type]
+    for f in fields(CatalogRecord)
+}
+_LIST_FIELDS = tuple(name for name, types in _FIELD_TYPES.items() if types == (list,))
+_INT_FIELDS = tuple(name for name, types in _FIELD_TYPES.items() if int in types)
+# msgspec encodes integers as int64/uint64, so keep both codecs to that range.
+_INT_RANGE = (-(2**63), 2**64 - 1)
+
+
+def check_record(record: dict):
+    """Raise SchemaError unless `record` has exactly the CatalogRecord fields, correctly typed."""
+    oid = record.get("object_id")
+    if len(record) != len(FIELD_NAMES) or record.keys() != _FIELD_TYPES.keys():
+        missing = [k for k in FIELD_NAMES if k not in record]
+        unknown = [k for k in record if k not in _FIELD_TYPES]
+        raise SchemaError(f"object {oid}: missing fields {missing}, unknown fields {unknown}")
+    for name, types in _FIELD_TYPES.items():
+        if type(record[name]) not in types:
+            raise SchemaError(
+                f"object {oid}: {name} is {type(record[name]).__name__}, "
+                f"expected {' or '.join(t.__name__ for t in types)}"
+            )
+    for name in _LIST_FIELDS:
+        if any(type(item) is not str for item in record[name]):
+            raise SchemaError(f"object {oid}: {name} must be a list of strings")
+    for name in _INT_FIELDS:
+        value = record[name]
+        if value is not None and not _INT_RANGE[0] <= value <= _INT_RANGE[1]:
+            raise SchemaError(f"object {oid}: {name} {value} is out of the 64-bit range")
+
+
+def from_dict(record: dict) -> CatalogRecord:
+    check_record(record)
+    return CatalogRecord(**record)
+
+
+def to_dict(record: CatalogRecord) -> dict:
+    """Catalog-ordered dict of `record`. Lists are shared, not copied."""
+    return {name: getattr(record, name) for name in FIELD_NAMES}
+
+
+# ── Codec ──────────────────────────────────────────────────────────────────────
+
+if HAS_MSGSPEC:
+    _JSON_ENCODER = msgspec.json.Encoder()
+    _JSON_DECODER = msgspec.json.Decoder(CatalogRecord)
+    _MSGPACK_ENCODER = msgspec.msgpack.Encoder()
+    _MSGPACK_DECODER = msgspec.msgpack.Decoder(CatalogRecord)
+
+
+def encode_json(record: CatalogRecord | dict) -> bytes:
+    """One record as compact UTF-8 JSON (an NDJSON line without the newline)."""
+    if HAS_MSGSPEC:
+        return _JSON_ENCODER.encode(record)
+    if isinstance(record, CatalogRecord):
+        record = to_dict(record)
+    # Same bytes as msgspec: compact separators, non-ASCII left as UTF-8
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def decode_json(data: bytes | str) -> CatalogRecord:
+    if HAS_MSGSPEC:
+        try:
+            return _JSON_DECODER.decode(data)
+        except msgspec.ValidationError as e:
+            raise SchemaError(str(e)) from None
+    return from_dict(json.loads(data))
+
+
+def encode_msgpack(record: CatalogRecord | dict) -> bytes:
+    if not HAS_MSGSPEC:
+        raise ImportError("MessagePack encoding needs `pip install msgspec`")
+    return _MSGPACK_ENCODER.encode(record)
+
+
+def decode_msgpack(data: bytes) -> CatalogRecord:
+    if not HAS_MSGSPEC:
+        raise ImportError("MessagePack decoding needs `pip install msgspec`")
+    try:
+        return _MSGPACK_DECODER.decode(data)
+    except msgspec.ValidationError as e:
+        raise SchemaError(str(e)) from None
+
+
+def iter_catalog(path: str | Path):
+    """Yield a CatalogRecord per line of an NDJSON catalog (catalog_egyptian.ndjson)."""
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield decode_json(line)
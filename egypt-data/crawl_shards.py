@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Sharded crawl coordination for the full Met collection.
+
+Object ids are partitioned into N shards with a consistent-hash ring, so
+changing N only moves ~1/N of the ids. Each worker scrapes one shard with its
+own checkpoint and journal under shards/, and all workers on a host draw from
+one global request budget kept in a SQLite token bucket. A merge step folds
+every shard journal into one catalog and index set.
+
+    python3 crawl_shards.py run --shards 4 --csv MetObjects.csv      # local workers + merge
+    python3 crawl_shards.py worker --shard 2 --shards 4 --csv MetObjects.csv
+    python3 crawl_shards.py merge --shards 4 --csv MetObjects.csv
+
+The rate budget file must be on a local disk shared by the workers; SQLite
+locking is not reliable on network filesystems, so multi-host crawls should
+give each host its own budget (rate / hosts).
+"""
+
+import argparse
+import asyncio
+import bisect
+import hashlib
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import egypt_scraper as es
+
+SHARDS_DIR = es.BASE_DIR / "shards"
+RATE_DB_PATH = SHARDS_DIR / "rate_budget.sqlite"
+
+VNODES_PER_SHARD = 256
+
+# Requests per second per host, shared by all workers.
+RATE_LIMITS = {
+    "www.metmuseum.org": 8.0,
+    "images.metmuseum.org": 20.0,
+}
+DEFAULT_RATE = 5.0
+BURST_SECONDS = 2.0  # bucket capacity, in seconds of rate
+
+
+# ── Consistent hashing ─────────────────────────────────────────────────────────
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+def build_ring(n_shards: int, vnodes: int = VNODES_PER_SHARD) -> tuple[list[int], list[int]]:
+    points = sorted((_hash(f"shard-{s}#{v}"), s) for s in range(n_shards) for v in range(vnodes))
+    return [p for p, _ in points], [s for _, s in points]
+
+
+def shard_of(obj_id: int, ring: tuple[list[int], list[int]]) -> int:
+    keys, owners = ring
+    i = bisect.bisect(keys, _hash(str(obj_id)))
+    return owners[i % len(keys)]
+
+
+def shard_paths(shard: int) -> dict[str, Path]:
+    return {
+        "checkpoint": SHARDS_DIR / f"shard-{shard:03d}.checkpoint.json",
+        "journal": SHARDS_DIR / f"shard-{shard:03d}.journal.jsonl",
+        "report": SHARDS_DIR / f"shard-{shard:03d}.report.json",
+        "dead_letter": SHARDS_DIR / f"shard-{shard:03d}.dead_letter.json",
+        "failed": SHARDS_DIR / f"shard-{shard:03d}.failed.json",
+    }
+
+
+# ── Global rate budget ─────────────────────────────────────────────────────────
+
+
+class RateBudget:
+    """Token bucket per host, stored in SQLite so separate processes share it."""
+
+    def __init__(self, path: Path = RATE_DB_PATH, rates: dict[str, float] | None = None):
+        self.path = Path(path)
+        self.rates = rates or RATE_LIMITS
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bucket (host TEXT PRIMARY KEY, tokens REAL, updated REAL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _try_take(self, host: str) -> float:
+        """Take one token if available. Returns 0.0 on success, else seconds to wait."""
+        rate = self.rates.get(host, DEFAULT_RATE)
+        capacity = max(1.0, rate * BURST_SECONDS)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated FROM bucket WHERE host = ?", (host,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            wait = 0.0
+            if tokens >= 1.0:
+                tokens -= 1.0
+            else:
+                wait = (1.0 - tokens) / rate
+            conn.execute(
+                "INSERT OR REPLACE INTO bucket (host, tokens, updated) VALUES (?, ?, ?)",
+                (host, tokens, now),
+            )
+            conn.execute("COMMIT")
+            return wait
+        finally:
+            conn.close()
+
+    async def acquire(self, host: str):
+        while True:
+            wait = await asyncio.to_thread(self._try_take, host)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+# ── Worker ─────────────────────────────────────────────────────────────────────
+
+
+async def run_worker(shard: int, n_shards: int, csv_path: Path):
+    SHARDS_DIR.mkdir(parents=True, exist_ok=True)
+    es.IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+    paths = shard_paths(shard)
+    es.CHECKPOINT_PATH = paths["checkpoint"]
+    es.JOURNAL_PATH = paths["journal"]
+    es.RUN_REPORT_PATH = paths["report"]
+    es.DEAD_LETTER_PATH = paths["dead_letter"]
+    es.FAILED_REPORT_PATH = paths["failed"]
+    es.RATE_LIMITER = RateBudget()
+
+    ring = build_ring(n_shards)
+    objects = {oid: obj for oid, obj in es.read_csv(csv_path).items() if shard_of(oid, ring) == shard}
+    restored = es.load_journal(objects)
+    print(f"Shard {shard}/{n_shards}: {len(objects)} objects ({restored} restored from journal)")
+
+    checkpoint = es.load_checkpoint()
+    dead = es.DeadLetters()
+    try:
+        checkpoint = await es.phase1_scrape(objects, checkpoint, dead)
+        checkpoint = await es.phase2_images(objects, checkpoint, dead)
+    finally:
+        es.write_snapshot(es.METRICS, paths["report"])
+        dead.save()
+        dead.write_report()
+    print(es.METRICS.report())
+
+
+# ── Merge ──────────────────────────────────────────────────────────────────────
+
+
+def merge(n_shards: int, csv_path: Path):
+    """Fold every shard journal into the full object set and build one catalog."""
+    objects = es.read_csv(csv_path)
+    applied = 0
+    for shard in range(n_shards):
+        journal = shard_paths(shard)["journal"]
+        if not journal.exists():
+            print(f"  shard {shard}: no journal, skipped")
+            continue
+        n = es.load_journal(objects, journal)
+        applied += n
+        print(f"  shard {shard}: {n} journal entries")
+    print(f"Merged {applied} journal entries into {len(objects)} objects")
+    es.INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    es.phase_visual()
+    es.build_catalog_and_indexes(objects)
+
+
+def run_local(n_shards: int, csv_path: Path):
+    """Start one worker process per shard on this host, wait, then merge."""
+    SHARDS_DIR.mkdir(parents=True, exist_ok=True)
+    procs = []
+    for shard in range(n_shards):
+        log = open(SHARDS_DIR / f"shard-{shard:03d}.log", "w")
+        cmd = [sys.executable, __file__, "worker", "--shard", str(shard),
+               "--shards", str(n_shards), "--csv", str(csv_path)]
+        procs.append((shard, subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT), log))
+    failed = []
+    for shard, proc, log in procs:
+        if proc.wait() != 0:
+            failed.append(shard)
+        log.close()
+    if failed:
+        print(f"Workers failed for shards {failed}; see shards/shard-NNN.log. Re-run to resume.")
+        sys.exit(1)
+    merge(n_shards, csv_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("run", "worker", "merge"):
+        p = sub.add_parser(name)
+        p.add_argument("--shards", type=int, required=True)
+        p.add_argument("--csv", type=Path, default=es.CSV_PATH)
+        if name == "worker":
+            p.add_argument("--shard", type=int, required=True)
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        if not 0 <= args.shard < args.shards:
+            parser.error("--shard must be in [0, --shards)")
+        asyncio.run(run_worker(args.shard, args.shards, args.csv))
+    elif args.command == "merge":
+        merge(args.shards, args.csv)
+    else:
+        run_local(args.shards, args.csv)
+
+
+if __name__ == "__main__":
+    main()
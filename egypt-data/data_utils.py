@@ -1,37 +1,176 @@
 """Data loading, cleaning, derived columns, cached aggregations, and filtering for Met Museum dataset."""
 
+import copy
+import json
+import multiprocessing
 import os
 import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
 import streamlit as st
 import pandas as pd
 import numpy as np
+from pandas.api.types import union_categoricals
+
+try:
+    import duckdb
+    HAS_DUCKDB = True
+except ImportError:
+    HAS_DUCKDB = False
+
+try:
+    from scipy import sparse
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
 
 DATA_PATH = os.path.join(os.path.dirname(__file__), "MetObjects.csv")
+RELATED_PATH = os.path.join(os.path.dirname(__file__), "index", "related.json")
+
+# "pandas" loads the CSV into memory; "duckdb" queries a Parquet copy of it on disk.
+BACKEND = os.environ.get("MET_BACKEND", "pandas")
+
+# Processes deriving columns during load_data; CSVs under LOAD_PARALLEL_MIN_BYTES load serially.
+LOAD_WORKERS = int(os.environ.get("MET_LOAD_WORKERS", os.cpu_count() or 1))
+LOAD_CHUNK_ROWS = 100_000
+LOAD_PARALLEL_MIN_BYTES = 50_000_000
 
 USE_COLUMNS = [
     "Object ID", "Is Highlight", "Is Public Domain", "Gallery Number",
     "Department", "AccessionYear", "Object Name", "Title", "Culture",
-    "Period", "Dynasty", "Reign", "Artist Display Name", "Artist Nationality",
-    "Artist Gender", "Object Date", "Object Begin Date", "Object End Date",
-    "Medium", "Classification", "Country", "Link Resource", "City", "State",
+    "Period", "Dynasty", "Reign", "Artist Display Name", "Constituent ID",
+    "Artist Nationality", "Artist Gender", "Artist Begin Date", "Artist End Date",
+    "Object Date", "Object Begin Date", "Object End Date",
+    "Medium", "Classification", "Country", "City", "State",
     "Tags", "Artist Display Bio",
 ]
 
+# Artist fields that look numeric on single-artist rows but are pipe-joined on
+# others; read as text so every chunk parses them alike.
+CSV_DTYPES = {"Constituent ID": str, "Artist Begin Date": str, "Artist End Date": str}
+
 CATEGORY_COLUMNS = [
     "Department", "Culture", "Period", "Dynasty", "Reign",
     "Classification", "Country", "Object Name",
 ]
 
+# Derived label columns with few distinct values, stored as categoricals.
+DERIVED_CATEGORY_COLUMNS = ["Gender Clean", "Medium Simple", "Primary Nationality"]
 
-@st.cache_data(show_spinner="Loading Met Museum collection…")
-def load_data():
-    """Load and clean the Met Museum CSV. Returns a cleaned DataFrame."""
-    df = pd.read_csv(
-        DATA_PATH,
-        usecols=USE_COLUMNS,
-        low_memory=False,
-    )
+# Free-text columns kept as strings. Arrow-backed when pyarrow is available:
+# one contiguous buffer per column instead of a Python object per cell.
+TEXT_COLUMNS = [
+    "Title", "Artist Display Name", "Artist Display Bio", "Constituent ID", "Artist Nationality",
+    "Artist Gender", "Artist Begin Date", "Artist End Date", "Object Date", "Medium", "Tags",
+    "Gallery Number", "City", "State",
+]
+
+try:
+    STRING_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan)
+except (ImportError, TypeError):
+    STRING_DTYPE = object  # no pyarrow, or pandas < 2.3
+
+# Narrowest dtypes that hold the Met's values (ids < 1M, years within ±32K).
+NUMERIC_DTYPES = {
+    "Object ID": "int32",
+    "AccessionYear": "Int16",
+    "Object Begin Date": "float32",
+    "Object End Date": "float32",
+    "Century Sort": "int16",
+}
+
+ERA_ORDER = [
+    "Prehistoric", "Ancient (3000-1200 BCE)", "Iron Age (1200-500 BCE)",
+    "Classical (500 BCE-500 CE)", "Medieval (500-1400)", "Renaissance (1400-1600)",
+    "Early Modern (1600-1800)", "19th Century", "20th Century", "21st Century",
+]
+
+# ERA_ORDER[i] covers [ERA_BOUNDS[i-1], ERA_BOUNDS[i]) of Object Begin Date.
+ERA_BOUNDS = np.array([-3000, -1200, -500, 500, 1400, 1600, 1800, 1900, 2000])
+
+# Dates before -3000 share one Century; BCE centuries count down from 30th c. BCE.
+BCE_CENTURIES = 30
+
+MET_URL_PREFIX = "https://www.metmuseum.org/art/collection/search/"
+
+
+@st.cache_resource(show_spinner="Loading Met Museum collection…")
+def load_data(path=DATA_PATH, backend=BACKEND, workers=LOAD_WORKERS):
+    """Load and clean the Met Museum CSV. Returns a cleaned DataFrame.
+
+    Cached as a shared resource: every session and the background Tables
+    worker see the same frame, so callers must not modify it in place.
+    With backend="duckdb" it returns a DuckSource over a Parquet copy instead.
+    Large CSVs are cleaned in row chunks across `workers` processes.
+    The date interval index used by the date filters, the artist dimension
+    used by the Artists page and the tag matrix are built here too.
+    """
+    if backend == "duckdb":
+        source = DuckSource(build_parquet(path))
+        artist_table(source)
+        return source
+    if workers > 1 and os.path.getsize(path) >= LOAD_PARALLEL_MIN_BYTES:
+        df = _load_parallel(path, workers)
+    else:
+        df = pd.read_csv(
+            path,
+            usecols=USE_COLUMNS,
+            dtype=CSV_DTYPES,
+            low_memory=False,
+        )
+        _derive_columns(df)
+        _compact(df)
+    date_intervals(df)
+    artist_table(df)
+    if HAS_SCIPY:
+        tag_matrix(df)
+    return df
 
+
+def _clean_chunk(chunk):
+    _derive_columns(chunk)
+    _compact(chunk)
+    return chunk
+
+
+def _load_parallel(path, workers, chunk_rows=LOAD_CHUNK_ROWS):
+    """load_data's cleaning spread over a process pool, one CSV row chunk per task.
+
+    The main process keeps parsing while workers derive columns. Each chunk
+    comes back with its own categories, so categoricals are unified before
+    concatenating; the result equals a serial load.
+    """
+    # spawn, not fork: the server process already runs threads (Tables worker, Streamlit)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        reader = pd.read_csv(path, usecols=USE_COLUMNS, dtype=CSV_DTYPES, low_memory=False,
+                             chunksize=chunk_rows)
+        futures = [pool.submit(_clean_chunk, chunk) for chunk in reader]
+        chunks = [f.result() for f in futures]
+    return _concat_chunks(chunks)
+
+
+def _concat_chunks(chunks):
+    """Concatenate cleaned chunks, keeping every categorical column categorical."""
+    first = chunks[0]
+    for col in first.columns:
+        if not isinstance(first[col].dtype, pd.CategoricalDtype) or first[col].cat.ordered:
+            continue  # Era's categories are fixed, so they already agree
+        categories = union_categoricals([c[col] for c in chunks], sort_categories=True).categories
+        for c in chunks:
+            c[col] = c[col].cat.set_categories(categories)
+    df = pd.concat(chunks, ignore_index=True)
+    # Century is ordered chronologically, not alphabetically
+    order = df.groupby("Century", observed=True)["Century Sort"].first().sort_values()
+    df["Century"] = df["Century"].cat.reorder_categories(list(order.index))
+    return df
+
+
+def _derive_columns(df):
+    """Clean the raw CSV columns and add the derived ones, in place. Row-local only."""
     # --- AccessionYear: extract year from mixed formats (ISO dates + plain years) ---
     ay = df["AccessionYear"].astype(str).str.strip()
     # ISO dates like "2005-02-15" → take first 4 chars
@@ -43,40 +182,9 @@ def load_data():
     df["Object Begin Date"] = pd.to_numeric(df["Object Begin Date"], errors="coerce")
     df["Object End Date"] = pd.to_numeric(df["Object End Date"], errors="coerce")
 
-    # --- Derived: Century and Century Sort ---
-    begin = df["Object Begin Date"]
-    century = pd.Series(np.nan, index=df.index, dtype="object")
-    century_sort = pd.Series(np.nan, index=df.index, dtype="float64")
-
-    valid = begin.notna() & (begin != 0)
-    before_3000 = valid & (begin < -3000)
-    bce = valid & (begin < 0) & (begin >= -3000)
-    ce = valid & (begin > 0)
-
-    # Before 3000 BCE
-    century[before_3000] = "Before 3000 BCE"
-    century_sort[before_3000] = -40
-
-    # BCE centuries: e.g. -500 → "5th c. BCE"
-    bce_years = begin[bce].abs()
-    bce_c = ((bce_years - 1) // 100 + 1).astype(int)
-    century[bce] = bce_c.astype(str) + _ordinal_suffix_series(bce_c) + " c. BCE"
-    century_sort[bce] = -bce_c.astype(float)
-
-    # CE centuries: e.g. 1500 → "16th c."
-    ce_c = ((begin[ce] - 1) // 100 + 1).astype(int)
-    century[ce] = ce_c.astype(str) + _ordinal_suffix_series(ce_c) + " c."
-    century_sort[ce] = ce_c.astype(float)
-
-    # Zero / missing → Undated
-    undated = begin.isna() | (begin == 0)
-    century[undated] = "Undated"
-    century_sort[undated] = 999
-
-    df["Century"] = century
-    df["Century Sort"] = century_sort
-
-    # --- Derived: Era ---
+    # --- Derived: Century, Century Sort and Era ---
+    begin = df["Object Begin Date"].to_numpy(dtype="float64", na_value=np.nan)
+    df["Century"], df["Century Sort"] = _assign_century(begin)
     df["Era"] = _assign_era(begin)
 
     # --- Derived: On View ---
@@ -108,43 +216,79 @@ def load_data():
         .replace("", np.nan)
     )
 
-    # --- Derived: Met URL ---
-    df["Met URL"] = df["Link Resource"].fillna("")
 
-    # --- Convert low-cardinality string columns to category ---
-    for col in CATEGORY_COLUMNS:
+def _compact(df):
+    """Categories, Arrow strings and narrow numerics, in place."""
+    for col in CATEGORY_COLUMNS + DERIVED_CATEGORY_COLUMNS:
         if col in df.columns:
             df[col] = df[col].astype("category")
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(STRING_DTYPE)
+    for col, dtype in NUMERIC_DTYPES.items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype)
+
+
+def met_url(object_ids):
+    """Met collection page URLs for a Series of Object IDs (derived, not stored)."""
+    return MET_URL_PREFIX + object_ids.astype(str)
+
+
+def load_related(path=RELATED_PATH):
+    """The scraper's "more like this" lists, Object ID -> [[Object ID, score], ...]; {} if not built."""
+    if not os.path.exists(path):
+        return {}
+    return _read_related(path, os.path.getmtime(path))
+
+
+@st.cache_resource(show_spinner=False)
+def _read_related(path, mtime):
+    with open(path) as f:
+        return {int(k): v for k, v in json.load(f).items()}
 
-    return df
 
+def _ordinal(n):
+    """1 → '1st', 12 → '12th', 22 → '22nd'."""
+    suffix = "th" if 11 <= n % 100 <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
 
-def _ordinal_suffix_series(s):
-    """Return a Series of ordinal suffixes ('st','nd','rd','th') for integer Series."""
-    suffix = pd.Series("th", index=s.index)
-    suffix[s % 10 == 1] = "st"
-    suffix[s % 10 == 2] = "nd"
-    suffix[s % 10 == 3] = "rd"
-    suffix[(s % 100 >= 11) & (s % 100 <= 13)] = "th"
-    return suffix
+
+def _assign_century(begin):
+    """Century label (categorical, chronological) and Century Sort for an array of years.
+
+    Computes each row's index into a label table built once per call —
+    Before 3000 BCE, 30th..0th c. BCE, 0th..Nth c., Undated — so no strings
+    are built per row. -500 → "5th c. BCE" (-5), 1500 → "16th c." (16),
+    0 or missing → "Undated" (999).
+    """
+    undated = np.isnan(begin) | (begin == 0)
+    years = np.where(undated, 1, begin)
+    c = ((np.abs(years) - 1) // 100 + 1).astype(np.int64)  # century number, as in "5th"
+    ce_max = int(c[years > 0].max()) if (years > 0).any() else 0
+
+    labels = (["Before 3000 BCE"]
+              + [f"{_ordinal(n)} c. BCE" for n in range(BCE_CENTURIES, -1, -1)]
+              + [f"{_ordinal(n)} c." for n in range(ce_max + 1)]
+              + ["Undated"])
+    sort = np.array([-40] + [-n for n in range(BCE_CENTURIES, -1, -1)] + list(range(ce_max + 1)) + [999],
+                    dtype="float64")
+    ce0 = BCE_CENTURIES + 2  # index of "0th c."
+
+    codes = np.select(
+        [undated, years < -3000, years < 0],
+        [len(labels) - 1, 0, 1 + BCE_CENTURIES - np.clip(c, 0, BCE_CENTURIES)],
+        ce0 + np.clip(c, 0, ce_max),
+    )
+    century = pd.Categorical.from_codes(codes, categories=labels).remove_unused_categories()
+    return century, sort[codes]
 
 
 def _assign_era(begin):
-    """Assign broad era labels based on Object Begin Date."""
-    era = pd.Series("Unknown", index=begin.index, dtype="object")
-    valid = begin.notna() & (begin != 0)
-    v = begin[valid]
-    era[valid & (v < -3000)] = "Prehistoric"
-    era[valid & (v >= -3000) & (v < -1200)] = "Ancient (3000-1200 BCE)"
-    era[valid & (v >= -1200) & (v < -500)] = "Iron Age (1200-500 BCE)"
-    era[valid & (v >= -500) & (v < 500)] = "Classical (500 BCE-500 CE)"
-    era[valid & (v >= 500) & (v < 1400)] = "Medieval (500-1400)"
-    era[valid & (v >= 1400) & (v < 1600)] = "Renaissance (1400-1600)"
-    era[valid & (v >= 1600) & (v < 1800)] = "Early Modern (1600-1800)"
-    era[valid & (v >= 1800) & (v < 1900)] = "19th Century"
-    era[valid & (v >= 1900) & (v < 2000)] = "20th Century"
-    era[valid & (v >= 2000)] = "21st Century"
-    return era
+    """Broad era (ordered categorical) for an array of years; 0 or missing → Unknown."""
+    codes = np.searchsorted(ERA_BOUNDS, begin, side="right")
+    codes[np.isnan(begin) | (begin == 0)] = len(ERA_ORDER)
+    return pd.Categorical.from_codes(codes, categories=ERA_ORDER + ["Unknown"], ordered=True)
 
 
 def _parse_gender(val):
@@ -168,6 +312,299 @@ def _parse_gender(val):
     return "Male"
 
 
+# ---------------------------------------------------------------------------
+# Artists
+# ---------------------------------------------------------------------------
+
+# Per-object artist fields. Multi-artist objects pipe-join each of them in the same order.
+ARTIST_COLUMNS = [
+    "Artist Display Name", "Constituent ID", "Artist Nationality",
+    "Artist Gender", "Artist Begin Date", "Artist End Date",
+]
+
+# ArtistTable columns that artist_counts() can group by besides Artist ID.
+ARTIST_ATTRIBUTES = ["Nationality", "Gender"]
+
+# Artist tables by frame fingerprint (or DuckDB dataset), like _INTERVALS.
+_ARTISTS = OrderedDict()
+_ARTISTS_MAX = 4
+
+_YEAR = re.compile(r"-?\d{1,4}")
+
+
+def _artist_key(name):
+    """An artist name with case, accents, punctuation and spacing folded, so spelling variants match."""
+    folded = name
+    if not name.isascii():
+        folded = "".join(c for c in unicodedata.normalize("NFKD", name) if not unicodedata.combining(c))
+    folded = " ".join(re.sub(r"[^\w\s]", " ", folded.casefold()).split())
+    return "name:" + (folded or name)
+
+
+def _parts(value, n):
+    """The first n stripped "|" parts of a raw artist field, padded with ""."""
+    if not isinstance(value, str):
+        return [""] * n
+    if n == 1:
+        return [value.split("|", 1)[0].strip()]
+    parts = [p.strip() for p in value.split("|")[:n]]
+    return parts + [""] * (n - len(parts))
+
+
+def _most_common(votes):
+    """The value with the most weight in a {value: weight} dict (first seen on ties), or None."""
+    return max(votes, key=votes.get) if votes else None
+
+
+class ArtistTable:
+    """Deduplicated artists of a frame and the bridge from its objects to them.
+
+    `artists` has one row per artist, indexed by Artist ID: the commonest
+    spelling of the name, the commonest nationality, Gender ("Female" when
+    most of the artist's marked credits say so, "Male" for the rest of the
+    marked ones, missing when never marked, as in _parse_gender), birth and
+    death years and the number of objects. Pipe-joined fields are split
+    and aligned by position. Artists are told apart by Constituent ID; a
+    credit without one takes the ID most often seen with its case, accent and
+    punctuation-folded name, or is keyed by that name if it never has one.
+
+    The bridge is two parallel integer arrays, one entry per (object,
+    artist) credit: `rows` holds the frame's index labels and `artist_ids`
+    the Artist IDs.
+    """
+
+    def __init__(self, df):
+        raw = df[ARTIST_COLUMNS]
+        has = raw["Artist Display Name"].notna().to_numpy(dtype=bool)
+        raw = raw[has]
+        # Objects share a few distinct artist field combinations: split each combination once
+        codes = np.zeros(len(raw), dtype=np.int64)
+        for col in ARTIST_COLUMNS:
+            col_codes, uniques = pd.factorize(raw[col], use_na_sentinel=False)
+            codes, _ = pd.factorize(codes * len(uniques) + col_codes)
+        _, first = np.unique(codes, return_index=True)
+        weights = np.bincount(codes, minlength=len(first))
+
+        combos = []
+        keys = {}  # spelling -> _artist_key(spelling)
+        name_ids = {}  # folded name -> Constituent IDs seen with it
+        for (name, cid, nat, gender, begin, end), w in zip(raw.iloc[first].astype(object).itertuples(index=False),
+                                                           weights):
+            names = [p.strip() for p in name.split("|")]
+            fields = [_parts(v, len(names)) for v in (cid, nat, gender, begin, end)]
+            combos.append((names, fields, isinstance(gender, str), w))
+            for part in names:
+                if part not in keys:
+                    keys[part] = _artist_key(part)
+            for part, part_id in zip(names, fields[0]):
+                if part and part_id:
+                    seen = name_ids.setdefault(keys[part], {})
+                    seen[part_id] = seen.get(part_id, 0) + w
+
+        ids, spellings, nationalities, begins, ends = {}, [], [], [], []
+        female, male = [], []
+        members, offsets = [], [0]
+        for names, (cids, nats, genders, begin_years, end_years), marked, w in combos:
+            credited = []
+            for i, part in enumerate(names):
+                if not part:
+                    continue
+                key = keys[part]
+                part_id = cids[i] or _most_common(name_ids.get(key, {}))
+                if part_id:
+                    key = "id:" + part_id
+                aid = ids.get(key)
+                if aid is None:
+                    aid = ids[key] = len(ids)
+                    for votes in (spellings, nationalities, begins, ends):
+                        votes.append({})
+                    female.append(0)
+                    male.append(0)
+                if aid in credited:
+                    continue
+                credited.append(aid)
+                votes = spellings[aid]
+                votes[part] = votes.get(part, 0) + w
+                if nats[i]:
+                    votes = nationalities[aid]
+                    votes[nats[i]] = votes.get(nats[i], 0) + w
+                if marked:
+                    if genders[i] == "Female":
+                        female[aid] += w
+                    else:
+                        male[aid] += w
+                for years, text in ((begins, begin_years[i]), (ends, end_years[i])):
+                    match = _YEAR.match(text)
+                    if match:
+                        votes, year = years[aid], int(match.group())
+                        votes[year] = votes.get(year, 0) + w
+            members += credited
+            offsets.append(len(members))
+
+        offsets = np.array(offsets, dtype=np.int64)
+        members = np.array(members, dtype=np.int32)
+        lengths = np.diff(offsets)[codes]
+        self.rows = np.repeat(df.index.to_numpy()[has], lengths).astype(np.int64)
+        within = np.arange(len(self.rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        self.artist_ids = members[np.repeat(offsets[:-1][codes], lengths) + within]
+        self._label_bound = int(self.rows.max()) + 1 if len(self.rows) else 0
+
+        female, male = np.array(female, dtype=np.int64), np.array(male, dtype=np.int64)
+        gender = np.where(female > male, "Female", np.where(female + male > 0, "Male", None))
+        self.artists = pd.DataFrame({
+            "Artist": pd.array([_most_common(v) for v in spellings], dtype=STRING_DTYPE),
+            "Nationality": pd.Categorical([_most_common(v) for v in nationalities]),
+            "Gender": pd.Categorical(gender, categories=["Female", "Male"]),
+            "Begin Year": pd.array([_most_common(v) for v in begins], dtype="Int16"),
+            "End Year": pd.array([_most_common(v) for v in ends], dtype="Int16"),
+            "Objects": np.bincount(self.artist_ids, minlength=len(ids)),
+        }, index=pd.RangeIndex(len(ids), name="Artist ID"))
+
+    def __len__(self):
+        return len(self.artists)
+
+    def links(self, labels):
+        """(bridge positions, position in `labels`) of every credit of an object in `labels`."""
+        labels = np.asarray(labels, dtype=np.int64)
+        lookup = np.full(self._label_bound, -1, dtype=np.int64)
+        inside = labels < self._label_bound
+        lookup[labels[inside]] = np.flatnonzero(inside)
+        at = lookup[self.rows]
+        bridge = np.flatnonzero(at >= 0)
+        return bridge, at[bridge]
+
+    def details(self, counts):
+        """`counts` grouped by Artist ID, with each artist's name, nationality and gender added."""
+        cols = [c for c in ["Artist"] + ARTIST_ATTRIBUTES if c not in counts.columns]
+        return counts.join(self.artists[cols], on="Artist ID")
+
+
+def artist_table(df):
+    """The frame's ArtistTable, built once per frame (or per DuckDB dataset)."""
+    if isinstance(df, DuckSource):
+        key, build = df.artists_key, df.build_artist_table
+    else:
+        key, build = _frame_key(df), lambda: ArtistTable(df)
+    table = _ARTISTS.get(key)
+    if table is None:
+        table = build()
+        _ARTISTS[key] = table
+        while len(_ARTISTS) > _ARTISTS_MAX:
+            _ARTISTS.popitem(last=False)
+    else:
+        _ARTISTS.move_to_end(key)
+    return table
+
+
+# ---------------------------------------------------------------------------
+# Tags
+# ---------------------------------------------------------------------------
+
+# Tag matrices by frame fingerprint, like _INTERVALS.
+_TAGS = OrderedDict()
+_TAGS_MAX = 4
+
+# The distinct tags of a row's pipe-joined Tags, as a DuckDB list
+_SQL_TAGS = "list_distinct(list_filter(list_transform(string_split(\"Tags\", '|'), t -> trim(t)), t -> t <> ''))"
+
+
+class TagMatrix:
+    """Sparse object x tag incidence matrix of a frame's Tags column.
+
+    Row i is the frame's i-th row, column j the tag `tags[j]` (alphabetical).
+    A selection of rows becomes a 0/1 (or weight) vector, so tag counts are
+    one sparse matrix-vector product and co-occurrences one sparse
+    matrix-matrix product, with no per-rerun string splitting. A CSC copy
+    gives each tag's rows for the tag filter.
+    """
+
+    def __init__(self, tags, labels):
+        codes, uniques = pd.factorize(tags)
+        vocab, members = {}, []
+        for value in uniques:
+            parts = dict.fromkeys(p.strip() for p in value.split("|"))
+            parts.pop("", None)
+            members.append([vocab.setdefault(p, len(vocab)) for p in parts])
+        names = sorted(vocab)
+        rank = np.empty(len(names), dtype=np.int32)
+        rank[[vocab[t] for t in names]] = np.arange(len(names), dtype=np.int32)
+
+        sizes = np.array([len(m) for m in members] + [0], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        flat = rank[np.array([t for m in members for t in m], dtype=np.int64)]
+        lengths = sizes[codes]  # -1 (no tags) picks the trailing 0
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        within = np.arange(indptr[-1]) - np.repeat(indptr[:-1], lengths)
+        indices = flat[np.repeat(offsets[codes], lengths) + within]
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), indices, indptr), shape=(len(codes), len(names))
+        )
+        self.matrix.sort_indices()
+        self.by_tag = self.matrix.tocsc()
+        self.tags = pd.Index(names, name="Tag")
+        self.totals = np.diff(self.by_tag.indptr)
+        self.labels = np.asarray(labels, dtype=np.int64)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def positions(self, labels):
+        """Matrix rows of the given frame index labels."""
+        labels = np.asarray(labels, dtype=np.int64)
+        if len(labels) == len(self.labels) and np.array_equal(labels, self.labels):
+            return np.arange(len(labels))
+        lookup = pd.Index(self.labels).get_indexer(labels)
+        return lookup[lookup >= 0]
+
+    def tag_ids(self, tags):
+        ids = self.tags.get_indexer(list(tags))
+        return ids[ids >= 0]
+
+    def mask(self, tags):
+        """Rows carrying any of `tags`."""
+        mask = np.zeros(len(self), dtype=bool)
+        for j in self.tag_ids(tags):
+            mask[self.by_tag.indices[self.by_tag.indptr[j]:self.by_tag.indptr[j + 1]]] = True
+        return mask
+
+    def counts(self, rows, weights=None):
+        """Rows (or their summed weights) per tag among the row positions `rows`."""
+        selection = np.zeros(len(self), dtype=np.float64)
+        selection[rows] = 1.0 if weights is None else weights
+        return self.matrix.T @ selection
+
+    def cooccurrence(self, rows, tag_ids, weights=None):
+        """Dense len(tag_ids) x len(tag_ids) matrix: rows carrying both tags (diagonal: each tag)."""
+        sub = self.matrix[rows][:, tag_ids]
+        if weights is not None:
+            return (sub.T.multiply(weights.astype(np.float64)) @ sub).toarray()
+        return (sub.T @ sub).toarray()
+
+
+def tag_matrix(df):
+    """The frame's TagMatrix, built once per frame."""
+    if not HAS_SCIPY:
+        raise ImportError("tag analytics need `pip install scipy`")
+    key = _frame_key(df)
+    tags = _TAGS.get(key)
+    if tags is None:
+        tags = TagMatrix(df["Tags"], df.index)
+        _TAGS[key] = tags
+        while len(_TAGS) > _TAGS_MAX:
+            _TAGS.popitem(last=False)
+    else:
+        _TAGS.move_to_end(key)
+    return tags
+
+
+def tag_values(df):
+    """Every tag, most used first (ties alphabetical)."""
+    if isinstance(df, DuckSource):
+        return df.tag_values()
+    tags = tag_matrix(df)
+    return list(tags.tags[np.argsort(-tags.totals, kind="stable")])
+
+
 # ---------------------------------------------------------------------------
 # Pre-computed aggregations
 # ---------------------------------------------------------------------------
@@ -175,6 +612,8 @@ def _parse_gender(val):
 @st.cache_data(show_spinner=False)
 def precompute_aggregations(_df):
     """Return dict of pre-grouped DataFrames for charting. Prefix _ so Streamlit doesn't hash."""
+    if isinstance(_df, DuckSource):
+        return _aggregations_sql(_df)
     agg = {}
 
     # Department counts
@@ -197,12 +636,6 @@ def precompute_aggregations(_df):
 
     # Era distribution
     era = _df[_df["Era"] != "Unknown"].groupby("Era", observed=True).size().reset_index(name="Count")
-    era_order = [
-        "Prehistoric", "Ancient (3000-1200 BCE)", "Iron Age (1200-500 BCE)",
-        "Classical (500 BCE-500 CE)", "Medieval (500-1400)", "Renaissance (1400-1600)",
-        "Early Modern (1600-1800)", "19th Century", "20th Century", "21st Century",
-    ]
-    era["Era"] = pd.Categorical(era["Era"], categories=era_order, ordered=True)
     era = era.sort_values("Era")
     agg["era_dist"] = era
 
@@ -212,29 +645,14 @@ def precompute_aggregations(_df):
     acq["Cumulative"] = acq["Count"].cumsum()
     agg["acquisitions"] = acq
 
-    # Top artists
-    artists = _df[_df["Has Artist"]].groupby("Artist Display Name").agg(
-        Count=("Object ID", "size"),
-        Nationality=("Primary Nationality", "first"),
-    ).reset_index().sort_values("Count", ascending=False)
-    agg["top_artists"] = artists
-
-    # Artist nationality
-    nat = _df[_df["Primary Nationality"].notna()]["Primary Nationality"].value_counts().head(30).reset_index()
-    nat.columns = ["Nationality", "Count"]
-    agg["artist_nationality"] = nat
-
-    # Gender distribution
-    gender = _df[_df["Gender Clean"].notna()]["Gender Clean"].value_counts().reset_index()
-    gender.columns = ["Gender", "Count"]
-    agg["gender_dist"] = gender
-
-    # Gender over time (by century)
-    gender_time = _df[(_df["Gender Clean"].notna()) & (_df["Century"] != "Undated")].groupby(
-        ["Century", "Century Sort", "Gender Clean"], observed=True
-    ).size().reset_index(name="Count")
-    gender_time = gender_time.sort_values("Century Sort")
-    agg["gender_time"] = gender_time
+    # Artists, nationality and gender, through the artist bridge
+    t = Tables(_df)
+    agg["top_artists"] = t.artist_counts(["Artist ID"]).sort_values("Count", ascending=False, kind="stable")
+    agg["artist_nationality"] = t.artist_counts(["Nationality"], top=30)
+    agg["gender_dist"] = t.artist_counts(["Gender"], top=10**9)
+    agg["gender_time"] = t.artist_counts(
+        ["Century", "Century Sort", "Gender"], (("Century", "!=", "Undated"),)
+    ).sort_values("Century Sort")
 
     # Top mediums
     med = _df[_df["Medium Simple"].notna()]["Medium Simple"].value_counts().head(50).reset_index()
@@ -292,7 +710,6 @@ def precompute_aggregations(_df):
     era_dept = _df[_df["Era"] != "Unknown"].groupby(
         ["Era", "Department"], observed=True
     ).size().reset_index(name="Count")
-    era_dept["Era"] = pd.Categorical(era_dept["Era"], categories=era_order, ordered=True)
     era_dept = era_dept.sort_values("Era")
     agg["era_dept"] = era_dept
 
@@ -303,39 +720,1424 @@ def precompute_aggregations(_df):
 # Filtering
 # ---------------------------------------------------------------------------
 
+# Per-filter boolean masks and facet codes, keyed by a cheap frame fingerprint.
+# Filtered frames and samples are new objects on every call, so object identity
+# can't be used; the fingerprint stays stable for equal frames.
+_MASK_CACHE = {}
+_MASK_CACHE_MAX = 256
+
+# Sidebar facet → filters-dict key that restricts it.
+FACETS = {
+    "Department": "department",
+    "Culture": "culture",
+    "Classification": "classification",
+    "Century": "century",
+    "Is Public Domain": "public_domain",
+    "On View": "on_view",
+}
+
+
+def _frame_key(df):
+    """Fingerprint a DataFrame by length and its Object ID column."""
+    if isinstance(df, DuckSource):
+        return df.key
+    if len(df) == 0:
+        return (0,)
+    ids = df["Object ID"].to_numpy()
+    return (len(df), int(ids[0]), int(ids[-1]), int(ids.sum()))
+
+
+def _cache_get(df, key, build):
+    """Return the cached value for (frame, key), computing it with build() on a miss."""
+    full_key = (_frame_key(df),) + key
+    value = _MASK_CACHE.get(full_key)
+    if value is None:
+        # Also called from the exact-results worker thread, so never re-read after clear()
+        value = build()
+        if len(_MASK_CACHE) >= _MASK_CACHE_MAX:
+            _MASK_CACHE.clear()
+        _MASK_CACHE[full_key] = value
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Date intervals
+# ---------------------------------------------------------------------------
+
+# Interval indexes by frame fingerprint, kept apart from _MASK_CACHE so mask
+# churn doesn't evict the index load_data built. A few frames at most: the
+# collection, its sample and the odd filtered frame.
+_INTERVALS = OrderedDict()
+_INTERVALS_MAX = 4
+
+# How date_min/date_max match an object's [begin, end] span: "overlap" keeps
+# objects made at any time in the range, "within" only those made entirely inside it.
+DATE_MATCHES = ("overlap", "within")
+
+
+class DateIntervals:
+    """Sorted-endpoint index over each row's [Object Begin Date, Object End Date] span.
+
+    A missing end falls back to the begin date and vice versa; undated rows
+    sit at year 0, where the date filters have always put them. Every bound
+    is one binary search into a sorted endpoint array, so counts take
+    O(log n) and masks or row lists cost only the rows they select.
+    """
+
+    def __init__(self, begin, end):
+        begin = np.where(np.isnan(begin), end, begin)
+        end = np.where(np.isnan(end), begin, end)
+        begin, end = np.nan_to_num(begin), np.nan_to_num(end)
+        self.lo = np.minimum(begin, end)
+        self.hi = np.maximum(begin, end)
+        self.by_lo = np.argsort(self.lo, kind="stable")
+        self.by_hi = np.argsort(self.hi, kind="stable")
+        self.lo_sorted = self.lo[self.by_lo]
+        self.hi_sorted = self.hi[self.by_hi]
+
+    def __len__(self):
+        return len(self.lo)
+
+    def _starting_by(self, stop):
+        """Rows with begin <= stop."""
+        return self.by_lo[:np.searchsorted(self.lo_sorted, stop, side="right")]
+
+    def _ending_from(self, start):
+        """Rows with end >= start."""
+        return self.by_hi[np.searchsorted(self.hi_sorted, start, side="left"):]
+
+    def bound_rows(self, name, value, match="overlap"):
+        """Rows passing one date_min/date_max bound under `match`."""
+        if name == "date_min":
+            if match == "within":
+                return self.by_lo[np.searchsorted(self.lo_sorted, value, side="left"):]
+            return self._ending_from(value)
+        if name == "date_max":
+            if match == "within":
+                return self.by_hi[:np.searchsorted(self.hi_sorted, value, side="right")]
+            return self._starting_by(value)
+        raise KeyError(f"Unknown date bound: {name}")
+
+    def bound_mask(self, name, value, match="overlap"):
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.bound_rows(name, value, match)] = True
+        return mask
+
+    def overlapping(self, start, stop):
+        """Sorted positions of rows whose span shares at least one year with [start, stop]."""
+        starting, ending = self._starting_by(stop), self._ending_from(start)
+        if min(len(starting), len(ending)) > len(self) // 8:
+            # Wide window: a straight scan beats gathering and sorting the candidates
+            return np.flatnonzero((self.lo <= stop) & (self.hi >= start))
+        if len(starting) <= len(ending):
+            rows = starting[self.hi[starting] >= start]
+        else:
+            rows = ending[self.lo[ending] <= stop]
+        return np.sort(rows)
+
+    def within(self, start, stop):
+        """Sorted positions of rows whose whole span lies inside [start, stop]."""
+        first = np.searchsorted(self.lo_sorted, start, side="left")
+        last = np.searchsorted(self.lo_sorted, stop, side="right")
+        rows = self.by_lo[first:last]
+        return np.sort(rows[self.hi[rows] <= stop])
+
+    def count_overlapping(self, start, stop):
+        """len(overlapping(start, stop)) from two binary searches."""
+        if start > stop:
+            return len(self.overlapping(start, stop))
+        # Spans starting after stop and spans ending before start can't both hold for one row
+        after = len(self) - np.searchsorted(self.lo_sorted, stop, side="right")
+        before = np.searchsorted(self.hi_sorted, start, side="left")
+        return int(len(self) - after - before)
+
+
+def date_intervals(df):
+    """The frame's DateIntervals, built once per frame."""
+    key = _frame_key(df)
+    intervals = _INTERVALS.get(key)
+    if intervals is None:
+        intervals = DateIntervals(
+            df["Object Begin Date"].to_numpy(dtype="float64", na_value=np.nan),
+            df["Object End Date"].to_numpy(dtype="float64", na_value=np.nan),
+        )
+        _INTERVALS[key] = intervals
+        while len(_INTERVALS) > _INTERVALS_MAX:
+            _INTERVALS.popitem(last=False)
+    else:
+        _INTERVALS.move_to_end(key)
+    return intervals
+
+
+def _freeze(value):
+    """Make a filter value usable as part of a cache key."""
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(value, key=str))
+    return value
+
+
+def _active_filters(filters):
+    """Filters that restrict rows; date_match only changes how the date bounds apply."""
+    return {
+        name: value for name, value in filters.items()
+        if name != "date_match"
+        and not (value is None or (isinstance(value, (list, tuple, set, str)) and not value))
+    }
+
+
+def _build_mask(df, name, value, date_match="overlap"):
+    """Compute the boolean mask (numpy array) for a single filter."""
+    if name in ("department", "culture", "classification", "century"):
+        col = {v: k for k, v in FACETS.items()}[name]
+        return df[col].isin(list(value)).to_numpy(dtype=bool)
+    if name in ("date_min", "date_max"):
+        return date_intervals(df).bound_mask(name, value, date_match)
+    if name == "acc_year_min":
+        return (df["AccessionYear"].fillna(0) >= value).to_numpy(dtype=bool)
+    if name == "acc_year_max":
+        return (df["AccessionYear"].fillna(9999) <= value).to_numpy(dtype=bool)
+    if name == "public_domain":
+        return (df["Is Public Domain"] == value).to_numpy(dtype=bool)
+    if name == "on_view":
+        return (df["On View"] == value).to_numpy(dtype=bool)
+    if name == "tags":
+        return tag_matrix(df).mask(value)
+    if name == "search_text":
+        text = value.lower()
+        text_mask = (
+            df["Title"].astype(str).str.lower().str.contains(text, regex=False)
+            | df["Artist Display Name"].astype(str).str.lower().str.contains(text, regex=False)
+            | df["Object Name"].astype(str).str.lower().str.contains(text, regex=False)
+            | df["Medium"].astype(str).str.lower().str.contains(text, regex=False)
+        )
+        return text_mask.to_numpy(dtype=bool)
+    raise KeyError(f"Unknown filter: {name}")
+
+
+def _filter_masks(df, filters):
+    """Return {filter name: cached boolean mask} for every active filter."""
+    masks = {}
+    date_match = filters.get("date_match") or "overlap"
+    for name, value in _active_filters(filters).items():
+        match = date_match if name in ("date_min", "date_max") else None
+        masks[name] = _cache_get(
+            df, ("mask", name, _freeze(value), match),
+            lambda name=name, value=value, match=match: _build_mask(df, name, value, match),
+        )
+    return masks
+
+
 def filter_dataframe(df, filters):
     """Apply sidebar filters via boolean masking. Returns filtered DataFrame."""
-    mask = pd.Series(True, index=df.index)
+    if isinstance(df, DuckSource):
+        return df.filtered(filters)
+    mask = np.ones(len(df), dtype=bool)
+    for m in _filter_masks(df, filters).values():
+        mask &= m
+    if mask.all():
+        return df
+    return df[mask]
 
-    if filters.get("department"):
-        mask &= df["Department"].isin(filters["department"])
 
-    if filters.get("date_min") is not None:
-        mask &= df["Object Begin Date"].fillna(0) >= filters["date_min"]
+# ---------------------------------------------------------------------------
+# Facets
+# ---------------------------------------------------------------------------
 
-    if filters.get("date_max") is not None:
-        mask &= df["Object Begin Date"].fillna(0) <= filters["date_max"]
+def _build_facet_codes(df, col):
+    """Integer-code a facet column. Returns (codes, labels); missing values get -1."""
+    s = df[col]
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes, labels = s.cat.codes.to_numpy(), s.cat.categories
+    else:
+        codes, labels = pd.factorize(s, sort=True)
+    if col == "Century":
+        # Chronological rather than alphabetical order
+        order = df.groupby("Century", observed=True)["Century Sort"].first().reindex(labels)
+        rank = np.argsort(order.to_numpy(), kind="stable")
+        remap = np.empty_like(rank)
+        remap[rank] = np.arange(len(rank))
+        codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], -1)
+        labels = labels[rank]
+    return np.asarray(codes, dtype=np.int64), pd.Index(labels)
+
+
+def _facet_codes(df, col):
+    return _cache_get(df, ("codes", col), lambda: _build_facet_codes(df, col))
+
+
+def facet_values(df, col):
+    """All values of a facet column, in display order (alphabetical; Century chronological)."""
+    if isinstance(df, DuckSource):
+        return df.facet_values(col)
+    return list(_facet_codes(df, col)[1])
+
+
+def facet_counts(df, filters):
+    """Count every value of every sidebar facet under the current filter state.
+
+    Uses standard faceted-search semantics: each facet is counted against the
+    mask of all *other* filters, so selecting a Department still shows counts
+    for the departments you could switch to. All facets are computed from one
+    stacked pass over the cached per-filter masks: rows that pass every filter
+    count toward every facet, and rows that fail exactly one filter count only
+    toward the facet that filter belongs to.
+
+    On a stratified sample (see stratified_sample) rows are weighted, so the
+    counts estimate the full collection.
+
+    Tags (with scipy) are counted the same way against the tag filter.
+
+    Returns {facet column: Series of counts indexed by value, sorted descending}.
+    """
+    if isinstance(df, DuckSource):
+        return df.facet_counts(filters)
+    masks = _filter_masks(df, filters)
+    weights = df["Weight"].to_numpy() if "Weight" in df.columns else None
+    names = list(masks)
+    n = len(df)
+
+    if names:
+        stacked = np.vstack([masks[k] for k in names])
+        failed = len(names) - stacked.sum(axis=0, dtype=np.int32)
+        passes_all = failed == 0
+        fails_one = failed == 1
+    else:
+        passes_all = np.ones(n, dtype=bool)
+        fails_one = np.zeros(n, dtype=bool)
+
+    counts = {}
+    for col, key in FACETS.items():
+        codes, labels = _facet_codes(df, col)
+        rows = passes_all
+        if key in masks:
+            rows = passes_all | (fails_one & ~masks[key])
+        sel = codes[rows]
+        if weights is None:
+            tally = np.bincount(sel[sel >= 0], minlength=len(labels))
+        else:
+            w = weights[rows][sel >= 0]
+            tally = np.rint(np.bincount(sel[sel >= 0], weights=w, minlength=len(labels))).astype(np.int64)
+        series = pd.Series(tally, index=labels, name="Count")
+        counts[col] = series[series > 0].sort_values(ascending=False, kind="stable")
+
+    if HAS_SCIPY:
+        rows = passes_all | (fails_one & ~masks["tags"]) if "tags" in masks else passes_all
+        tags = tag_matrix(df)
+        tally = tags.counts(np.flatnonzero(rows), None if weights is None else weights[rows])
+        series = pd.Series(np.rint(tally).astype(np.int64), index=tags.tags, name="Count")
+        counts["Tags"] = series[series > 0].sort_values(ascending=False, kind="stable")
+    return counts
 
-    if filters.get("acc_year_min") is not None:
-        mask &= df["AccessionYear"].fillna(0) >= filters["acc_year_min"]
 
-    if filters.get("acc_year_max") is not None:
-        mask &= df["AccessionYear"].fillna(9999) <= filters["acc_year_max"]
+# ---------------------------------------------------------------------------
+# Approximate mode
+# ---------------------------------------------------------------------------
 
-    if filters.get("public_domain") is not None:
-        mask &= df["Is Public Domain"] == filters["public_domain"]
+# Sample share per Department, with a floor so small departments stay estimable.
+SAMPLE_RATE = 0.02
+SAMPLE_MIN_PER_STRATUM = 500
+STRATUM_COLUMN = "Department"
+CI_Z = 1.96  # 95% normal-approximation intervals
+
+
+def stratified_sample(df, rate=SAMPLE_RATE, min_per_stratum=SAMPLE_MIN_PER_STRATUM, seed=0):
+    """Sample each Department at `rate` (at least min_per_stratum rows, or all of it).
+
+    Adds Weight (collection rows each sampled row stands for), Stratum and
+    Stratum Rows (sampled rows in that Department), which Tables needs to
+    scale counts up and compute their intervals.
+    """
+    if isinstance(df, DuckSource):
+        return df.stratified_sample(rate, min_per_stratum, seed)
+    codes, _ = pd.factorize(df[STRATUM_COLUMN], use_na_sentinel=False)
+    sizes = np.bincount(codes)
+    take = np.minimum(sizes, np.maximum(min_per_stratum, np.ceil(sizes * rate))).astype(np.int64)
+
+    # Random order within each stratum; keep the first take[h] rows of each
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(df)), codes))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.arange(len(df)) - starts[codes[order]]
+    keep = np.sort(order[rank < take[codes[order]]])
+
+    sample = df.iloc[keep].copy()
+    h = codes[keep]
+    sample["Weight"] = (sizes[h] / take[h]).astype("float32")
+    sample["Stratum"] = h.astype("int16")
+    sample["Stratum Rows"] = take[h].astype("int32")
+    return sample
+
+
+@st.cache_resource(show_spinner="Drawing stratified sample…")
+def load_sample(path=DATA_PATH, rate=SAMPLE_RATE):
+    """Stratified sample of load_data(path), kept alongside the full frame."""
+    return stratified_sample(load_data(path), rate)
+
+
+def _estimate(rows, by):
+    """Weighted counts per group of a filtered sample, with 95% interval bounds.
+
+    Count is the Horvitz-Thompson total. Its variance sums, over strata, the
+    stratified-sampling variance of the group's indicator:
+    N_h^2 (1 - n_h/N_h) p(1 - p) / (n_h - 1), with p the group's share of the
+    stratum's sampled rows.
+    """
+    per_stratum = rows.groupby(list(by) + ["Stratum"], observed=True).agg(
+        c=("Weight", "size"), w=("Weight", "first"), n=("Stratum Rows", "first"),
+    )
+    c, w, n = (per_stratum[k].to_numpy(dtype="float64") for k in ("c", "w", "n"))
+    p = c / n
+    var = (w * n) ** 2 * (1 - 1 / w) * p * (1 - p) / np.maximum(n - 1, 1)
+    parts = pd.DataFrame({"Count": w * c, "var": var, "Sampled": c}, index=per_stratum.index)
+    if by:
+        totals = parts.groupby(level=list(range(len(by))), observed=True).sum()
+    else:
+        totals = parts.sum().to_frame().T
+    half = CI_Z * np.sqrt(totals["var"])
+    out = pd.DataFrame({
+        "Count": np.rint(totals["Count"]).astype(np.int64),
+        # At least the sampled rows themselves are known to exist
+        "Low": np.rint(np.maximum(totals["Sampled"], totals["Count"] - half)).astype(np.int64),
+        "High": np.rint(totals["Count"] + half).astype(np.int64),
+    }, index=totals.index)
+    return out
+
+
+class _BaseTables:
+    """Request memo and replay shared by Tables and DuckTables.
+
+    Each request is a (method name, *args) tuple; subclasses compute the
+    result in their methods and store it through _get().
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.requests = []
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def _get(self, request, build):
+        value = self._memo.get(request)
+        if value is None:
+            # The script thread and the background worker may share a Tables
+            value = build()
+            with self._lock:
+                value = self._memo.setdefault(request, value)
+        if request not in self.requests:
+            self.requests.append(request)
+        return value
+
+    def view(self):
+        """A Tables sharing this one's results that records only its own requests."""
+        view = copy.copy(self)
+        view.requests = []
+        return view
+
+    def replay(self, requests):
+        """Compute each recorded request; ones this frame can't answer are skipped."""
+        for name, *args in requests:
+            try:
+                getattr(self, name)(*args)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                continue
+
+
+class Tables(_BaseTables):
+    """Count tables for one filtered frame, memoized per request.
+
+    Built from the full data the counts are exact. Built from a filtered
+    stratified sample (a frame with a Weight column) they are estimates for the
+    full collection, with Low/High columns bounding a 95% interval. Every
+    request is recorded in `requests` so the same ones can be replayed
+    against the full data or another filter state.
+
+    `where` is a tuple of (column, op, value) conditions, op one of "==",
+    "!=", "in", "notna". `artists` and `tags` are the ArtistTable and
+    TagMatrix of the frame fdf was filtered from, so filtered frames share them.
+    """
+
+    def __init__(self, fdf, artists=None, tags=None):
+        super().__init__(fdf)
+        self.artists = artists
+        self.tags = tags
+        self.approximate = "Weight" in fdf.columns
+
+    def rows(self, where=()):
+        f = self.frame
+        for col, op, value in where:
+            if op == "==":
+                f = f[f[col] == value]
+            elif op == "!=":
+                f = f[f[col] != value]
+            elif op == "in":
+                f = f[f[col].isin(list(value))]
+            elif op == "notna":
+                f = f[f[col].notna()]
+            else:
+                raise ValueError(f"Unknown condition: {op}")
+        return f
+
+    def counts(self, by, where=(), top=None):
+        """Rows per distinct value of the `by` columns (missing values dropped).
+
+        With top, the top-N groups by count, largest first; otherwise in group order.
+        """
+        by, where = tuple(by), tuple(where)
+
+        def build():
+            rows = self.rows(where)
+            if self.approximate:
+                out = _estimate(rows, by).reset_index()
+            else:
+                out = rows.groupby(list(by), observed=True).size().reset_index(name="Count")
+            if top is not None:
+                out = out.sort_values("Count", ascending=False, kind="stable").head(top)
+            return out.reset_index(drop=True)
+
+        return self._get(("counts", by, where, top), build)
+
+    def artist_counts(self, by, where=(), top=None):
+        """Objects per group of artist and frame columns, through the artist bridge.
+
+        `by` mixes Artist ID or ARTIST_ATTRIBUTES with frame columns such as
+        Century. An object counts once per group, however many of its
+        artists share it. Grouped by Artist ID, each row also gets the
+        artist's name, nationality and gender.
+        """
+        by, where = tuple(by), tuple(where)
+
+        def build():
+            rows = self.rows(where)
+            table = self.artists if self.artists is not None else artist_table(self.frame)
+            bridge, at = table.links(rows.index)
+            ids = table.artist_ids[bridge]
+            cols = {"Row": at, "Artist ID": ids}
+            for col in by:
+                if col in ARTIST_ATTRIBUTES:
+                    cols[col] = table.artists[col].array.take(ids)
+                elif col != "Artist ID":
+                    cols[col] = rows[col].array.take(at)
+            if self.approximate:
+                for col in ("Weight", "Stratum", "Stratum Rows"):
+                    cols[col] = rows[col].to_numpy()[at]
+            links = pd.DataFrame(cols)
+            if "Artist ID" not in by:
+                links = links.drop_duplicates(["Row", *by])
+            if self.approximate:
+                out = _estimate(links, by).reset_index()
+            else:
+                out = links.groupby(list(by), observed=True).size().reset_index(name="Count")
+            if top is not None:
+                out = out.sort_values("Count", ascending=False, kind="stable").head(top)
+            out = out.reset_index(drop=True)
+            return table.details(out) if "Artist ID" in by else out
+
+        return self._get(("artist_counts", by, where, top), build)
+
+    def _tag_rows(self, where):
+        rows = self.rows(where)
+        tags = self.tags if self.tags is not None else tag_matrix(self.frame)
+        weights = rows["Weight"].to_numpy(dtype=np.float64) if self.approximate else None
+        return rows, tags, tags.positions(rows.index), weights
+
+    def tag_counts(self, where=(), top=None):
+        """Objects per tag (Tag, Count), like counts() on a multi-valued column."""
+        where = tuple(where)
+
+        def build():
+            rows, tags, pos, weights = self._tag_rows(where)
+            if self.approximate:
+                sub = tags.matrix[pos]
+                at = np.repeat(np.arange(len(pos)), np.diff(sub.indptr))
+                links = pd.DataFrame({
+                    "Tag": pd.Categorical.from_codes(sub.indices, categories=tags.tags),
+                    **{c: rows[c].to_numpy()[at] for c in ("Weight", "Stratum", "Stratum Rows")},
+                })
+                out = _estimate(links, ("Tag",)).reset_index()
+            else:
+                tally = np.rint(tags.counts(pos)).astype(np.int64)
+                out = pd.DataFrame({"Tag": tags.tags, "Count": tally})
+                out = out[out["Count"] > 0]
+            if top is not None:
+                out = out.sort_values("Count", ascending=False, kind="stable").head(top)
+            return out.reset_index(drop=True)
+
+        return self._get(("tag_counts", where, top), build)
+
+    def tag_cooccurrence(self, tags, where=()):
+        """Objects carrying each pair of `tags` (Tag, Other Tag, Count); a tag paired with itself is its count."""
+        tags, where = tuple(tags), tuple(where)
+
+        def build():
+            rows, matrix, pos, weights = self._tag_rows(where)
+            ids = np.sort(matrix.tag_ids(tags))  # alphabetical, like the SQL
+            pairs = np.rint(matrix.cooccurrence(pos, ids, weights)).astype(np.int64)
+            names = matrix.tags[ids]
+            out = pd.DataFrame({
+                "Tag": np.repeat(names, len(ids)), "Other Tag": np.tile(names, len(ids)), "Count": pairs.ravel(),
+            })
+            return out[out["Count"] > 0].reset_index(drop=True)
+
+        return self._get(("tag_cooccurrence", tags, where), build)
+
+    def total(self, where=()):
+        """Rows matching `where`, as (count, low, high); low == high when exact."""
+        where = tuple(where)
+
+        def build():
+            rows = self.rows(where)
+            if not self.approximate:
+                return len(rows), len(rows), len(rows)
+            if len(rows) == 0:
+                return 0, 0, 0
+            est = _estimate(rows, ()).iloc[0]
+            return int(est["Count"]), int(est["Low"]), int(est["High"])
+
+        return self._get(("total", where), build)
+
+    def fill_rate(self, col, where=()):
+        """Share of rows matching `where` that have a value in `col`."""
+        where = tuple(where)
+
+        def build():
+            rows = self.rows(where)
+            filled = rows[col].notna()
+            if not self.approximate:
+                return float(filled.mean()) if len(rows) else float("nan")
+            w = rows["Weight"]
+            return float((w * filled).sum() / w.sum()) if len(rows) else float("nan")
+
+        return self._get(("fill_rate", col, where), build)
+
+    def means(self, by, col, where=()):
+        """Mean of `col` per group (e.g. the public-domain rate per Department)."""
+        by, where = tuple(by), tuple(where)
+
+        def build():
+            rows = self.rows(where)
+            y = rows[col].astype("float64")
+            if self.approximate:
+                w = rows["Weight"].astype("float64")
+                grouped = pd.DataFrame({"wy": w * y, "w": w}).groupby(
+                    [rows[c] for c in by], observed=True).sum()
+                out = (grouped["wy"] / grouped["w"]).rename(col)
+            else:
+                out = y.groupby([rows[c] for c in by], observed=True).mean()
+            return out.reset_index()
+
+        return self._get(("means", by, col, where), build)
+
+    def histogram(self, col, bins=50, where=()):
+        """Equal-width histogram of `col`: Start, End and Count per bin."""
+        where = tuple(where)
+
+        def build():
+            rows = self.rows(where + ((col, "notna", None),))
+            weights = rows["Weight"] if self.approximate else None
+            counts, edges = np.histogram(rows[col].astype("float64"), bins=bins, weights=weights)
+            return pd.DataFrame({"Start": edges[:-1], "End": edges[1:], "Count": np.rint(counts).astype(np.int64)})
+
+        return self._get(("histogram", col, bins, where), build)
+
+    def first_values(self, key, keys, col):
+        """First non-missing `col` for each of `keys` in column `key` (a Series indexed by key)."""
+        keys = tuple(keys)
+
+        def build():
+            rows = self.rows(((key, "in", keys),))
+            return rows.groupby(key, observed=True)[col].first()
+
+        return self._get(("first_values", key, keys, col), build)
+
+    def search(self, text, sort_by, ascending=True, limit=100, where=()):
+        """Objects whose title, artist or object name contains `text`.
+
+        Returns (matches, up to `limit` rows sorted by `sort_by`); matches is
+        an estimate on a sample.
+        """
+        text, where = text.strip().lower(), tuple(where)
+
+        def build():
+            rows = self.rows(where)
+            if text:
+                rows = rows[
+                    _contains(rows["Title"], text)
+                    | _contains(rows["Artist Display Name"], text)
+                    | _contains(rows["Object Name"], text)
+                ]
+            total = int(rows["Weight"].sum()) if self.approximate else len(rows)
+            top = rows.sort_values(sort_by, ascending=ascending, na_position="last", kind="stable").head(limit)
+            return total, top
+
+        return self._get(("search", text, sort_by, ascending, limit, where), build)
+
+
+def _contains(s, text):
+    return s.str.lower().str.contains(text, regex=False, na=False).to_numpy(dtype=bool)
+
+
+def tables_for(fdf, artists=None, tags=None):
+    """Tables for a filtered DataFrame, or DuckTables for a filtered DuckSource."""
+    if isinstance(fdf, DuckSource):
+        return DuckTables(fdf)
+    return Tables(fdf, artists, tags)
 
-    if filters.get("on_view") is not None:
-        mask &= df["On View"] == filters["on_view"]
 
-    if filters.get("search_text"):
-        text = filters["search_text"].lower()
-        text_mask = (
-            df["Title"].astype(str).str.lower().str.contains(text, regex=False)
-            | df["Artist Display Name"].astype(str).str.lower().str.contains(text, regex=False)
-            | df["Object Name"].astype(str).str.lower().str.contains(text, regex=False)
-            | df["Medium"].astype(str).str.lower().str.contains(text, regex=False)
+# ---------------------------------------------------------------------------
+# Tables cache and background warm-up
+# ---------------------------------------------------------------------------
+
+# The sidebar's filter state when no widget has been touched.
+DEFAULT_FILTERS = {
+    "date_min": -3000, "date_max": 2025, "date_match": "overlap", "acc_year_min": 1870, "acc_year_max": 2025,
+}
+
+# Filter-state counts and per-page Tables requests seen so far, used to pick
+# what to pre-compute on the next start. Set MET_USAGE_PATH="" to disable.
+USAGE_PATH = os.environ.get("MET_USAGE_PATH", os.path.join(os.path.dirname(__file__), ".dashboard_usage.json"))
+USAGE_SAVE_EVERY = 10
+WARM_POPULAR_STATES = 8
+WARM_MAX_REQUESTS = 200
+
+# Tables per (frame, filter state), as futures: built by the script thread or
+# by the background worker, most recently used last. Least recently used
+# entries are evicted once their filtered frames exceed MET_TABLES_CACHE_MB.
+TABLES_CACHE_BYTES = int(os.environ.get("MET_TABLES_CACHE_MB", 512)) * 2**20
+TABLES_ENTRY_BYTES = 2**20  # floor per entry, for the memoized count tables
+_TABLES = OrderedDict()
+_TABLES_LOCK = threading.Lock()
+_WORKER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tables-worker")
+_WARMED = set()
+_USAGE = None
+_USAGE_LOCK = threading.Lock()
+
+
+def _tables_key(df, filters):
+    return (_frame_key(df), tuple(sorted((k, _freeze(v)) for k, v in filters.items())))
+
+
+def _build_tables(df, filters, requests=()):
+    tags = tag_matrix(df) if HAS_SCIPY and not isinstance(df, DuckSource) else None
+    fdf = filter_dataframe(df, filters)
+    tables = tables_for(fdf, artist_table(df), tags)
+    # A frame the filters left whole is shared with the caller, so costs nothing extra
+    own = isinstance(fdf, pd.DataFrame) and fdf is not df
+    tables.nbytes = TABLES_ENTRY_BYTES + (int(fdf.memory_usage(deep=True).sum()) if own else 0)
+    tables.replay(requests)
+    return tables
+
+
+def _lookup(key):
+    """The cached future for key, or None. Failed and cancelled builds are dropped."""
+    with _TABLES_LOCK:
+        future = _TABLES.get(key)
+        if future is not None and future.done() and (future.cancelled() or future.exception() is not None):
+            del _TABLES[key]
+            return None
+        if future is not None:
+            _TABLES.move_to_end(key)
+        return future
+
+
+def _evict(_future=None):
+    """Drop least recently used built Tables until the cache fits TABLES_CACHE_BYTES."""
+    with _TABLES_LOCK:
+        built = [(key, f) for key, f in _TABLES.items() if f.done() and not f.cancelled() and f.exception() is None]
+        total = sum(f.result().nbytes for _, f in built)
+        for key, f in built[:-1]:
+            if total <= TABLES_CACHE_BYTES:
+                break
+            del _TABLES[key]
+            total -= f.result().nbytes
+
+
+def _store(key, future):
+    with _TABLES_LOCK:
+        _TABLES[key] = future
+        _TABLES.move_to_end(key)
+    future.add_done_callback(_evict)
+
+
+def _submit(df, filters, requests):
+    key = _tables_key(df, filters)
+    future = _lookup(key)
+    if future is None:
+        _store(key, _WORKER.submit(_build_tables, df, filters, list(requests)))
+    elif requests:
+        # Already cached or queued: compute any requests it doesn't have yet
+        _WORKER.submit(lambda: future.result().replay(requests))
+
+
+def cached_tables(df, filters):
+    """Tables for this filter state: from the cache when built or being built, else built now.
+
+    A warm-up still waiting in the worker's queue is cancelled and built here
+    instead of waiting behind the states queued before it.
+    """
+    key = _tables_key(df, filters)
+    future = _lookup(key)
+    if future is not None and not future.cancel():
+        return future.result()
+    tables = _build_tables(df, filters)
+    done = Future()
+    done.set_result(tables)
+    _store(key, done)
+    return tables
+
+
+def exact_tables(df, filters):
+    """Exact Tables for this filter state if already built, else None (never blocks)."""
+    future = _lookup(_tables_key(df, filters))
+    if future is None or not future.done():
+        return None
+    return future.result()
+
+
+def schedule_exact(df, filters, requests):
+    """Build exact Tables for this filter state in the background, replaying `requests`."""
+    _submit(df, filters, requests)
+
+
+def common_filter_states(df):
+    """Filter states most first views land on: defaults, each Department, public domain, on view."""
+    states = [dict(DEFAULT_FILTERS)]
+    states += [{**DEFAULT_FILTERS, "public_domain": True}, {**DEFAULT_FILTERS, "on_view": True}]
+    states += [{**DEFAULT_FILTERS, "department": [d]} for d in facet_values(df, "Department")]
+    return states
+
+
+def _as_key(value):
+    """JSON lists back to the tuples Tables requests and filter keys are made of."""
+    if isinstance(value, list):
+        return tuple(_as_key(v) for v in value)
+    return value
+
+
+def _load_usage():
+    global _USAGE
+    if _USAGE is None:
+        _USAGE = {"states": {}, "requests": {}, "unsaved": 0}
+        if USAGE_PATH and os.path.exists(USAGE_PATH):
+            try:
+                with open(USAGE_PATH) as f:
+                    saved = json.load(f)
+                _USAGE["states"] = {json.dumps(s["filters"], sort_keys=True): s for s in saved.get("states", [])}
+                _USAGE["requests"] = {
+                    page: [_as_key(r) for r in reqs] for page, reqs in saved.get("requests", {}).items()
+                }
+            except (OSError, ValueError, KeyError, TypeError):
+                pass  # a corrupt usage file only costs the warm-up
+    return _USAGE
+
+
+def _save_usage(usage):
+    if not USAGE_PATH:
+        return
+    data = {
+        "states": sorted(usage["states"].values(), key=lambda s: -s["count"]),
+        "requests": usage["requests"],
+    }
+    tmp = USAGE_PATH + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, default=str)
+    os.replace(tmp, USAGE_PATH)
+    usage["unsaved"] = 0
+
+
+def record_usage(filters, page, requests):
+    """Count this filter state and remember which Tables requests the page made."""
+    with _USAGE_LOCK:
+        usage = _load_usage()
+        state_key = json.dumps(filters, sort_keys=True, default=str)
+        entry = usage["states"].setdefault(state_key, {"filters": filters, "count": 0})
+        entry["count"] += 1
+        known = usage["requests"].setdefault(page, [])
+        for request in requests:
+            if request not in known:
+                known.append(request)
+        del known[:-WARM_MAX_REQUESTS]
+        usage["unsaved"] += 1
+        if usage["unsaved"] >= USAGE_SAVE_EVERY:
+            try:
+                _save_usage(usage)
+            except OSError:
+                pass
+
+
+def learned_requests(exclude_page=None):
+    """Every Tables request recorded for any page (except exclude_page)."""
+    with _USAGE_LOCK:
+        usage = _load_usage()
+        return [r for page, reqs in usage["requests"].items() if page != exclude_page for r in reqs]
+
+
+def warm_up(df):
+    """Queue Tables for the common and the most-used filter states on the worker thread.
+
+    Runs once per frame. Each state replays the requests pages have made
+    before, so a first view of a warmed state renders entirely from cache.
+    """
+    frame = _frame_key(df)
+    if frame in _WARMED:
+        return
+    _WARMED.add(frame)
+    with _USAGE_LOCK:
+        usage = _load_usage()
+        popular = sorted(usage["states"].values(), key=lambda s: -s["count"])[:WARM_POPULAR_STATES]
+    requests = learned_requests()
+    for filters in [dict(s["filters"]) for s in popular] + common_filter_states(df):
+        _submit(df, filters, requests)
+
+
+def prefetch(df, filters, page):
+    """After a page renders, compute the other pages' known requests for the same filters."""
+    requests = learned_requests(exclude_page=page)
+    if requests:
+        _submit(df, filters, requests)
+
+
+# ---------------------------------------------------------------------------
+# DuckDB backend
+# ---------------------------------------------------------------------------
+
+# Rows per CSV chunk when converting to Parquet; bounds peak memory of the conversion.
+PARQUET_CHUNK_ROWS = 250_000
+
+# Column types in the Parquet dataset. Categoricals are stored as plain strings.
+SQL_TYPES = {
+    **{col: "VARCHAR" for col in USE_COLUMNS},
+    "Object ID": "INTEGER",
+    "Is Highlight": "BOOLEAN",
+    "Is Public Domain": "BOOLEAN",
+    "AccessionYear": "SMALLINT",
+    "Object Begin Date": "FLOAT",
+    "Object End Date": "FLOAT",
+    "Century": "VARCHAR",
+    "Century Sort": "SMALLINT",
+    "Era": "VARCHAR",
+    "On View": "BOOLEAN",
+    "Primary Nationality": "VARCHAR",
+    "Has Artist": "BOOLEAN",
+    "Gender Clean": "VARCHAR",
+    "Medium Simple": "VARCHAR",
+}
+
+
+def _q(col):
+    """Quote a column name as an SQL identifier."""
+    return '"' + col.replace('"', '""') + '"'
+
+
+def build_parquet(path=DATA_PATH, chunk_rows=PARQUET_CHUNK_ROWS):
+    """Convert the CSV to a Parquet dataset (a directory of parts) next to it.
+
+    Reads and derives columns one chunk at a time, so the CSV never has to fit
+    in memory. Skipped when the dataset is newer than the CSV and has every
+    SQL_TYPES column. Returns its path.
+    """
+    if not HAS_DUCKDB:
+        raise ImportError("the duckdb backend needs `pip install duckdb`")
+    dataset = os.path.splitext(path)[0] + ".parquet"
+    if (os.path.isdir(dataset) and os.path.getmtime(dataset) >= os.path.getmtime(path)
+            and _dataset_columns(dataset) >= SQL_TYPES.keys()):
+        return dataset
+
+    tmp = dataset + ".tmp"
+    if os.path.isdir(tmp):
+        for name in os.listdir(tmp):
+            os.remove(os.path.join(tmp, name))
+    else:
+        os.makedirs(tmp)
+    con = duckdb.connect()
+    select = ", ".join(f"CAST({_q(c)} AS {t}) AS {_q(c)}" for c, t in SQL_TYPES.items())
+    reader = pd.read_csv(path, usecols=USE_COLUMNS, dtype=CSV_DTYPES, chunksize=chunk_rows, low_memory=False)
+    for i, chunk in enumerate(reader):
+        _derive_columns(chunk)
+        con.register("chunk", chunk)
+        part = os.path.join(tmp, f"part-{i:05d}.parquet").replace("'", "''")
+        con.execute(f"COPY (SELECT {select} FROM chunk) TO '{part}' (FORMAT parquet)")
+        con.unregister("chunk")
+    con.close()
+
+    if os.path.isdir(dataset):
+        old = dataset + ".old"
+        os.rename(dataset, old)
+        os.rename(tmp, dataset)
+        for name in os.listdir(old):
+            os.remove(os.path.join(old, name))
+        os.rmdir(old)
+    else:
+        os.rename(tmp, dataset)
+    return dataset
+
+
+def _dataset_columns(dataset):
+    """Column names of an existing Parquet dataset (empty if it has no parts)."""
+    pattern = os.path.join(dataset, "*.parquet").replace("'", "''")
+    try:
+        return set(duckdb.connect().execute(f"DESCRIBE SELECT * FROM read_parquet('{pattern}')").fetchdf()["column_name"])
+    except duckdb.Error:
+        return set()
+
+
+def _restore_dtypes(df):
+    """Give a frame read back from SQL the dtypes load_data produces."""
+    if "Century" in df.columns and "Century Sort" in df.columns:
+        order = df.groupby("Century")["Century Sort"].first().sort_values()
+        df["Century"] = pd.Categorical(df["Century"], categories=order.index)
+    if "Era" in df.columns:
+        df["Era"] = pd.Categorical(df["Era"], categories=ERA_ORDER + ["Unknown"], ordered=True)
+    _compact(df)
+    return df
+
+
+def _sql_condition(col, op, value):
+    """One (column, op, value) condition as (SQL, params), with pandas NaN semantics."""
+    if op == "==":
+        return f"{_q(col)} = ?", [value]
+    if op == "!=":
+        return f"{_q(col)} IS DISTINCT FROM ?", [value]
+    if op == "in":
+        if not value:
+            return "FALSE", []
+        return f"{_q(col)} IN ({', '.join('?' * len(value))})", list(value)
+    if op == "notna":
+        return f"{_q(col)} IS NOT NULL", []
+    raise ValueError(f"Unknown condition: {op}")
+
+
+# A row's date span as DateIntervals sees it
+_SQL_DATE_BEGIN = 'coalesce("Object Begin Date", "Object End Date", 0)'
+_SQL_DATE_END = 'coalesce("Object End Date", "Object Begin Date", 0)'
+_SQL_DATE_LO = f"least({_SQL_DATE_BEGIN}, {_SQL_DATE_END})"
+_SQL_DATE_HI = f"greatest({_SQL_DATE_BEGIN}, {_SQL_DATE_END})"
+
+
+def _sql_filter(name, value, date_match="overlap"):
+    """The SQL equivalent of _build_mask(df, name, value, date_match)."""
+    if name in ("department", "culture", "classification", "century"):
+        col = {v: k for k, v in FACETS.items()}[name]
+        return _sql_condition(col, "in", list(value))
+    if name == "date_min":
+        return f"{_SQL_DATE_LO if date_match == 'within' else _SQL_DATE_HI} >= ?", [value]
+    if name == "date_max":
+        return f"{_SQL_DATE_HI if date_match == 'within' else _SQL_DATE_LO} <= ?", [value]
+    if name == "acc_year_min":
+        return 'coalesce("AccessionYear", 0) >= ?', [value]
+    if name == "acc_year_max":
+        return 'coalesce("AccessionYear", 9999) <= ?', [value]
+    if name == "public_domain":
+        return '"Is Public Domain" = ?', [value]
+    if name == "on_view":
+        return '"On View" = ?', [value]
+    if name == "tags":
+        return f"list_has_any({_SQL_TAGS}, ?)", [list(value)]
+    if name == "search_text":
+        cols = ("Title", "Artist Display Name", "Object Name", "Medium")
+        return "(" + " OR ".join(f"contains(lower({_q(c)}), ?)" for c in cols) + ")", [value.lower()] * 4
+    raise KeyError(f"Unknown filter: {name}")
+
+
+def _sql_order(by):
+    """ORDER BY terms for a GROUP BY matching pandas' group order: Century and Era chronological."""
+    terms = []
+    for col in by:
+        if col == "Century":
+            terms.append('min("Century Sort")')
+        elif col == "Era":
+            labels = ", ".join("'" + e + "'" for e in ERA_ORDER + ["Unknown"])
+            terms.append(f'list_position([{labels}], "Era")')
+        else:
+            terms.append(_q(col))
+    return ", ".join(terms)
+
+
+class DuckSource:
+    """The Parquet dataset, queried through DuckDB, standing in for the DataFrame.
+
+    Holds WHERE conditions instead of rows: filter_dataframe narrows them,
+    DuckTables turns requests into GROUP BY queries, and only the small
+    result frames come back into pandas.
+    """
+
+    def __init__(self, dataset, con=None, where=(), params=()):
+        self.dataset = dataset
+        if con is None:
+            con = duckdb.connect()
+            pattern = os.path.join(dataset, "*.parquet").replace("'", "''")
+            con.execute(
+                "CREATE VIEW objects AS SELECT * FROM "
+                f"read_parquet('{pattern}', filename = true, file_row_number = true)"
+            )
+        self._con = con
+        self.where = tuple(where)
+        self.params = tuple(params)
+        self._len = None
+
+    @property
+    def key(self):
+        return ("duckdb", self.dataset, os.path.getmtime(self.dataset), self.where, self.params)
+
+    @property
+    def columns(self):
+        return list(SQL_TYPES)
+
+    def query(self, sql, where=(), params=()):
+        """Run `sql` with {where} replaced by this source's conditions plus `where`.
+
+        Placeholders bind in the order they appear: the source's conditions,
+        then `params`, whose WHERE values come first and whose values for any
+        placeholders after {where} come last.
+        """
+        clauses = self.where + tuple(where)
+        where_sql = " AND ".join(clauses) if clauses else "TRUE"
+        # A cursor per call: the script thread and the Tables worker query concurrently
+        cursor = self._con.cursor()
+        try:
+            return cursor.execute(sql.format(where=where_sql), list(self.params) + list(params)).fetchdf()
+        finally:
+            cursor.close()
+
+    def __len__(self):
+        if self._len is None:
+            self._len = int(self.query("SELECT count(*) AS n FROM objects WHERE {where}")["n"].iloc[0])
+        return self._len
+
+    def filtered(self, filters):
+        where, params = list(self.where), list(self.params)
+        for name, value in _active_filters(filters).items():
+            clause, p = _sql_filter(name, value, filters.get("date_match") or "overlap")
+            where.append(clause)
+            params += p
+        return DuckSource(self.dataset, self._con, where, params)
+
+    @property
+    def artists_key(self):
+        # The bridge tables live in this connection, so each connection builds its own
+        return ("duckdb", self.dataset, os.path.getmtime(self.dataset), id(self._con))
+
+    def build_artist_table(self):
+        """ArtistTable of the whole dataset, keyed by Object ID, also stored as the
+        artist_links and artists tables that DuckTables.artist_counts joins."""
+        cols = ", ".join(_q(c) for c in ["Object ID"] + ARTIST_COLUMNS)
+        raw = DuckSource(self.dataset, self._con).query(
+            f"SELECT {cols} FROM objects WHERE {{where}} ORDER BY filename, file_row_number"
+        )
+        table = ArtistTable(raw.set_index("Object ID"))
+        links = pd.DataFrame({"Object ID": table.rows, "Artist ID": table.artist_ids})
+        artists = table.artists[ARTIST_ATTRIBUTES].astype(object).reset_index()
+        cursor = self._con.cursor()
+        try:
+            for name, frame in (("artist_links", links), ("artists", artists)):
+                cursor.register("_frame", frame)
+                cursor.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM _frame")
+                cursor.unregister("_frame")
+        finally:
+            cursor.close()
+        return table
+
+    def facet_values(self, col):
+        if col == "Century":
+            out = self.query('SELECT "Century", min("Century Sort") AS s FROM objects '
+                             'WHERE {where} AND "Century" IS NOT NULL GROUP BY 1 ORDER BY s')
+        else:
+            out = self.query(f"SELECT DISTINCT {_q(col)} FROM objects "
+                             f"WHERE {{where}} AND {_q(col)} IS NOT NULL ORDER BY 1")
+        return list(out[col])
+
+    def tag_values(self):
+        out = self.query(
+            f'SELECT "Tag", count(*) AS n FROM (SELECT unnest({_SQL_TAGS}) AS "Tag" FROM objects WHERE {{where}}) '
+            'GROUP BY 1 ORDER BY n DESC, 1'
+        )
+        return list(out["Tag"])
+
+    def facet_counts(self, filters):
+        active = _active_filters(filters)
+        counts = {}
+        for col, key in list(FACETS.items()) + [("Tags", "tags")]:
+            where, params = [], []
+            for name, value in active.items():
+                if name != key:
+                    clause, p = _sql_filter(name, value, filters.get("date_match") or "overlap")
+                    where.append(clause)
+                    params += p
+            if col == "Tags":
+                sql = (f"SELECT value, count(*) AS n FROM (SELECT unnest({_SQL_TAGS}) AS value FROM objects "
+                       "WHERE {where}) GROUP BY 1 ORDER BY n DESC, 1")
+            else:
+                sql = (f"SELECT {_q(col)} AS value, count(*) AS n FROM objects "
+                       f"WHERE {{where}} AND {_q(col)} IS NOT NULL GROUP BY 1 ORDER BY n DESC, {_sql_order([col])}")
+            out = self.query(sql, where, params)
+            counts[col] = pd.Series(out["n"].to_numpy(dtype=np.int64), index=pd.Index(out["value"]), name="Count")
+        return counts
+
+    def stratified_sample(self, rate, min_per_stratum, seed):
+        """stratified_sample() computed in DuckDB; only the sampled rows reach pandas."""
+        strat = _q(STRATUM_COLUMN)
+        out = self.query(
+            f"""SELECT * EXCLUDE (filename, file_row_number, _rank, _size, _take),
+                       _size / _take AS "Weight", _take AS "Stratum Rows",
+                       dense_rank() OVER (ORDER BY {strat} NULLS LAST) - 1 AS "Stratum"
+                FROM (
+                    SELECT *,
+                        row_number() OVER (PARTITION BY {strat} ORDER BY hash(filename, file_row_number, {int(seed)})) AS _rank,
+                        count(*) OVER (PARTITION BY {strat}) AS _size,
+                        least(count(*) OVER (PARTITION BY {strat}),
+                              greatest({int(min_per_stratum)}, ceil(count(*) OVER (PARTITION BY {strat}) * {float(rate)!r}))) AS _take
+                    FROM objects WHERE {{where}}
+                )
+                WHERE _rank <= _take
+                ORDER BY filename, file_row_number"""
         )
-        mask &= text_mask
+        sample = _restore_dtypes(out)
+        sample["Weight"] = sample["Weight"].astype("float32")
+        sample["Stratum"] = sample["Stratum"].astype("int16")
+        sample["Stratum Rows"] = sample["Stratum Rows"].astype("int32")
+        return sample
+
+
+class DuckTables(_BaseTables):
+    """The Tables interface answered by SQL against a filtered DuckSource. Always exact."""
+
+    def __init__(self, source):
+        super().__init__(source)
+        self.artists = None
+        self.tags = None
+        self.approximate = False
+
+    def _where(self, where):
+        clauses, params = [], []
+        for condition in where:
+            clause, p = _sql_condition(*condition)
+            clauses.append(clause)
+            params += p
+        return clauses, params
+
+    def counts(self, by, where=(), top=None):
+        by, where = tuple(by), tuple(where)
+
+        def build():
+            clauses, params = self._where(where)
+            clauses += [f"{_q(c)} IS NOT NULL" for c in by]
+            cols = ", ".join(_q(c) for c in by)
+            order = _sql_order(by)
+            if top is not None:
+                order = f'"Count" DESC, {order} LIMIT {int(top)}'
+            out = self.frame.query(
+                f'SELECT {cols}, count(*) AS "Count" FROM objects WHERE {{where}} '
+                f"GROUP BY {cols} ORDER BY {order}",
+                clauses, params,
+            )
+            out["Count"] = out["Count"].astype(np.int64)
+            if "Era" in by:
+                out["Era"] = pd.Categorical(out["Era"], categories=ERA_ORDER + ["Unknown"], ordered=True)
+            return out
+
+        return self._get(("counts", by, where, top), build)
+
+    def artist_counts(self, by, where=(), top=None):
+        by, where = tuple(by), tuple(where)
+
+        def build():
+            table = artist_table(self.frame)
+            clauses, params = self._where(where)
+            clauses += [f"{_q(c)} IS NOT NULL" for c in by]
+            cols = ", ".join(_q(c) for c in by)
+            order = _sql_order(by)
+            if top is not None:
+                order = f'"Count" DESC, {order} LIMIT {int(top)}'
+            out = self.frame.query(
+                f'SELECT {cols}, count(DISTINCT "Object ID") AS "Count" FROM objects '
+                f'JOIN artist_links USING ("Object ID") JOIN artists USING ("Artist ID") '
+                f"WHERE {{where}} GROUP BY {cols} ORDER BY {order}",
+                clauses, params,
+            )
+            out["Count"] = out["Count"].astype(np.int64)
+            return table.details(out) if "Artist ID" in by else out
+
+        return self._get(("artist_counts", by, where, top), build)
+
+    def tag_counts(self, where=(), top=None):
+        where = tuple(where)
+
+        def build():
+            clauses, params = self._where(where)
+            limit = f'ORDER BY "Count" DESC, "Tag" LIMIT {int(top)}' if top is not None else 'ORDER BY "Tag"'
+            out = self.frame.query(
+                f'SELECT "Tag", count(*) AS "Count" FROM '
+                f'(SELECT unnest({_SQL_TAGS}) AS "Tag" FROM objects WHERE {{where}}) GROUP BY 1 {limit}',
+                clauses, params,
+            )
+            out["Count"] = out["Count"].astype(np.int64)
+            return out
+
+        return self._get(("tag_counts", where, top), build)
+
+    def tag_cooccurrence(self, tags, where=()):
+        tags, where = tuple(tags), tuple(where)
+
+        def build():
+            clauses, params = self._where(where)
+            out = self.frame.query(
+                f'WITH t AS (SELECT filename, file_row_number, unnest({_SQL_TAGS}) AS tag '
+                f"FROM objects WHERE {{where}}) "
+                f'SELECT a.tag AS "Tag", b.tag AS "Other Tag", count(*) AS "Count" '
+                f"FROM t a JOIN t b USING (filename, file_row_number) "
+                f"WHERE list_contains(?::VARCHAR[], a.tag) AND list_contains(?::VARCHAR[], b.tag) "
+                f"GROUP BY 1, 2 ORDER BY 1, 2",
+                clauses, params + [list(tags), list(tags)],
+            )
+            out["Count"] = out["Count"].astype(np.int64)
+            return out
+
+        return self._get(("tag_cooccurrence", tags, where), build)
+
+    def total(self, where=()):
+        where = tuple(where)
+
+        def build():
+            clauses, params = self._where(where)
+            n = int(self.frame.query("SELECT count(*) AS n FROM objects WHERE {where}", clauses, params)["n"].iloc[0])
+            return n, n, n
+
+        return self._get(("total", where), build)
+
+    def fill_rate(self, col, where=()):
+        where = tuple(where)
+
+        def build():
+            clauses, params = self._where(where)
+            out = self.frame.query(
+                f"SELECT avg(CASE WHEN {_q(col)} IS NULL THEN 0.0 ELSE 1.0 END) AS r FROM objects WHERE {{where}}",
+                clauses, params,
+            )
+            r = out["r"].iloc[0]
+            return float("nan") if pd.isna(r) else float(r)
+
+        return self._get(("fill_rate", col, where), build)
+
+    def means(self, by, col, where=()):
+        by, where = tuple(by), tuple(where)
+
+        def build():
+            clauses, params = self._where(where)
+            clauses += [f"{_q(c)} IS NOT NULL" for c in by]
+            cols = ", ".join(_q(c) for c in by)
+            return self.frame.query(
+                f"SELECT {cols}, avg(CAST({_q(col)} AS DOUBLE)) AS {_q(col)} FROM objects "
+                f"WHERE {{where}} GROUP BY {cols} ORDER BY {_sql_order(by)}",
+                clauses, params,
+            )
+
+        return self._get(("means", by, col, where), build)
+
+    def histogram(self, col, bins=50, where=()):
+        where = tuple(where)
+
+        def build():
+            clauses, params = self._where(where + ((col, "notna", None),))
+            bounds = self.frame.query(
+                f"SELECT min({_q(col)}) AS lo, max({_q(col)}) AS hi FROM objects WHERE {{where}}", clauses, params,
+            ).iloc[0]
+            lo, hi = bounds["lo"], bounds["hi"]
+            if pd.isna(lo):
+                lo, hi = 0.0, 1.0
+            elif lo == hi:
+                lo, hi = lo - 0.5, hi + 0.5  # numpy's range for a constant column
+            edges = np.linspace(float(lo), float(hi), bins + 1)
+            width = (float(hi) - float(lo)) / bins
+            out = self.frame.query(
+                f"SELECT least(CAST(floor(({_q(col)} - {float(lo)!r}) / {width!r}) AS INTEGER), {bins - 1}) AS b, "
+                f"count(*) AS n FROM objects WHERE {{where}} GROUP BY b",
+                clauses, params,
+            )
+            counts = np.zeros(bins, dtype=np.int64)
+            counts[out["b"].to_numpy(dtype=np.int64)] = out["n"].to_numpy(dtype=np.int64)
+            return pd.DataFrame({"Start": edges[:-1], "End": edges[1:], "Count": counts})
+
+        return self._get(("histogram", col, bins, where), build)
+
+    def first_values(self, key, keys, col):
+        keys = tuple(keys)
+
+        def build():
+            clauses, params = self._where(((key, "in", keys),))
+            out = self.frame.query(
+                f"SELECT {_q(key)}, first({_q(col)} ORDER BY filename, file_row_number) "
+                f"FILTER (WHERE {_q(col)} IS NOT NULL) AS {_q(col)} "
+                f"FROM objects WHERE {{where}} GROUP BY 1",
+                clauses, params,
+            )
+            return out.set_index(key)[col]
+
+        return self._get(("first_values", key, keys, col), build)
+
+    def search(self, text, sort_by, ascending=True, limit=100, where=()):
+        text, where = text.strip().lower(), tuple(where)
+
+        def build():
+            clauses, params = self._where(where)
+            if text:
+                cols = ("Title", "Artist Display Name", "Object Name")
+                clauses.append("(" + " OR ".join(f"contains(lower({_q(c)}), ?)" for c in cols) + ")")
+                params += [text] * len(cols)
+            total = int(self.frame.query("SELECT count(*) AS n FROM objects WHERE {where}", clauses, params)["n"].iloc[0])
+            direction = "ASC" if ascending else "DESC"
+            rows = self.frame.query(
+                f"SELECT * EXCLUDE (filename, file_row_number) FROM objects WHERE {{where}} "
+                f"ORDER BY {_q(sort_by)} {direction} NULLS LAST, filename, file_row_number LIMIT {int(limit)}",
+                clauses, params,
+            )
+            return total, _restore_dtypes(rows)
+
+        return self._get(("search", text, sort_by, ascending, limit, where), build)
+
+
+def _aggregations_sql(source):
+    """precompute_aggregations() for a DuckSource, one GROUP BY per table."""
+    t = DuckTables(source)
+    not_undated = (("Century", "!=", "Undated"),)
+    agg = {}
 
-    return df[mask]
+    agg["dept_counts"] = t.counts(["Department"], top=10**9)
+    pd_rate = t.means(["Department"], "Is Public Domain")
+    agg["dept_pd_rate"] = pd_rate.rename(columns={"Is Public Domain": "Public Domain Rate"})
+    agg["century_dist"] = t.counts(["Century", "Century Sort"], not_undated).sort_values("Century Sort")
+    agg["era_dist"] = t.counts(["Era"], (("Era", "!=", "Unknown"),))
+
+    acq = t.counts(["AccessionYear"]).sort_values("AccessionYear")
+    acq["Cumulative"] = acq["Count"].cumsum()
+    agg["acquisitions"] = acq
+
+    agg["top_artists"] = t.artist_counts(["Artist ID"]).sort_values("Count", ascending=False, kind="stable")
+    agg["artist_nationality"] = t.artist_counts(["Nationality"], top=30)
+    agg["gender_dist"] = t.artist_counts(["Gender"], top=10**9)
+    agg["gender_time"] = t.artist_counts(
+        ["Century", "Century Sort", "Gender"], not_undated
+    ).sort_values("Century Sort")
+
+    def top(col, n, name=None):
+        return t.counts([col], top=n).rename(columns={col: name or col})
+
+    agg["top_mediums"] = top("Medium Simple", 50, "Medium")
+    top15_mediums = list(agg["top_mediums"]["Medium"].head(15))
+    agg["dept_medium"] = t.counts(["Department", "Medium Simple"], (("Medium Simple", "in", tuple(top15_mediums)),))
+    agg["top15_mediums"] = top15_mediums
+
+    agg["top_cultures"] = top("Culture", 40)
+    top10_cultures = tuple(agg["top_cultures"]["Culture"].head(10))
+    agg["culture_time"] = t.counts(
+        ["Century", "Century Sort", "Culture"], (("Culture", "in", top10_cultures),) + not_undated,
+    ).sort_values("Century Sort")
+    agg["top_countries"] = top("Country", 30)
+    agg["top_periods"] = top("Period", 30)
+    agg["top_dynasties"] = top("Dynasty", 30)
+
+    top10_class = list(top("Classification", 10)["Classification"])
+    agg["classification_time"] = t.counts(
+        ["Century", "Century Sort", "Classification"], (("Classification", "in", tuple(top10_class)),) + not_undated,
+    ).sort_values("Century Sort")
+    agg["top10_classifications"] = top10_class
+    agg["era_dept"] = t.counts(["Era", "Department"], (("Era", "!=", "Unknown"),)).sort_values("Era")
+    return agg
@@ -10,16 +10,45 @@ Adapted from the cross-department scraper at:
   /Users/z014-ind/Documents/Apps/CV x G - Feb 27/met-museum-api/scraper.py
 """
 
+import argparse
 import asyncio
+import bisect
 import csv
+import gzip
+import hashlib
 import json
+import os
 import re
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from urllib.parse import urlsplit
 
 import aiohttp
 from tqdm import tqdm
 
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+import related_objects
+import visual_index
+from catalog_schema import SchemaError, check_record, encode_json
+from http_client import IMAGE_ENCODING, open_session
+from scraper_metrics import ScrapeMetrics, serve_metrics, snapshot_loop, status_cause, write_snapshot
+
 # ── Paths ──────────────────────────────────────────────────────────────────────
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -27,7 +56,20 @@ CSV_PATH = BASE_DIR / "MetObjects_Egyptian.csv"
 IMAGES_DIR = BASE_DIR / "images"
 INDEX_DIR = BASE_DIR / "index"
 CATALOG_PATH = BASE_DIR / "catalog_egyptian.json"
+CATALOG_NDJSON_PATH = BASE_DIR / "catalog_egyptian.ndjson"
+MANIFEST_PATH = BASE_DIR / ".catalog_manifest.json"
+BUNDLES_DIR = BASE_DIR / "bundles"
 CHECKPOINT_PATH = BASE_DIR / ".checkpoint.json"
+JOURNAL_PATH = BASE_DIR / ".journal.jsonl"
+DEAD_LETTER_PATH = BASE_DIR / ".dead_letter.json"
+FAILED_REPORT_PATH = BASE_DIR / "failed_objects.json"
+METRICS_SNAPSHOT_PATH = BASE_DIR / ".metrics.json"
+RUN_REPORT_PATH = BASE_DIR / "scrape_report.json"
+
+# ── Endpoints ──────────────────────────────────────────────────────────────────
+
+SITE_BASE = "https://www.metmuseum.org"
+IMAGE_BASE = "https://images.metmuseum.org"
 
 # ── Concurrency ────────────────────────────────────────────────────────────────
 
@@ -37,6 +79,35 @@ IMAGE_CONCURRENCY = 10
 
 MAX_RETRIES = 3
 BACKOFF_BASE = 1.0  # seconds
+SCRAPE_TIMEOUT = 45  # seconds per page request
+IMAGE_TIMEOUT = 60  # seconds per image download
+
+# Failed ids go to the dead-letter store and are retried after the main pass,
+# each on its own schedule, at low concurrency.
+RETRY_CONCURRENCY = 2
+RETRY_BACKOFF_BASE = 15.0  # seconds after a failure; doubles with each failed retry pass
+RETRY_MAX_WAIT = 300  # seconds; dead letters due later than this wait for the next run
+DEAD_LETTER_MAX_PASSES = 4  # failed retry passes before an id counts as permanently failed
+
+VISUAL_WORKERS = os.cpu_count() or 1  # processes computing image descriptors
+
+# ── Crawl order & publishing ───────────────────────────────────────────────────
+
+# Egyptian wing galleries the game draws artifacts from (100-138, museum-wakes public/camera.js).
+GAME_GALLERIES = range(100, 139)
+
+CATALOG_SNAPSHOT_INTERVAL = 300  # seconds between catalog/index snapshots mid-crawl; None disables
+
+# ── Metrics ────────────────────────────────────────────────────────────────────
+
+METRICS_PORT = None  # e.g. 9108 to serve /metrics and /metrics.json on localhost
+METRICS_SNAPSHOT_INTERVAL = 30  # seconds between .metrics.json rewrites
+
+METRICS = ScrapeMetrics()
+
+# Optional shared request budget (see crawl_shards.RateBudget): an object with
+# `async acquire(host)` awaited before every request.
+RATE_LIMITER = None
 
 # ── CSV Column → snake_case mapping ────────────────────────────────────────────
 
@@ -112,15 +183,52 @@ def save_checkpoint(cp: dict):
         json.dump(cp, f)
 
 
+# Fields filled in by phases 1-2, journaled so a resumed run (or a shard merge)
+# gets back what earlier runs scraped instead of only knowing which ids are done.
+SCRAPED_FIELDS = ("description", "inscriptions", "provenance", "image_url", "image_file")
+
+
+def append_journal(objects: dict[int, dict], ids):
+    with open(JOURNAL_PATH, "a") as f:
+        for oid in ids:
+            obj = objects[oid]
+            entry = {"object_id": oid, **{k: obj[k] for k in SCRAPED_FIELDS if obj.get(k)}}
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def load_journal(objects: dict[int, dict], path: Path | None = None) -> int:
+    """Apply journaled scrape results to objects (later lines win). Returns entries applied."""
+    path = path or JOURNAL_PATH
+    if not path.exists():
+        return 0
+    applied = 0
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn last line from an interrupted run
+            obj = objects.get(entry.pop("object_id", None))
+            if obj is not None:
+                obj.update(entry)
+                applied += 1
+    return applied
+
+
 def parse_bool(val: str) -> bool:
     return val.strip().upper() == "TRUE"
 
 
+# Catalog ints are 64-bit; anything wider is treated like any other unparseable value.
+INT64_RANGE = (-(2**63), 2**63 - 1)
+
+
 def parse_int(val: str, default=None):
     try:
-        return int(val)
+        value = int(val)
     except (ValueError, TypeError):
         return default
+    return value if INT64_RANGE[0] <= value <= INT64_RANGE[1] else default
 
 
 def parse_csv_tags(raw: str) -> list[str]:
@@ -139,13 +247,109 @@ def batches(lst: list, n: int):
         yield lst[i : i + n]
 
 
+# ── Dead letters ───────────────────────────────────────────────────────────────
+
+
+def is_permanent(cause: str) -> bool:
+    """Schema errors and client errors other than 408/429 will not change on retry."""
+    return cause == "schema" or (cause.startswith("http_4") and cause not in ("http_408", "http_429"))
+
+
+class DeadLetters:
+    """Failed object ids per phase with their cause, kept between runs.
+
+    An entry stays until a retry succeeds. It turns permanent on a
+    non-retryable cause or after DEAD_LETTER_MAX_PASSES failed retry passes;
+    permanent entries are reported, not retried (see --retry-failed).
+    """
+
+    PHASES = ("scrape", "images", "catalog")
+
+    def __init__(self, path: Path | None = None):
+        self.path = Path(path or DEAD_LETTER_PATH)
+        self.entries: dict[str, dict[int, dict]] = {phase: {} for phase in self.PHASES}
+        if self.path.exists():
+            with open(self.path) as f:
+                stored = json.load(f)
+            for phase in self.PHASES:
+                self.entries[phase] = {int(oid): e for oid, e in stored.get(phase, {}).items()}
+
+    def record(self, phase: str, oid: int, cause: str, retry: bool = False):
+        now = time.time()
+        entry = self.entries[phase].setdefault(
+            oid, {"cause": cause, "attempts": 0, "passes": 0, "first_failed": now}
+        )
+        entry["cause"] = cause
+        entry["attempts"] += 1
+        entry["passes"] += retry
+        entry["last_failed"] = now
+        entry["permanent"] = is_permanent(cause) or entry["passes"] >= DEAD_LETTER_MAX_PASSES
+
+    def resolve(self, phase: str, oid: int):
+        self.entries[phase].pop(oid, None)
+
+    def pending(self, phase: str) -> dict[int, float]:
+        """Retryable ids and the time each is due: RETRY_BACKOFF_BASE * 2^passes after its last failure."""
+        return {
+            oid: e["last_failed"] + RETRY_BACKOFF_BASE * 2 ** e["passes"]
+            for oid, e in self.entries[phase].items()
+            if not e["permanent"]
+        }
+
+    def requeue_permanent(self) -> int:
+        """Make permanently failed ids retryable again. Returns how many."""
+        n = 0
+        for entries in self.entries.values():
+            for e in entries.values():
+                if e["permanent"]:
+                    e.update(permanent=False, passes=0, last_failed=0.0)
+                    n += 1
+        return n
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({phase: {str(oid): e for oid, e in entries.items()}
+                       for phase, entries in self.entries.items()}, f)
+        tmp.replace(self.path)
+
+    def report(self) -> dict:
+        out = {"generated_at": time.time()}
+        for phase, entries in self.entries.items():
+            permanent = {oid: e for oid, e in entries.items() if e["permanent"]}
+            causes: dict[str, int] = {}
+            for e in permanent.values():
+                causes[e["cause"]] = causes.get(e["cause"], 0) + 1
+            out[phase] = {
+                "permanent": len(permanent),
+                "pending_retry": len(entries) - len(permanent),
+                "by_cause": dict(sorted(causes.items())),
+                "ids": [{"object_id": oid, **e} for oid, e in sorted(permanent.items())],
+            }
+        return out
+
+    def write_report(self, path: Path | None = None) -> dict:
+        """Write the permanently failed ids to FAILED_REPORT_PATH; returns the report."""
+        report = self.report()
+        with open(path or FAILED_REPORT_PATH, "w") as f:
+            json.dump(report, f, indent=2)
+        return report
+
+
 # ── Read CSV ───────────────────────────────────────────────────────────────────
 
 
-def read_csv() -> dict[int, dict]:
+def read_csv(path: Path | None = None) -> dict[int, dict]:
+    """Read the CSV into public-domain records keyed by object id (pyarrow path when installed)."""
+    if HAS_PYARROW:
+        return read_csv_arrow(path)
+    return read_csv_stdlib(path)
+
+
+def read_csv_stdlib(path: Path | None = None) -> dict[int, dict]:
     rows = {}
     skipped = 0
-    with open(CSV_PATH, newline="", encoding="utf-8-sig") as f:
+    with open(path or CSV_PATH, newline="", encoding="utf-8-sig") as f:
         reader = csv.DictReader(f)
         for row in reader:
             # Only process public-domain objects
@@ -183,6 +387,132 @@ def read_csv() -> dict[int, dict]:
     return rows
 
 
+# Characters str.strip() removes, so the vectorized trim matches it exactly.
+PY_WHITESPACE = "".join(chr(c) for c in range(0x3001) if chr(c).isspace())
+
+# Extra fields every record gets after the CSV columns, in catalog order.
+SCRAPED_DEFAULTS = ("description", "inscriptions", "provenance", "image_file", "image_url")
+
+
+def _arrow_ints(col: "pa.ChunkedArray") -> list:
+    """parse_int over a trimmed string column: plain integers are cast in bulk,
+    anything else non-empty (underscores, non-ASCII digits, huge values) goes
+    through parse_int itself so results match int() exactly."""
+    simple = pc.match_substring_regex(col, r"^-?[0-9]{1,18}$")
+    values = pc.cast(pc.if_else(simple, col, "0"), pa.int64()).to_pylist()
+    simple = simple.to_pylist()
+    raw = col.to_pylist()
+    return [
+        v if ok else (parse_int(r) if r else None)
+        for v, ok, r in zip(values, simple, raw)
+    ]
+
+
+def _arrow_tags(col: "pa.ChunkedArray") -> list[list[str]]:
+    """parse_csv_tags over a trimmed string column."""
+    col = col.combine_chunks()
+    parts = pc.split_pattern(col, "|")
+    values = pc.utf8_trim(pc.list_flatten(parts), characters=PY_WHITESPACE)
+    parents = pc.list_parent_indices(parts).to_numpy()
+    keep = pc.not_equal(values, "")
+    counts = np.bincount(parents[keep.to_numpy(zero_copy_only=False)], minlength=len(col))
+    offsets = pa.array(np.concatenate([[0], np.cumsum(counts)]), pa.int32())
+    return pa.ListArray.from_arrays(offsets, values.filter(keep)).to_pylist()
+
+
+def read_csv_arrow(path: Path | None = None) -> dict[int, dict]:
+    """Column-wise equivalent of read_csv_stdlib: identical records, same key order."""
+    path = path or CSV_PATH
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), [])
+    present = [c for c in COLUMN_MAP if c in header]
+
+    table = pa_csv.read_csv(
+        path,
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={c: pa.string() for c in header},
+            include_columns=present,
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    cols = {c: pc.utf8_trim(table[c], characters=PY_WHITESPACE) for c in present}
+
+    def is_true(col):
+        return pc.equal(pc.utf8_upper(col), "TRUE")
+
+    public = is_true(cols["Is Public Domain"]) if "Is Public Domain" in cols else None
+    total = table.num_rows
+    if public is None:
+        cols, n = {}, 0
+    else:
+        cols = {c: pc.filter(v, public) for c, v in cols.items()}
+        n = len(next(iter(cols.values()))) if cols else 0
+    skipped = total - n
+
+    def column(csv_col):
+        if csv_col in cols:
+            return cols[csv_col]
+        return pa.chunked_array([pa.array([""] * n, pa.string())])
+
+    snake_values = {}
+    tags = [[] for _ in range(n)]
+    for csv_col, snake_key in COLUMN_MAP.items():
+        c = column(csv_col)
+        if snake_key in ("is_highlight", "is_timeline_work"):
+            snake_values[snake_key] = is_true(c).to_pylist()
+        elif snake_key in ("object_id", "date_begin", "date_end"):
+            snake_values[snake_key] = _arrow_ints(c)
+        elif snake_key == "tags_csv":
+            tags = _arrow_tags(c)
+        elif snake_key == "is_public_domain":
+            snake_values[snake_key] = [True] * n  # guaranteed by filter above
+        else:
+            snake_values[snake_key] = c.to_pylist()
+    snake_values["tags"] = tags
+
+    keys = list(snake_values)
+    rows = {}
+    for values in zip(*snake_values.values()):
+        mapped = dict(zip(keys, values))
+        obj_id = mapped["object_id"]
+        if obj_id is None:
+            continue
+        for field in SCRAPED_DEFAULTS:
+            mapped[field] = ""
+        mapped["additional_images"] = []
+        mapped["met_url"] = f"https://www.metmuseum.org/art/collection/search/{obj_id}"
+        rows[obj_id] = mapped
+
+    print(f"  Public-domain objects: {len(rows)}  (skipped {skipped} non-public-domain)")
+    return rows
+
+
+# ── Crawl order ────────────────────────────────────────────────────────────────
+
+
+def gallery_in_game(gallery: str) -> bool:
+    digits = re.match(r"\d+", gallery or "")
+    return digits is not None and int(digits.group()) in GAME_GALLERIES
+
+
+def crawl_priority(obj: dict) -> int:
+    """0 highlights, 1 timeline works, 2 on view in a game gallery, 3 other on view, 4 the rest."""
+    if obj.get("is_highlight"):
+        return 0
+    if obj.get("is_timeline_work"):
+        return 1
+    if obj.get("gallery_number"):
+        return 2 if gallery_in_game(obj["gallery_number"]) else 3
+    return 4
+
+
+def crawl_order(objects: dict[int, dict], ids) -> list[int]:
+    """ids sorted by crawl_priority, then object id."""
+    return sorted(ids, key=lambda oid: (crawl_priority(objects[oid]), oid))
+
+
 # ── Phase 1: Website Scrape ───────────────────────────────────────────────────
 
 
@@ -201,13 +531,14 @@ def extract_description(html: str) -> str:
 def extract_image_url(html: str) -> str:
     """Extract web-large image URL from page HTML."""
     match = re.search(
-        r'https://images\.metmuseum\.org/CRDImages/([^/]+)/(?:original|web-additional|web-large)/([^"\\]+\.jpg)',
+        re.escape(IMAGE_BASE)
+        + r'/CRDImages/([^/]+)/(?:original|web-additional|web-large)/([^"\\]+\.jpg)',
         html,
     )
     if match:
         dept_code = match.group(1)
         filename = match.group(2)
-        return f"https://images.metmuseum.org/CRDImages/{dept_code}/web-large/{filename}"
+        return f"{IMAGE_BASE}/CRDImages/{dept_code}/web-large/{filename}"
     # Fallback: og:image IIIF URL
     match = re.search(r'og:image"\s+content="(https://collectionapi[^"]+)"', html)
     if match:
@@ -238,22 +569,41 @@ def extract_rsc_field(html: str, tab_name: str) -> str:
     return ""
 
 
+def retry_delay(attempt: int, backoff: float, retry_after: str | None = None) -> float:
+    """Exponential backoff, or the server's Retry-After seconds if that is longer."""
+    return max(backoff * 2**attempt, parse_int(retry_after, 0) if retry_after else 0)
+
+
 async def scrape_one(
     session: aiohttp.ClientSession,
     obj_id: int,
     sem: asyncio.Semaphore,
-) -> tuple[int, dict | None]:
-    url = f"https://www.metmuseum.org/art/collection/search/{obj_id}"
-    for attempt in range(MAX_RETRIES):
+    retries: int = MAX_RETRIES,
+    backoff: float = BACKOFF_BASE,
+    phase: str = "scrape",
+) -> tuple[int, dict | None, str]:
+    """Fetch one object page. Returns (obj_id, fields or None, cause), cause "ok" on success.
+
+    Backoff sleeps happen after releasing the concurrency slot, so a throttled
+    request does not hold up the others.
+    """
+    url = f"{SITE_BASE}/art/collection/search/{obj_id}"
+    host = urlsplit(url).hostname
+    cause = "retries_exhausted"
+    for attempt in range(retries):
+        if attempt:
+            await asyncio.sleep(delay)
+        t0 = time.perf_counter()
         try:
-            async with sem:
-                async with session.get(
-                    url,
-                    timeout=aiohttp.ClientTimeout(total=45),
-                    headers={"User-Agent": "MetMuseumGameAssetBuilder/1.0"},
-                ) as resp:
+            async with METRICS.slot(phase, sem):
+                if RATE_LIMITER is not None:
+                    await RATE_LIMITER.acquire(host)
+                t0 = time.perf_counter()
+                async with session.get(url) as resp:
                     if resp.status == 200:
+                        body = await resp.read()
                         html = await resp.text()
+                        METRICS.observe_request(phase, host, time.perf_counter() - t0, 200, len(body))
                         result = {
                             "description": extract_description(html),
                             "inscriptions": extract_rsc_field(
@@ -270,21 +620,101 @@ async def scrape_one(
                             if result["description"].startswith(bp):
                                 result["description"] = ""
                                 break
-                        return (obj_id, result)
-                    elif resp.status == 429:
-                        await asyncio.sleep(BACKOFF_BASE * (2**attempt) + 1)
-                    else:
-                        return (obj_id, None)
-        except (aiohttp.ClientError, asyncio.TimeoutError):
-            await asyncio.sleep(BACKOFF_BASE * (2**attempt))
-    return (obj_id, None)
-
-
-async def phase1_scrape(objects: dict[int, dict], checkpoint: dict) -> dict:
+                        METRICS.outcome(phase, "ok")
+                        return (obj_id, result, "ok")
+                    METRICS.observe_request(phase, host, time.perf_counter() - t0, resp.status)
+                    cause = status_cause(resp.status)
+                    if resp.status != 429:
+                        METRICS.outcome(phase, cause)
+                        return (obj_id, None, cause)
+                    delay = retry_delay(attempt, backoff, resp.headers.get("Retry-After")) + 1
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            cause = "timeout" if isinstance(e, asyncio.TimeoutError) else "client_error"
+            METRICS.observe_request(phase, host, time.perf_counter() - t0, cause)
+            delay = retry_delay(attempt, backoff)
+        if attempt + 1 < retries:
+            METRICS.retry(phase, cause)
+    METRICS.outcome(phase, "retries_exhausted")
+    return (obj_id, None, cause)
+
+
+async def retry_pass(phase: str, dead: DeadLetters, ids, attempt, on_ok, flush) -> int:
+    """Retry `phase`'s dead letters among `ids` while any fall due within RETRY_MAX_WAIT.
+
+    Each id is its own task that sleeps until due, then calls
+    `attempt(oid, sem)` under a RETRY_CONCURRENCY semaphore, so there is no
+    batch barrier: results are handled as they complete, and an id that fails
+    again is rescheduled with a doubled backoff. `on_ok(oid, result)` applies a
+    recovered id and `flush()` persists progress every BATCH_SIZE results.
+    Returns the number recovered.
+    """
+    sem = asyncio.Semaphore(RETRY_CONCURRENCY)
+    retry_phase = f"{phase}_retry"
+    tasks: dict[int, asyncio.Task] = {}
+
+    async def one(oid: int, at: float):
+        await asyncio.sleep(max(0.0, at - time.time()))
+        return await attempt(oid, sem)
+
+    def schedule() -> int:
+        now = time.time()
+        due = {oid: at for oid, at in dead.pending(phase).items()
+               if oid in ids and oid not in tasks and at - now <= RETRY_MAX_WAIT}
+        for oid, at in due.items():
+            tasks[oid] = asyncio.create_task(one(oid, at))
+        return len(due)
+
+    if not schedule():
+        return 0
+    print(f"  Retrying {len(tasks)} failed ids at concurrency {RETRY_CONCURRENCY} (dead letters: {phase})")
+    METRICS.phase_started(retry_phase, len(tasks))
+    recovered = n = 0
+    try:
+        while tasks:
+            finished, _ = await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                oid, result, cause = task.result()
+                del tasks[oid]
+                if cause == "ok":
+                    on_ok(oid, result)
+                    dead.resolve(phase, oid)
+                    recovered += 1
+                else:
+                    dead.record(phase, oid, cause, retry=True)
+                n += 1
+                if n % BATCH_SIZE == 0:
+                    flush()
+            schedule()
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        flush()
+        METRICS.phase_finished(retry_phase)
+    pending = len(dead.pending(phase))
+    print(f"  Recovered {recovered}; {pending} left for the next run, "
+          f"{len(dead.entries[phase]) - pending} permanently failed")
+    return recovered
+
+
+def apply_scrape(obj: dict, result: dict) -> tuple[int, int, int, int]:
+    """Copy non-empty scraped fields onto obj; returns which of desc/insc/prov/img were found."""
+    found = []
+    for key in ("description", "inscriptions", "provenance", "image_url"):
+        if result[key]:
+            obj[key] = result[key]
+        found.append(int(bool(result[key])))
+    return tuple(found)
+
+
+async def phase1_scrape(objects: dict[int, dict], checkpoint: dict, dead: DeadLetters | None = None) -> dict:
+    """Scrape every object not yet done. Failures go to the dead-letter store, not the
+    checkpoint, and are retried in retry_pass once the batches are through."""
+    dead = dead if dead is not None else DeadLetters()
     done_set = set(checkpoint.get("scrape_done", []))
-    todo_ids = sorted(oid for oid in objects if oid not in done_set)
+    todo_ids = crawl_order(objects, (oid for oid in objects if oid not in done_set and oid not in dead.entries["scrape"]))
+    retryable = any(oid in objects for oid in dead.pending("scrape"))
 
-    if not todo_ids:
+    if not todo_ids and not retryable:
         print("Phase 1 (Scrape): Already complete.")
         return checkpoint
 
@@ -295,40 +725,40 @@ async def phase1_scrape(objects: dict[int, dict], checkpoint: dict) -> dict:
     print(f"{'='*60}")
 
     sem = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+    METRICS.phase_started("scrape", total)
     total_desc = 0
     total_insc = 0
     total_prov = 0
 
-    async with aiohttp.ClientSession() as session:
+    def flush():
+        checkpoint["scrape_done"] = list(done_set)
+        save_checkpoint(checkpoint)
+        dead.save()
+
+    async with open_session(METRICS, "scrape", SCRAPE_CONCURRENCY + RETRY_CONCURRENCY, SCRAPE_TIMEOUT) as session:
         for batch_num, batch_ids in enumerate(batches(todo_ids, BATCH_SIZE), 1):
             t0 = time.time()
             tasks = [scrape_one(session, oid, sem) for oid in batch_ids]
             results = await asyncio.gather(*tasks)
 
-            desc_n = insc_n = prov_n = img_n = 0
-            for oid, result in results:
-                if result:
-                    obj = objects[oid]
-                    if result["description"]:
-                        obj["description"] = result["description"]
-                        desc_n += 1
-                    if result["inscriptions"]:
-                        obj["inscriptions"] = result["inscriptions"]
-                        insc_n += 1
-                    if result["provenance"]:
-                        obj["provenance"] = result["provenance"]
-                        prov_n += 1
-                    if result["image_url"]:
-                        obj["image_url"] = result["image_url"]
-                        img_n += 1
+            desc_n = insc_n = prov_n = img_n = failed_n = 0
+            ok_ids = []
+            for oid, result, cause in results:
+                if cause != "ok":
+                    dead.record("scrape", oid, cause)
+                    failed_n += 1
+                    continue
+                d, i, p, m = apply_scrape(objects[oid], result)
+                desc_n, insc_n, prov_n, img_n = desc_n + d, insc_n + i, prov_n + p, img_n + m
+                ok_ids.append(oid)
 
             total_desc += desc_n
             total_insc += insc_n
             total_prov += prov_n
 
-            done_set.update(batch_ids)
-            checkpoint["scrape_done"] = list(done_set)
-            save_checkpoint(checkpoint)
+            append_journal(objects, ok_ids)
+            done_set.update(ok_ids)
+            flush()
 
             elapsed = time.time() - t0
             done_so_far = min(batch_num * BATCH_SIZE, total)
@@ -337,7 +767,20 @@ async def phase1_scrape(objects: dict[int, dict], checkpoint: dict) -> dict:
                 f"({done_so_far:>5}/{total}) "
                 f"| {elapsed:5.1f}s "
                 f"| desc={desc_n} insc={insc_n} prov={prov_n} img={img_n}"
+                + (f" | failed={failed_n}" if failed_n else "")
             )
+        METRICS.phase_finished("scrape")
+
+        def on_ok(oid, result):
+            apply_scrape(objects[oid], result)
+            append_journal(objects, [oid])
+            done_set.add(oid)
+
+        await retry_pass(
+            "scrape", dead, objects,
+            lambda oid, s: scrape_one(session, oid, s, backoff=RETRY_BACKOFF_BASE, phase="scrape_retry"),
+            on_ok, flush,
+        )
 
     print(f"\nPhase 1 done: {total_desc} descriptions, {total_insc} inscriptions, {total_prov} provenance")
     return checkpoint
@@ -351,33 +794,57 @@ async def download_one(
     obj_id: int,
     image_url: str,
     sem: asyncio.Semaphore,
-) -> tuple[int, bool]:
+    retries: int = MAX_RETRIES,
+    backoff: float = BACKOFF_BASE,
+    phase: str = "images",
+) -> tuple[int, bool, str]:
+    """Download one image. Returns (obj_id, saved, cause), cause "ok" on success."""
     if not image_url:
-        return (obj_id, False)
+        METRICS.outcome(phase, "no_url")
+        return (obj_id, False, "no_url")
 
     dest = IMAGES_DIR / f"{obj_id}.jpg"
     if dest.exists() and dest.stat().st_size > 0:
-        return (obj_id, True)
-
-    for attempt in range(MAX_RETRIES):
+        METRICS.outcome(phase, "ok")
+        return (obj_id, True, "ok")
+
+    host = urlsplit(image_url).hostname
+    cause = "retries_exhausted"
+    for attempt in range(retries):
+        if attempt:
+            await asyncio.sleep(delay)
+        t0 = time.perf_counter()
         try:
-            async with sem:
-                async with session.get(
-                    image_url, timeout=aiohttp.ClientTimeout(total=60)
-                ) as resp:
+            async with METRICS.slot(phase, sem):
+                if RATE_LIMITER is not None:
+                    await RATE_LIMITER.acquire(host)
+                t0 = time.perf_counter()
+                async with session.get(image_url) as resp:
                     if resp.status == 200:
-                        dest.write_bytes(await resp.read())
-                        return (obj_id, True)
-                    elif resp.status == 429:
-                        await asyncio.sleep(BACKOFF_BASE * (2**attempt) + 1)
-                    else:
-                        return (obj_id, False)
-        except (aiohttp.ClientError, asyncio.TimeoutError):
-            await asyncio.sleep(BACKOFF_BASE * (2**attempt))
-    return (obj_id, False)
-
-
-async def phase2_images(objects: dict[int, dict], checkpoint: dict) -> dict:
+                        body = await resp.read()
+                        METRICS.observe_request(phase, host, time.perf_counter() - t0, 200, len(body))
+                        dest.write_bytes(body)
+                        METRICS.outcome(phase, "ok")
+                        return (obj_id, True, "ok")
+                    METRICS.observe_request(phase, host, time.perf_counter() - t0, resp.status)
+                    cause = status_cause(resp.status)
+                    if resp.status != 429:
+                        METRICS.outcome(phase, cause)
+                        return (obj_id, False, cause)
+                    delay = retry_delay(attempt, backoff, resp.headers.get("Retry-After")) + 1
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            cause = "timeout" if isinstance(e, asyncio.TimeoutError) else "client_error"
+            METRICS.observe_request(phase, host, time.perf_counter() - t0, cause)
+            delay = retry_delay(attempt, backoff)
+        if attempt + 1 < retries:
+            METRICS.retry(phase, cause)
+    METRICS.outcome(phase, "retries_exhausted")
+    return (obj_id, False, cause)
+
+
+async def phase2_images(objects: dict[int, dict], checkpoint: dict, dead: DeadLetters | None = None) -> dict:
+    """Download every image not yet done; failures are dead-lettered as in phase1_scrape."""
+    dead = dead if dead is not None else DeadLetters()
     done_set = set(checkpoint.get("image_done", []))
 
     # Mark already-done objects
@@ -387,12 +854,13 @@ async def phase2_images(objects: dict[int, dict], checkpoint: dict) -> dict:
 
     # Build download list
     download_list = [
-        (oid, obj["image_url"])
-        for oid, obj in sorted(objects.items())
-        if oid not in done_set and obj.get("image_url")
+        (oid, objects[oid]["image_url"])
+        for oid in crawl_order(objects, objects)
+        if oid not in done_set and oid not in dead.entries["images"] and objects[oid].get("image_url")
     ]
+    retryable = any(objects.get(oid, {}).get("image_url") for oid in dead.pending("images"))
 
-    if not download_list:
+    if not download_list and not retryable:
         print("Phase 2 (Images): Already complete.")
         return checkpoint
 
@@ -403,24 +871,34 @@ async def phase2_images(objects: dict[int, dict], checkpoint: dict) -> dict:
     print(f"{'='*60}")
 
     sem = asyncio.Semaphore(IMAGE_CONCURRENCY)
+    METRICS.phase_started("images", total)
     total_ok = 0
 
-    async with aiohttp.ClientSession() as session:
+    def flush():
+        checkpoint["image_done"] = list(done_set)
+        save_checkpoint(checkpoint)
+        dead.save()
+
+    async with open_session(
+        METRICS, "images", IMAGE_CONCURRENCY + RETRY_CONCURRENCY, IMAGE_TIMEOUT, accept_encoding=IMAGE_ENCODING
+    ) as session:
         for batch_num, batch in enumerate(batches(download_list, BATCH_SIZE), 1):
             t0 = time.time()
             tasks = [download_one(session, oid, url, sem) for oid, url in batch]
             results = await asyncio.gather(*tasks)
 
-            ok_n = 0
-            for oid, success in results:
+            ok_ids = []
+            for oid, success, cause in results:
                 if success:
                     objects[oid]["image_file"] = f"images/{oid}.jpg"
-                    ok_n += 1
+                    ok_ids.append(oid)
+                else:
+                    dead.record("images", oid, cause)
 
-            total_ok += ok_n
-            done_set.update(oid for oid, _ in batch)
-            checkpoint["image_done"] = list(done_set)
-            save_checkpoint(checkpoint)
+            total_ok += len(ok_ids)
+            append_journal(objects, ok_ids)
+            done_set.update(ok_ids)
+            flush()
 
             elapsed = time.time() - t0
             done_so_far = min(batch_num * BATCH_SIZE, total)
@@ -428,13 +906,42 @@ async def phase2_images(objects: dict[int, dict], checkpoint: dict) -> dict:
                 f"  Batch {batch_num:>3}/{num_batches} "
                 f"({done_so_far:>5}/{total}) "
                 f"| {elapsed:5.1f}s "
-                f"| downloaded={ok_n}/{len(batch)}"
+                f"| downloaded={len(ok_ids)}/{len(batch)}"
             )
+        METRICS.phase_finished("images")
 
-    print(f"\nPhase 2 done: {total_ok}/{total} images downloaded")
+        def on_ok(oid, _saved):
+            objects[oid]["image_file"] = f"images/{oid}.jpg"
+            append_journal(objects, [oid])
+            done_set.add(oid)
+
+        total_ok += await retry_pass(
+            "images", dead, {oid for oid, obj in objects.items() if obj.get("image_url")},
+            lambda oid, s: download_one(session, oid, objects[oid].get("image_url", ""), s,
+                                        backoff=RETRY_BACKOFF_BASE, phase="images_retry"),
+            on_ok, flush,
+        )
+
+    print(f"\nPhase 2 done: {total_ok} images downloaded")
     return checkpoint
 
 
+# ── Phase 2b: Visual Descriptors ───────────────────────────────────────────────
+
+
+def phase_visual(full_rebuild: bool = False):
+    """Describe new or replaced images and update index/visual.npz (see visual_index)."""
+    print(f"\n{'='*60}")
+    print("PHASE 2b: Visual descriptors")
+    print(f"{'='*60}")
+    if not visual_index.HAS_PIL:
+        print("  Skipped (needs numpy and Pillow)")
+        return
+    stats = visual_index.update_index(IMAGES_DIR, INDEX_DIR / "visual.npz", VISUAL_WORKERS, full=full_rebuild)
+    print(f"  visual.npz: {stats['objects']} images ({stats['described']} described, "
+          f"{stats['removed']} removed, {stats['unreadable']} unreadable, {stats['ivf_cells']} IVF cells)")
+
+
 # ── Phase 3: Build Catalog & Indexes ───────────────────────────────────────────
 
 
@@ -452,69 +959,531 @@ def century_from_year(begin: int | None, end: int | None) -> str:
         return f"{century}{suffix} century"
 
 
+INDEX_NAMES = (
+    "by_department",
+    "by_culture",
+    "by_classification",
+    "by_century",
+    "by_tags",
+    "by_medium",
+    "by_date_interval",
+)
+
+# by_date_interval buckets: "-1400" lists every object whose date span touches
+# -1400..-1301. Spans past the outer buckets are clamped into them.
+DATE_BUCKET_YEARS = 100
+DATE_BUCKET_RANGE = (-5000, 2100)
+
+
+def date_span(record: dict) -> tuple[int, int] | None:
+    """(earliest, latest) year of a record's date_begin/date_end, or None if undated."""
+    begin, end = record.get("date_begin"), record.get("date_end")
+    begin = end if begin is None else begin
+    end = begin if end is None else end
+    if begin is None:
+        return None
+    return min(begin, end), max(begin, end)
+
+
+def date_buckets(lo: int, hi: int) -> range:
+    """Start years of the DATE_BUCKET_YEARS buckets overlapping [lo, hi]."""
+    first, last = DATE_BUCKET_RANGE
+    lo = min(max(lo, first), last) // DATE_BUCKET_YEARS * DATE_BUCKET_YEARS
+    hi = min(max(hi, first), last) // DATE_BUCKET_YEARS * DATE_BUCKET_YEARS
+    return range(lo, hi + 1, DATE_BUCKET_YEARS)
+
+
+def ids_in_date_range(index: dict, catalog: dict, start: int, stop: int, within: bool = False) -> list[int]:
+    """Object ids made during [start, stop], from by_date_interval plus an exact span check.
+
+    `catalog` maps object id to record. within=True keeps only spans that lie
+    entirely inside the range; by default any overlap counts.
+    """
+    candidates = {oid for b in date_buckets(start, stop) for oid in index.get(str(b), [])}
+    out = []
+    for oid in candidates:
+        lo, hi = date_span(catalog[oid])
+        if (start <= lo and hi <= stop) if within else (lo <= stop and hi >= start):
+            out.append(oid)
+    return sorted(out)
+
+
+# Record fields index_keys() reads. The manifest keeps them per object, so an
+# update drops an object's old postings without trusting the live catalog.
+INDEX_FIELDS = ("department", "culture", "classification", "date_begin", "date_end", "tags", "medium")
+
+
+def index_fields(record: dict) -> dict:
+    return {f: record[f] for f in INDEX_FIELDS if record.get(f) not in (None, "", [])}
+
+
+def index_keys(record: dict):
+    """Yield (index name, group key) for every index posting of one catalog record."""
+    for key, field in [
+        ("by_department", "department"),
+        ("by_culture", "culture"),
+        ("by_classification", "classification"),
+    ]:
+        val = record.get(field, "")
+        if val:
+            yield key, val
+
+    century = century_from_year(record.get("date_begin"), record.get("date_end"))
+    if century:
+        yield "by_century", century
+
+    tags = record.get("tags", [])
+    if isinstance(tags, list):
+        for tag in tags:
+            if tag:
+                yield "by_tags", tag
+
+    medium = record.get("medium", "")
+    if medium:
+        yield "by_medium", medium
+
+    span = date_span(record)
+    if span:
+        for bucket in date_buckets(*span):
+            yield "by_date_interval", str(bucket)
+
+
+# ── Bundles ────────────────────────────────────────────────────────────────────
+
+# Slim list-view projection of a catalog record, used in the bundles.
+BUNDLE_FIELDS = (
+    "object_id", "title", "object_name", "date", "period", "dynasty", "medium",
+    "department", "gallery_number", "is_highlight", "image_url", "image_file",
+)
+BUNDLE_KINDS = {"gallery": "gallery_number", "department": "department"}
+
+
+def bundle_slug(key: str) -> str:
+    """File name for a bundle key: "Egyptian Art" -> "egyptian-art"."""
+    return re.sub(r"[^a-z0-9]+", "-", key.lower()).strip("-")
+
+
+def bundle_names(keys) -> dict[tuple[str, str], str]:
+    """Bundle name "<kind>/<slug>" per (kind, key). Keys whose slugs collide
+    ("Egyptian Art", "Egyptian-Art") all get a hash of the key appended."""
+    by_slug: dict[tuple[str, str], list[str]] = {}
+    for kind, key in keys:
+        by_slug.setdefault((kind, bundle_slug(key)), []).append(key)
+    names = {}
+    for (kind, slug), same in by_slug.items():
+        for key in same:
+            suffix = f"-{hashlib.sha1(key.encode()).hexdigest()[:8]}" if len(same) > 1 else ""
+            names[(kind, key)] = f"{kind}/{slug}{suffix}"
+    return names
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def write_bundles(objects: dict[int, dict]):
+    """Write one slim, precompressed bundle per gallery and per department, plus the manifest.
+
+    bundles/<kind>/<slug>.json holds {"key", "count", "with_images", "objects"},
+    objects with images first in crawl order, so a random pick with an image
+    is objects[randrange(with_images)]. Next to each file are .json.gz and,
+    with brotli installed, .json.br. bundles/manifest.json records the key
+    and a hash per bundle and maps every object id to its bundles; readers
+    find a key's file there (see bundle_names). Only bundles whose hash
+    changed are rewritten.
+    """
+    by_key: dict[tuple[str, str], list[int]] = {}
+    for oid in crawl_order(objects, objects):
+        for kind, field in BUNDLE_KINDS.items():
+            key = objects[oid].get(field, "")
+            if key and bundle_slug(key):
+                by_key.setdefault((kind, key), []).append(oid)
+    names = bundle_names(by_key)
+    groups = {names[kind_key]: (kind_key[1], ids) for kind_key, ids in by_key.items()}
+
+    manifest_path = BUNDLES_DIR / "manifest.json"
+    old = json.loads(manifest_path.read_text())["bundles"] if manifest_path.exists() else {}
+    bundles, shards, rewritten = {}, {}, 0
+    for name, (key, ids) in sorted(groups.items()):
+        ids.sort(key=lambda oid: not objects[oid].get("image_url"))  # stable: crawl order within each half
+        records = [{f: objects[oid].get(f, "") for f in BUNDLE_FIELDS} for oid in ids]
+        body = json.dumps({
+            "key": key,
+            "count": len(records),
+            "with_images": sum(1 for r in records if r["image_url"]),
+            "objects": records,
+        }, ensure_ascii=False, separators=(",", ":")).encode()
+        digest = hashlib.sha1(body).hexdigest()[:16]
+        path = BUNDLES_DIR / f"{name}.json"
+        if old.get(name, {}).get("hash") != digest or not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(path, body)
+            _write_atomic(path.with_name(path.name + ".gz"), gzip.compress(body, compresslevel=9, mtime=0))
+            if HAS_BROTLI:
+                _write_atomic(path.with_name(path.name + ".br"), brotli.compress(body, quality=11))
+            rewritten += 1
+        bundles[name] = {"key": key, "count": len(records), "bytes": len(body), "hash": digest}
+        for oid in ids:
+            shards.setdefault(str(oid), []).append(name)
+
+    for name in old.keys() - bundles.keys():
+        for suffix in (".json", ".json.gz", ".json.br"):
+            (BUNDLES_DIR / f"{name}{suffix}").unlink(missing_ok=True)
+
+    encodings = ["gzip", "br"] if HAS_BROTLI else ["gzip"]
+    manifest = {"fields": BUNDLE_FIELDS, "encodings": encodings, "bundles": bundles, "objects": shards}
+    BUNDLES_DIR.mkdir(parents=True, exist_ok=True)
+    _write_atomic(manifest_path, json.dumps(manifest, separators=(",", ":")).encode())
+    counts = {kind: sum(1 for n in bundles if n.startswith(kind + "/")) for kind in BUNDLE_KINDS}
+    print(f"  bundles: {counts['gallery']} galleries, {counts['department']} departments "
+          f"({rewritten} rewritten, {len(old.keys() - bundles.keys())} removed)")
+
+
+# ── Related objects ────────────────────────────────────────────────────────────
+
+
+def write_related(objects: dict[int, dict], changed=None, removed=()):
+    """Write index/related.json: object id -> [[neighbor id, cosine score], ...], best first.
+
+    Given `changed` (and `removed`) ids the previous file is patched rather
+    than rebuilt; see related_objects.update_related.
+    """
+    if not related_objects.HAS_SCIPY:
+        print("  related.json: skipped (needs numpy and scipy)")
+        return
+    path = INDEX_DIR / "related.json"
+    if changed is not None and path.exists():
+        with open(path) as f:
+            related = {int(k): v for k, v in json.load(f).items()}
+        recomputed = related_objects.update_related(related, objects, changed, removed)
+    else:
+        related = related_objects.build_related(objects)
+        recomputed = len(related)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump({str(oid): related[oid] for oid in sorted(related)}, f, separators=(",", ":"))
+    tmp.replace(path)
+    print(f"  related.json: {len(related)} objects, top {related_objects.TOP_K} ({recomputed} recomputed)")
+
+
+def catalog_record(obj: dict) -> dict:
+    return {k: v for k, v in obj.items() if k not in ("link_resource",)}
+
+
+def write_index(path: Path, data: dict) -> int:
+    """Write one index file atomically. Module-level so a process pool can run it."""
+    sorted_data = dict(sorted(data.items()))
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(sorted_data, f, indent=2, ensure_ascii=False)
+    tmp.replace(path)
+    return len(sorted_data)
+
+
+def record_hash(record: dict) -> str:
+    """Content hash of a catalog record, used to detect changed objects between builds."""
+    canonical = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+def load_manifest() -> dict | None:
+    if MANIFEST_PATH.exists():
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    return None
+
+
+def save_manifest(manifest: dict):
+    tmp = MANIFEST_PATH.with_name(MANIFEST_PATH.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    tmp.replace(MANIFEST_PATH)
+
+
+class CatalogWriter:
+    """Writes the legacy JSON array and the NDJSON catalog side by side.
+
+    Output goes to temp files that replace the real ones only when the
+    `with` block completes, so readers never see a half-written catalog.
+    The array is byte-identical to json.dump(catalog, indent=2).
+    """
+
+    def __init__(self):
+        self.json_tmp = CATALOG_PATH.with_name(CATALOG_PATH.name + ".tmp")
+        self.ndjson_tmp = CATALOG_NDJSON_PATH.with_name(CATALOG_NDJSON_PATH.name + ".tmp")
+        self.count = 0
+        self.rejected: dict[int, str] = {}
+
+    def __enter__(self):
+        self.fj = open(self.json_tmp, "w")
+        self.fn = open(self.ndjson_tmp, "w")
+        self.fj.write("[")
+        return self
+
+    def write(self, record: dict | None = None, element: str | None = None, line: str | None = None) -> bool:
+        """Append one record, or its already-serialized array element and NDJSON line.
+
+        New records are checked against CatalogRecord first. One that fails
+        is left out and its error kept in `rejected` by object id; returns
+        whether the record was written.
+        """
+        if record is not None:
+            try:
+                check_record(record)
+            except SchemaError as e:
+                self.rejected[record.get("object_id")] = str(e)
+                return False
+        if element is None:
+            element = "  " + json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        if line is None:
+            line = encode_json(record).decode() + "\n"
+        self.fj.write((",\n" if self.count else "\n") + element)
+        self.fn.write(line)
+        self.count += 1
+        return True
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fj.write("\n]" if self.count else "]")
+        self.fj.close()
+        self.fn.close()
+        if exc_type is None:
+            self.json_tmp.replace(CATALOG_PATH)
+            self.ndjson_tmp.replace(CATALOG_NDJSON_PATH)
+        else:
+            self.json_tmp.unlink(missing_ok=True)
+            self.ndjson_tmp.unlink(missing_ok=True)
+
+
+def iter_catalog_elements():
+    """Yield (object_id, array element text, NDJSON line) from the current catalog files.
+
+    Elements are split on the array's top-level "  {" / "  }" lines, so
+    unchanged records can be copied through without being parsed.
+    """
+    with open(CATALOG_PATH) as fj, open(CATALOG_NDJSON_PATH) as fn:
+        lines = []
+        oid = None
+        for raw in fj:
+            if raw.startswith("  {"):
+                lines = [raw]
+                oid = None
+            elif lines:
+                lines.append(raw)
+                if oid is None and raw.startswith('    "object_id": '):
+                    oid = int(raw[len('    "object_id": '):].rstrip(",\n"))
+                if raw.startswith("  }"):
+                    element = "".join(lines).rstrip("\n").rstrip(",")
+                    lines = []
+                    yield oid, element, fn.readline()
+
+
+def _without_rejected(objects: dict[int, dict], rejected: dict[int, str]) -> dict[int, dict]:
+    """`objects` minus the records the catalog left out, reporting them."""
+    if not rejected:
+        return objects
+    print(f"  skipped {len(rejected)} records failing the schema, e.g. {next(iter(rejected.values()))}")
+    return {oid: obj for oid, obj in objects.items() if oid not in rejected}
+
+
 def build_catalog_and_indexes(objects: dict[int, dict]):
+    """Stream catalog records to disk while collecting index postings, then write indexes.
+
+    Each record is serialized as it is produced — one NDJSON line plus its
+    element of the legacy indented JSON array — so only one record and the
+    postings are held at a time. The six index files are serialized in
+    parallel worker processes. Last comes the manifest (content hash and
+    index fields per record) that update_catalog_and_indexes() diffs against.
+    Returns the records left out for failing the schema, object id -> error.
+    """
     print(f"\n{'='*60}")
     print("PHASE 3: Building catalog and indexes")
     print(f"{'='*60}")
 
-    catalog = []
-    for oid in sorted(objects.keys()):
-        obj = objects[oid]
-        record = {k: v for k, v in obj.items() if k not in ("link_resource",)}
-        catalog.append(record)
-
-    with open(CATALOG_PATH, "w") as f:
-        json.dump(catalog, f, indent=2, ensure_ascii=False)
-    print(f"  catalog_egyptian.json: {len(catalog)} objects")
-
-    indexes = {
-        "by_department": {},
-        "by_culture": {},
-        "by_classification": {},
-        "by_century": {},
-        "by_tags": {},
-        "by_medium": {},
-    }
-
-    for obj in catalog:
-        oid = obj["object_id"]
-        for key, field in [
-            ("by_department", "department"),
-            ("by_culture", "culture"),
-            ("by_classification", "classification"),
-        ]:
-            val = obj.get(field, "")
-            if val:
-                indexes[key].setdefault(val, []).append(oid)
-
-        century = century_from_year(obj.get("date_begin"), obj.get("date_end"))
-        if century:
-            indexes["by_century"].setdefault(century, []).append(oid)
-
-        tags = obj.get("tags", [])
-        if isinstance(tags, list):
-            for tag in tags:
-                if tag:
-                    indexes["by_tags"].setdefault(tag, []).append(oid)
-
-        medium = obj.get("medium", "")
-        if medium:
-            indexes["by_medium"].setdefault(medium, []).append(oid)
-
-    for name, data in indexes.items():
-        path = INDEX_DIR / f"{name}.json"
-        sorted_data = dict(sorted(data.items()))
-        with open(path, "w") as f:
-            json.dump(sorted_data, f, indent=2, ensure_ascii=False)
-        print(f"  {name}.json: {len(sorted_data)} groups")
+    indexes = {name: {} for name in INDEX_NAMES}
+    hashes, fields = {}, {}
 
+    with CatalogWriter() as writer:
+        for oid in sorted(objects.keys()):
+            record = catalog_record(objects[oid])
+            if not writer.write(record):
+                continue
+            hashes[str(oid)] = record_hash(record)
+            fields[str(oid)] = index_fields(record)
+            for name, key in index_keys(record):
+                indexes[name].setdefault(key, []).append(record["object_id"])
+    print(f"  {CATALOG_PATH.name}: {writer.count} objects (+ {CATALOG_NDJSON_PATH.name})")
+    objects = _without_rejected(objects, writer.rejected)
+
+    paths = [INDEX_DIR / f"{name}.json" for name in INDEX_NAMES]
+    with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as pool:
+        group_counts = list(pool.map(write_index, paths, [indexes[n] for n in INDEX_NAMES]))
+    for name, groups in zip(INDEX_NAMES, group_counts):
+        print(f"  {name}.json: {groups} groups")
+
+    write_related(objects)
+    write_bundles(objects)
+    previous = load_manifest() or {}
+    save_manifest({"generation": previous.get("generation", 0) + 1, "hashes": hashes, "fields": fields})
+    print("Phase 3 complete.")
+    return writer.rejected
+
+
+def update_catalog_and_indexes(objects: dict[int, dict]):
+    """Patch the existing catalog and indexes for objects whose content hash changed.
+
+    Unchanged catalog elements are copied through as text; only changed,
+    added and removed records are (de)serialized, and only index files with
+    postings that actually moved are rewritten. Falls back to a full build
+    when there is no previous build to patch.
+
+    The manifest is written last and commits the generation. Old postings come
+    from its index fields, and every step is idempotent, so a run that dies
+    after replacing the catalog is finished by the next one. Records failing
+    the schema are left out like removed ones and stay out of the manifest,
+    so every run checks them again. Returns them, object id -> error.
+    """
+    manifest = load_manifest()
+    index_paths = {name: INDEX_DIR / f"{name}.json" for name in INDEX_NAMES}
+    if (
+        manifest is None
+        or "fields" not in manifest
+        or not CATALOG_PATH.exists()
+        or not CATALOG_NDJSON_PATH.exists()
+        or not all(p.exists() for p in index_paths.values())
+    ):
+        return build_catalog_and_indexes(objects)
+
+    old_hashes = manifest["hashes"]
+    new_hashes = {str(oid): record_hash(catalog_record(obj)) for oid, obj in objects.items()}
+    changed = sorted(int(k) for k, h in new_hashes.items() if old_hashes.get(k) != h)
+    removed = {int(k) for k in old_hashes if k not in new_hashes}
+
+    print(f"\n{'='*60}")
+    print(f"PHASE 3: Incremental update ({len(changed)} changed/added, {len(removed)} removed)")
+    print(f"{'='*60}")
+    if not changed and not removed:
+        print("  Catalog and indexes are up to date.")
+        if not (INDEX_DIR / "related.json").exists():
+            write_related(objects)
+        if not (BUNDLES_DIR / "manifest.json").exists():
+            write_bundles(objects)
+        return {}
+
+    changed_set = set(changed)
+    pending = iter(changed)
+    next_new = next(pending, None)
+
+    with CatalogWriter() as writer:
+        for oid, element, line in iter_catalog_elements():
+            while next_new is not None and next_new < oid:
+                writer.write(catalog_record(objects[next_new]))
+                next_new = next(pending, None)
+            if oid in changed_set or oid in removed:
+                if oid == next_new:
+                    writer.write(catalog_record(objects[oid]))
+                    next_new = next(pending, None)
+            else:
+                writer.write(element=element, line=line)
+        while next_new is not None:
+            writer.write(catalog_record(objects[next_new]))
+            next_new = next(pending, None)
+    print(f"  {CATALOG_PATH.name}: {writer.count} objects (+ {CATALOG_NDJSON_PATH.name})")
+    rejected = writer.rejected
+    if rejected:
+        objects = _without_rejected(objects, rejected)
+        changed = [oid for oid in changed if oid not in rejected]
+        removed = removed | rejected.keys()
+        new_hashes = {k: h for k, h in new_hashes.items() if int(k) not in rejected}
+
+    # Net posting changes per index: (key, oid) pairs to drop and to add
+    drops = {name: set() for name in INDEX_NAMES}
+    adds = {name: set() for name in INDEX_NAMES}
+    old_fields = manifest["fields"]
+    for oid in changed_set | removed:
+        for name, key in index_keys(old_fields.get(str(oid), {})):
+            drops[name].add((key, oid))
+    for oid in changed:
+        for name, key in index_keys(catalog_record(objects[oid])):
+            adds[name].add((key, oid))
+
+    for name in INDEX_NAMES:
+        drop, add = drops[name] - adds[name], adds[name] - drops[name]
+        if not drop and not add:
+            continue
+        with open(index_paths[name]) as f:
+            data = json.load(f)
+        for key, oid in drop:
+            postings = data.get(key, [])
+            i = bisect.bisect_left(postings, oid)
+            if i < len(postings) and postings[i] == oid:
+                del postings[i]
+            if not postings:
+                data.pop(key, None)
+        for key, oid in add:
+            postings = data.setdefault(key, [])
+            i = bisect.bisect_left(postings, oid)
+            if i == len(postings) or postings[i] != oid:
+                postings.insert(i, oid)
+        groups = write_index(index_paths[name], data)
+        print(f"  {name}.json: {groups} groups (-{len(drop)} +{len(add)} postings)")
+
+    write_related(objects, changed, removed)
+    write_bundles(objects)
+    fields = {k: v for k, v in old_fields.items() if int(k) not in removed}
+    for oid in changed:
+        fields[str(oid)] = index_fields(catalog_record(objects[oid]))
+    save_manifest({"generation": manifest.get("generation", 0) + 1, "hashes": new_hashes, "fields": fields})
     print("Phase 3 complete.")
+    return rejected
+
+
+_PUBLISH_LOCK = threading.Lock()
+
+
+def publish_catalog(objects: dict[int, dict], full_rebuild: bool = False, dead: DeadLetters | None = None):
+    """Build or patch the catalog and indexes; one publish at a time across threads.
+
+    Records left out for failing the schema replace the "catalog" dead letters.
+    """
+    with _PUBLISH_LOCK:
+        if full_rebuild:
+            rejected = build_catalog_and_indexes(objects)
+        else:
+            rejected = update_catalog_and_indexes(objects)
+    if dead is not None:
+        dead.entries["catalog"].clear()
+        for oid, error in rejected.items():
+            dead.record("catalog", oid, "schema")
+            dead.entries["catalog"][oid]["error"] = error
+    return rejected
+
+
+async def catalog_snapshot_loop(objects: dict[int, dict], interval: float):
+    """Publish the catalog every `interval` seconds while the crawl runs.
+
+    The records are copied between awaits, so each snapshot is a consistent
+    view of the crawl, and written from a worker thread so scraping continues.
+    A snapshot is a full incremental publish: catalog, indexes, related lists
+    and bundles, each file replaced atomically. Indexes key on CSV fields
+    only, so they rarely move mid-crawl, but scraped text changes related
+    lists and image URLs change bundles. A failed snapshot is reported and
+    the next one tries again.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        snapshot = {oid: dict(obj) for oid, obj in objects.items()}
+        try:
+            await asyncio.to_thread(publish_catalog, snapshot)
+        except Exception as e:  # the crawl matters more than a snapshot
+            print(f"  catalog snapshot failed ({type(e).__name__}: {e}); retrying in {interval:.0f}s")
 
 
 # ── Main ───────────────────────────────────────────────────────────────────────
 
 
-async def main():
+async def main(full_rebuild: bool = False, retry_failed: bool = False):
     start_time = time.time()
 
     IMAGES_DIR.mkdir(parents=True, exist_ok=True)
@@ -522,14 +1491,40 @@ async def main():
 
     print("Reading Egyptian CSV...")
     objects = read_csv()
-    print(f"Loaded {len(objects)} public-domain Egyptian objects.\n")
+    print(f"Loaded {len(objects)} public-domain Egyptian objects.")
+    restored = load_journal(objects)
+    print(f"Restored {restored} journaled scrape results.\n")
 
     checkpoint = load_checkpoint()
+    dead = DeadLetters()
+    if retry_failed:
+        print(f"Re-queued {dead.requeue_permanent()} permanently failed ids.\n")
 
-    # Order: website scrape (get descriptions + image URLs), then download images
-    checkpoint = await phase1_scrape(objects, checkpoint)
-    checkpoint = await phase2_images(objects, checkpoint)
-    build_catalog_and_indexes(objects)
+    runner = await serve_metrics(METRICS, METRICS_PORT) if METRICS_PORT else None
+    snapshots = asyncio.create_task(
+        snapshot_loop(METRICS, METRICS_SNAPSHOT_PATH, METRICS_SNAPSHOT_INTERVAL)
+    )
+    publisher = (
+        asyncio.create_task(catalog_snapshot_loop(objects, CATALOG_SNAPSHOT_INTERVAL))
+        if CATALOG_SNAPSHOT_INTERVAL else None
+    )
+    try:
+        # Order: website scrape (get descriptions + image URLs), then download images
+        checkpoint = await phase1_scrape(objects, checkpoint, dead)
+        checkpoint = await phase2_images(objects, checkpoint, dead)
+    finally:
+        snapshots.cancel()
+        if publisher:
+            publisher.cancel()
+        if runner:
+            await runner.cleanup()
+        write_snapshot(METRICS, RUN_REPORT_PATH)
+        dead.save()
+        failed = dead.write_report()
+    phase_visual(full_rebuild)
+    publish_catalog(objects, full_rebuild, dead)  # waits for a snapshot still being written
+    dead.save()
+    failed = dead.write_report()
 
     elapsed = time.time() - start_time
     minutes = int(elapsed // 60)
@@ -548,8 +1543,26 @@ async def main():
     print(f"  Descriptions found: {with_desc}")
     print(f"  Inscriptions found: {with_insc}")
     print(f"  Provenance found:   {with_prov}")
+    for phase in DeadLetters.PHASES:
+        f = failed[phase]
+        if f["permanent"] or f["pending_retry"]:
+            causes = ", ".join(f"{c}={n}" for c, n in f["by_cause"].items())
+            print(f"  {phase} failures:    {f['permanent']} permanent ({causes or 'none'}), "
+                  f"{f['pending_retry']} to retry next run")
+    print(f"  Failed ids:         {FAILED_REPORT_PATH.name}")
     print(f"{'='*60}")
+    print(METRICS.report())
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Scrape, download and catalog Egyptian Art objects")
+    parser.add_argument(
+        "--full-rebuild", action="store_true",
+        help="rewrite the catalog and all indexes instead of patching changed objects",
+    )
+    parser.add_argument(
+        "--retry-failed", action="store_true",
+        help="retry ids in the permanently failed report as well",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.full_rebuild, args.retry_failed))
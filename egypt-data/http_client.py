@@ -0,0 +1,81 @@
+"""
+Shared HTTP client for the scraper phases.
+
+Each phase opens one session from open_session(): a connection pool sized to
+the phase's concurrency (and capped per host), kept-alive connections, cached
+DNS lookups, compressed transfer for HTML and a connect/read timeout split set
+once on the session. A TraceConfig counts new vs reused connections, DNS cache
+hits and compressed responses into ScrapeMetrics, so the run report shows how
+much handshake work and transfer the pool saved.
+"""
+
+import aiohttp
+
+from scraper_metrics import ScrapeMetrics
+
+try:
+    import brotli  # noqa: F401  (aiohttp decodes br responses when this is importable)
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+USER_AGENT = "MetMuseumGameAssetBuilder/1.0"
+
+# Advertise only encodings aiohttp can decode here. Images are already
+# compressed, so image sessions ask for them as-is.
+HTML_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+IMAGE_ENCODING = "identity"
+
+KEEPALIVE_TIMEOUT = 30  # seconds an idle pooled connection stays open
+DNS_CACHE_TTL = 600  # seconds a resolved host is cached
+CONNECT_TIMEOUT = 10  # seconds to establish a connection, TLS included
+
+
+def connection_tracer(metrics: ScrapeMetrics, phase: str) -> aiohttp.TraceConfig:
+    """TraceConfig that records connection pool and DNS cache events for `phase`."""
+    trace = aiohttp.TraceConfig()
+
+    def count(event):
+        async def handler(session, ctx, params):
+            metrics.connection(phase, event)
+        return handler
+
+    async def on_request_end(session, ctx, params):
+        if params.response.headers.get("Content-Encoding", "identity") != "identity":
+            metrics.connection(phase, "compressed")
+
+    trace.on_connection_create_end.append(count("new"))
+    trace.on_connection_reuseconn.append(count("reused"))
+    trace.on_dns_cache_hit.append(count("dns_hit"))
+    trace.on_dns_cache_miss.append(count("dns_miss"))
+    trace.on_request_end.append(on_request_end)
+    return trace
+
+
+def open_session(
+    metrics: ScrapeMetrics,
+    phase: str,
+    connections: int,
+    timeout: float,
+    accept_encoding: str = HTML_ENCODING,
+) -> aiohttp.ClientSession:
+    """A session with a pool of `connections` (the phase's concurrency) per host.
+
+    `timeout` bounds each request end to end and each socket read; connecting
+    gets CONNECT_TIMEOUT of it. Use as `async with open_session(...) as session`.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=connections,
+        limit_per_host=connections,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        use_dns_cache=True,
+        ttl_dns_cache=DNS_CACHE_TTL,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(
+            total=timeout, sock_connect=min(CONNECT_TIMEOUT, timeout), sock_read=timeout
+        ),
+        headers={"User-Agent": USER_AGENT, "Accept-Encoding": accept_encoding},
+        trace_configs=[connection_tracer(metrics, phase)],
+    )
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Mock Met Museum server for offline scraper benchmarks.
+
+Serves synthetic object pages in the shape egypt_scraper parses — the
+read-more description wrapper, RSC-escaped "Signatures, Inscriptions, and
+Markings" / "Provenance" tabs and a CRDImages web-large URL — plus JPEG files
+from disk. Latency, 429s, 5xx errors and hung requests (client timeouts) are
+injected at configurable rates.
+
+    python3 mock_met_server.py --port 8799 --latency-ms 80 --rate-429 0.02
+
+Then point the scraper at it:
+    SITE_BASE = IMAGE_BASE = "http://127.0.0.1:8799"
+"""
+
+import argparse
+import asyncio
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+from aiohttp import web
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 50.0  # median per-request latency
+    latency_sigma: float = 0.6  # lognormal shape; 0 gives constant latency
+    image_latency_ms: float = 120.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    rate_timeout: float = 0.0  # fraction of requests that hang for hang_s
+    hang_s: float = 120.0
+    image_bytes: int = 150_000
+    images_dir: Path | None = None  # defaults to a temp dir filled on startup
+    compress_html: bool = True  # gzip/deflate pages when the client accepts it, as the real site does
+    seed: int = 0
+
+
+def object_page(obj_id: int, base_url: str) -> str:
+    """An object page with the markup and RSC payload the scraper extracts from."""
+    description = (
+        f"Object {obj_id} is a limestone relief from the tomb chapel of an official, "
+        "carved in sunk relief and painted. " * 3
+    ).strip()
+    inscription = f"Inscription: hieroglyphic text naming the owner of object {obj_id}"
+    provenance = f"Excavated at Thebes; acquired by the Museum in 19{obj_id % 100:02d}"
+    image = f"{base_url}/CRDImages/eg/web-large/DP{obj_id}.jpg"
+
+    def rsc_tab(title, html):
+        escaped = html.replace("<", "\\u003c").replace(">", "\\u003e")
+        return (
+            f'{{\\"title\\":\\"{title}\\",\\"content\\":{{\\"__html\\":\\"{escaped}\\"}}}}'
+        )
+
+    filler = "<p>" + "Lorem ipsum dolor sit amet. " * 400 + "</p>"
+    return f"""<!DOCTYPE html>
+<html><head>
+<meta property="og:image" content="https://collectionapi.metmuseum.org/api/collection/v1/iiif/{obj_id}/main-image"/>
+<title>Object {obj_id} | The Metropolitan Museum of Art</title>
+</head><body>
+<img src="{image}"/>
+<div class="read-more-wrapper_x1__wrapper_y2"><div><div>{description}</div></div></div>
+{filler}
+<script>self.__next_f.push([1,"{rsc_tab("Signatures, Inscriptions, and Markings", "<p>" + inscription + "</p>")},{rsc_tab("Provenance", provenance + "<br/>")}"])</script>
+</body></html>"""
+
+
+class MockMetServer:
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.requests = 0
+        self.base_url = ""
+        self.images_dir = config.images_dir
+        self._tmp = None
+
+    def _prepare_images(self):
+        if self.images_dir is None:
+            import tempfile
+            self._tmp = tempfile.TemporaryDirectory(prefix="mock_met_images_")
+            self.images_dir = Path(self._tmp.name)
+        self.images_dir.mkdir(parents=True, exist_ok=True)
+        # A handful of distinct files; requests map onto them by id
+        for i in range(8):
+            path = self.images_dir / f"sample_{i}.jpg"
+            if not path.exists():
+                body = bytes(self.rng.getrandbits(8) for _ in range(256))
+                path.write_bytes(b"\xff\xd8\xff\xe0" + body * (self.config.image_bytes // 256))
+
+    async def _delay(self, median_ms: float):
+        cfg = self.config
+        ms = median_ms if cfg.latency_sigma <= 0 else self.rng.lognormvariate(0, cfg.latency_sigma) * median_ms
+        await asyncio.sleep(ms / 1000)
+
+    async def _faults(self):
+        """Return an error response to inject, or None to serve normally."""
+        cfg = self.config
+        r = self.rng.random()
+        if r < cfg.rate_timeout:
+            await asyncio.sleep(cfg.hang_s)
+        elif r < cfg.rate_timeout + cfg.rate_429:
+            return web.Response(status=429)
+        elif r < cfg.rate_timeout + cfg.rate_429 + cfg.rate_5xx:
+            return web.Response(status=503)
+        return None
+
+    async def handle_object(self, request):
+        self.requests += 1
+        await self._delay(self.config.latency_ms)
+        fault = await self._faults()
+        if fault is not None:
+            return fault
+        obj_id = int(request.match_info["obj_id"])
+        resp = web.Response(text=object_page(obj_id, self.base_url), content_type="text/html")
+        if self.config.compress_html:
+            resp.enable_compression()
+        return resp
+
+    async def handle_image(self, request):
+        self.requests += 1
+        await self._delay(self.config.image_latency_ms)
+        fault = await self._faults()
+        if fault is not None:
+            return fault
+        digits = "".join(c for c in request.match_info["filename"] if c.isdigit()) or "0"
+        return web.FileResponse(self.images_dir / f"sample_{int(digits) % 8}.jpg")
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/art/collection/search/{obj_id:\\d+}", self.handle_object)
+        app.router.add_get("/CRDImages/{dept}/web-large/{filename}", self.handle_image)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> web.AppRunner:
+        """Start serving; port 0 picks a free port. Sets and returns self.base_url via runner."""
+        self._prepare_images()
+        runner = web.AppRunner(self.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        bound_port = runner.addresses[0][1]
+        self.base_url = f"http://{host}:{bound_port}"
+        return runner
+
+
+async def _serve_forever(server: MockMetServer, port: int):
+    runner = await server.start(port=port)
+    print(f"Mock Met server at {server.base_url}  (images from {server.images_dir})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Met Museum server")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--latency-ms", type=float, default=MockConfig.latency_ms)
+    parser.add_argument("--latency-sigma", type=float, default=MockConfig.latency_sigma)
+    parser.add_argument("--image-latency-ms", type=float, default=MockConfig.image_latency_ms)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-timeout", type=float, default=0.0)
+    parser.add_argument("--images-dir", type=Path)
+    args = parser.parse_args()
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        image_latency_ms=args.image_latency_ms,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        rate_timeout=args.rate_timeout,
+        images_dir=args.images_dir,
+    )
+    try:
+        asyncio.run(_serve_forever(MockMetServer(config), args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
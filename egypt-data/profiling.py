@@ -0,0 +1,137 @@
+"""Timing and memory spans for dashboard reruns, with optional JSONL trace export.
+
+Usage:
+    start_trace("rerun")
+    with span("load_data"):
+        df = load_data()
+    trace = finish_trace()
+
+Environment:
+    MET_PROFILE_MEMORY=1    also record tracemalloc and RSS deltas per span
+    MET_TRACE_PATH=path     append each finished trace as one JSON line
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+PROFILE_MEMORY = os.environ.get("MET_PROFILE_MEMORY", "") == "1"
+TRACE_PATH = os.environ.get("MET_TRACE_PATH", "")
+
+# Streamlit runs each session's script in its own thread.
+_local = threading.local()
+
+
+def _rss_bytes():
+    """Resident set size of this process in bytes, or None if unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def start_trace(label="rerun"):
+    """Begin a new trace for the current thread, discarding any unfinished one."""
+    if PROFILE_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _local.trace = {
+        "label": label,
+        "started_at": time.time(),
+        "_t0": time.perf_counter(),
+        "spans": [],
+    }
+    _local.depth = 0
+    return _local.trace
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+@contextlib.contextmanager
+def span(name):
+    """Time a block. Nested spans record their depth; a no-op outside a trace."""
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+
+    depth = _local.depth
+    _local.depth += 1
+    mem0 = rss0 = None
+    if PROFILE_MEMORY:
+        if depth == 0:
+            tracemalloc.reset_peak()
+        mem0 = tracemalloc.get_traced_memory()[0]
+        rss0 = _rss_bytes()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        _local.depth -= 1
+        record = {
+            "name": name,
+            "depth": depth,
+            "start_ms": round((t0 - trace["_t0"]) * 1000, 3),
+            "duration_ms": round(elapsed * 1000, 3),
+        }
+        if PROFILE_MEMORY:
+            mem1, peak = tracemalloc.get_traced_memory()
+            rss1 = _rss_bytes()
+            record["mem_delta_bytes"] = mem1 - mem0
+            if depth == 0:
+                record["mem_peak_bytes"] = peak - mem0
+            if rss0 is not None and rss1 is not None:
+                record["rss_delta_bytes"] = rss1 - rss0
+        trace["spans"].append(record)
+
+
+def finish_trace():
+    """Close the current trace, export it if MET_TRACE_PATH is set, and return it."""
+    trace = current_trace()
+    if trace is None:
+        return None
+    _local.trace = None
+    trace["total_ms"] = round((time.perf_counter() - trace.pop("_t0")) * 1000, 3)
+    trace["spans"].sort(key=lambda s: s["start_ms"])
+    if TRACE_PATH:
+        export_jsonl(trace, TRACE_PATH)
+    return trace
+
+
+def export_jsonl(trace, path):
+    """Append one trace as a single JSON line."""
+    with open(path, "a") as f:
+        f.write(json.dumps(trace) + "\n")
+
+
+def summarize(trace):
+    """Aggregate spans by name: [{name, depth, calls, total_ms, share}], slowest first.
+
+    depth is that of the name's first span; rows are not in tree order.
+    """
+    totals = {}
+    for s in trace["spans"]:
+        row = totals.setdefault(s["name"], {
+            "name": s["name"], "depth": s["depth"], "calls": 0, "total_ms": 0.0,
+        })
+        row["calls"] += 1
+        row["total_ms"] += s["duration_ms"]
+        for key in ("mem_delta_bytes", "rss_delta_bytes"):
+            if key in s:
+                row[key] = row.get(key, 0) + s[key]
+    rows = sorted(totals.values(), key=lambda r: r["total_ms"], reverse=True)
+    for row in rows:
+        row["total_ms"] = round(row["total_ms"], 1)
+        row["share"] = row["total_ms"] / trace["total_ms"] if trace["total_ms"] else 0.0
+    return rows
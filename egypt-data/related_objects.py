@@ -0,0 +1,161 @@
+"""
+"More like this" neighbor lists for the catalog.
+
+Each record becomes a sparse TF-IDF row over culture, period, dynasty,
+classification, medium words, tags and description words, weighted per
+field and L2-normalized, so a row product is the cosine similarity. The
+top-k neighbors per object come from blocked sparse products, one dense
+block of similarities at a time. Phase 3 stores the lists in
+index/related.json, so serving them is one dictionary lookup.
+
+update_related() patches existing lists after an incremental build: changed
+objects and objects whose lists mention a changed or removed object are
+recomputed, and changed objects are offered to every other list they now
+beat. Pairs of unchanged objects keep their old scores, so the weights
+drift slightly from a full rebuild until the next --full-rebuild.
+"""
+
+import math
+import re
+
+try:
+    import numpy as np
+    from scipy import sparse
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+TOP_K = 10
+FIELD_WEIGHTS = {
+    "culture": 1.0,
+    "period": 2.0,
+    "dynasty": 2.0,
+    "classification": 1.5,
+    "medium": 1.0,
+    "tag": 1.5,
+    "desc": 0.5,
+}
+MIN_DF = 2  # a token on one object links nothing
+MAX_DF = 0.5  # tokens on more than half the objects ("Egyptian") say little
+BLOCK_CELLS = 1 << 24  # similarities held at once (rows per block x objects)
+
+STOPWORDS = frozenset(
+    "the and with from this that which were was for are its into has have had their there "
+    "also been other these they them than then such some only over under upon about".split()
+)
+WORD = re.compile(r"[a-z]{3,}")
+
+
+def tokens(record: dict) -> list[str]:
+    """Field-prefixed feature tokens of a catalog record; repeats count as term frequency."""
+    out = []
+    for field in ("culture", "period", "dynasty", "classification"):
+        value = (record.get(field) or "").strip().lower()
+        if value:
+            out.append(f"{field}={value}")
+    out += [f"medium:{w}" for w in WORD.findall((record.get("medium") or "").lower()) if w not in STOPWORDS]
+    out += [f"tag={t.strip().lower()}" for t in record.get("tags") or () if t.strip()]
+    out += [f"desc:{w}" for w in WORD.findall((record.get("description") or "").lower())
+            if len(w) > 3 and w not in STOPWORDS]
+    return out
+
+
+def feature_matrix(records: dict[int, dict]) -> tuple[list[int], "sparse.csr_matrix"]:
+    """(object ids, CSR matrix with one L2-normalized TF-IDF row per id)."""
+    ids = sorted(records)
+    vocab, rows, cols = {}, [], []
+    for i, oid in enumerate(ids):
+        for token in tokens(records[oid]):
+            rows.append(i)
+            cols.append(vocab.setdefault(token, len(vocab)))
+    n = len(ids)
+    counts = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(n, len(vocab))
+    )
+    counts.sum_duplicates()
+
+    df = np.bincount(counts.indices, minlength=len(vocab))
+    keep = (df >= MIN_DF) & (df <= max(MIN_DF, MAX_DF * n))
+    weight = np.zeros(len(vocab), dtype=np.float32)
+    for token, j in vocab.items():
+        if keep[j]:
+            field = token.split("=", 1)[0].split(":", 1)[0]
+            weight[j] = FIELD_WEIGHTS[field] * (math.log((1 + n) / (1 + df[j])) + 1)
+
+    X = counts.copy()
+    X.data = (1 + np.log(X.data)) * weight[X.indices]
+    X.eliminate_zeros()
+    norms = np.sqrt(X.multiply(X).sum(axis=1)).A1
+    norms[norms == 0] = 1
+    return ids, sparse.diags(1 / norms).dot(X).tocsr().astype(np.float32)
+
+
+def _similarity_blocks(X, rows):
+    """Yield (row positions, dense similarities of those rows to every object), self excluded."""
+    n = X.shape[0]
+    rows = np.asarray(rows, dtype=np.int64)
+    step = max(1, BLOCK_CELLS // max(n, 1))
+    for start in range(0, len(rows), step):
+        chunk = rows[start:start + step]
+        # sparse x dense block beats sparse x sparse here: the product is mostly nonzero
+        sims = np.ascontiguousarray((X @ X[chunk].T.toarray()).T)
+        sims[np.arange(len(chunk)), chunk] = -1
+        yield chunk, sims
+
+
+def _top(ids, sims, k):
+    """Neighbor lists [[id, score], ...] (best first, positive scores only) per row of sims."""
+    k = min(k, sims.shape[1] - 1)
+    if k <= 0:
+        return [[] for _ in range(len(sims))]
+    best = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(sims, best, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    best, scores = np.take_along_axis(best, order, axis=1), np.take_along_axis(scores, order, axis=1)
+    return [
+        [[ids[j], round(float(s), 4)] for j, s in zip(b, sc) if s > 0]
+        for b, sc in zip(best, scores)
+    ]
+
+
+def build_related(records: dict[int, dict], k: int = TOP_K) -> dict[int, list]:
+    """Top-k neighbor lists for every record."""
+    ids, X = feature_matrix(records)
+    related = {}
+    for chunk, sims in _similarity_blocks(X, range(len(ids))):
+        for i, neighbors in zip(chunk, _top(ids, sims, k)):
+            related[ids[i]] = neighbors
+    return related
+
+
+def update_related(related: dict[int, list], records: dict[int, dict], changed, removed,
+                   k: int = TOP_K) -> int:
+    """Patch `related` in place for changed/added and removed ids; returns lists recomputed."""
+    ids, X = feature_matrix(records)
+    pos = {oid: i for i, oid in enumerate(ids)}
+    changed = {oid for oid in changed if oid in pos}
+    touched = changed | set(removed)
+    for oid in removed:
+        related.pop(oid, None)
+    redo = changed | {oid for oid, nbrs in related.items() if any(n in touched for n, _ in nbrs)}
+    redo |= pos.keys() - related.keys()
+
+    # Score a changed object must beat to enter each list that is kept
+    threshold = np.full(len(ids), np.inf)
+    for oid, nbrs in related.items():
+        if oid not in redo:
+            threshold[pos[oid]] = nbrs[-1][1] if len(nbrs) >= k else 0.0
+
+    for chunk, sims in _similarity_blocks(X, sorted(pos[oid] for oid in redo)):
+        for i, neighbors in zip(chunk, _top(ids, sims, k)):
+            related[ids[i]] = neighbors
+        for r, j in zip(*np.nonzero(sims > threshold)):
+            source = ids[chunk[r]]
+            if source not in changed:
+                continue
+            nbrs = related[ids[j]]
+            nbrs.append([source, round(float(sims[r, j]), 4)])
+            nbrs.sort(key=lambda pair: -pair[1])
+            del nbrs[k:]
+            threshold[j] = nbrs[-1][1] if len(nbrs) >= k else 0.0
+    return len(redo)
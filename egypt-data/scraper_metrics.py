@@ -0,0 +1,282 @@
+"""
+Scraper metrics — request latency histograms, bytes, retries and outcomes.
+
+One ScrapeMetrics instance collects everything for a run. It can be rendered
+as Prometheus text exposition (served over HTTP by serve_metrics), written as
+periodic JSON snapshots (snapshot_loop), and summarised as a final run report.
+"""
+
+import asyncio
+import contextlib
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+# Histogram bucket upper bounds, in seconds.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def status_cause(status: int) -> str:
+    """Classify a non-200 HTTP status into an error-taxonomy cause."""
+    if status == 429:
+        return "http_429"
+    if 500 <= status < 600:
+        return "http_5xx"
+    return f"http_{status}"
+
+
+class ScrapeMetrics:
+    def __init__(self, keep_samples: bool = False):
+        """keep_samples=True also keeps every raw latency, for exact percentiles in benchmarks."""
+        self.started_at = time.time()
+        self.samples: dict[tuple, list[float]] | None = {} if keep_samples else None
+        # (phase, host) -> [per-bucket counts..., +Inf count]
+        self.latency_buckets: dict[tuple, list[int]] = {}
+        self.latency_sum: Counter = Counter()
+        self.latency_count: Counter = Counter()
+        self.bytes: Counter = Counter()  # (phase, host)
+        self.requests: Counter = Counter()  # (phase, host, status)
+        self.retries: Counter = Counter()  # (phase, cause)
+        self.outcomes: Counter = Counter()  # (phase, outcome)
+        self.in_flight: Counter = Counter()  # phase
+        self.queued: Counter = Counter()  # phase
+        self.max_in_flight: Counter = Counter()  # phase
+        self.connections: Counter = Counter()  # (phase, event): new, reused, dns_hit, dns_miss, compressed
+        self.phases: dict[str, dict] = {}
+
+    # ── Recording ──────────────────────────────────────────────────────────────
+
+    def observe_request(self, phase: str, host: str, seconds: float, status, nbytes: int = 0):
+        """Record one HTTP attempt. status is an int or a cause string like 'timeout'."""
+        key = (phase, host)
+        buckets = self.latency_buckets.setdefault(key, [0] * (len(LATENCY_BUCKETS) + 1))
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+                break
+        else:
+            buckets[-1] += 1
+        if self.samples is not None:
+            self.samples.setdefault(key, []).append(seconds)
+        self.latency_sum[key] += seconds
+        self.latency_count[key] += 1
+        self.bytes[key] += nbytes
+        self.requests[(phase, host, str(status))] += 1
+
+    def retry(self, phase: str, cause: str):
+        self.retries[(phase, cause)] += 1
+
+    def connection(self, phase: str, event: str):
+        """Record a connection pool event (see http_client.connection_tracer)."""
+        self.connections[(phase, event)] += 1
+
+    def outcome(self, phase: str, outcome: str):
+        """Record the final result of one object: 'ok' or an error cause."""
+        self.outcomes[(phase, outcome)] += 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self, phase: str, sem: asyncio.Semaphore):
+        """Acquire sem, tracking queue depth while waiting and in-flight while held."""
+        self.queued[phase] += 1
+        waiting = True
+        try:
+            async with sem:
+                self.queued[phase] -= 1
+                waiting = False
+                self.in_flight[phase] += 1
+                self.max_in_flight[phase] = max(self.max_in_flight[phase], self.in_flight[phase])
+                try:
+                    yield
+                finally:
+                    self.in_flight[phase] -= 1
+        finally:
+            if waiting:
+                self.queued[phase] -= 1
+
+    def phase_started(self, phase: str, total: int):
+        self.phases[phase] = {"total": total, "started_at": time.time(), "finished_at": None}
+
+    def phase_finished(self, phase: str):
+        if phase in self.phases:
+            self.phases[phase]["finished_at"] = time.time()
+
+    # ── Views ──────────────────────────────────────────────────────────────────
+
+    def _phase_stats(self, phase: str) -> dict:
+        info = self.phases.get(phase, {})
+        start = info.get("started_at") or self.started_at
+        elapsed = max((info.get("finished_at") or time.time()) - start, 1e-9)
+        done = sum(n for (p, _), n in self.outcomes.items() if p == phase)
+        ok = self.outcomes[(phase, "ok")]
+        nbytes = sum(n for (p, _), n in self.bytes.items() if p == phase)
+        return {
+            "total": info.get("total"),
+            "done": done,
+            "ok": ok,
+            "elapsed_s": round(elapsed, 2),
+            "objects_per_s": round(done / elapsed, 2),
+            "bytes": nbytes,
+            "bytes_per_s": round(nbytes / elapsed, 1),
+            "in_flight": self.in_flight[phase],
+            "max_in_flight": self.max_in_flight[phase],
+            "queue_depth": self.queued[phase],
+        }
+
+    def _connection_stats(self, phase: str) -> dict:
+        stats = {event: n for (p, event), n in self.connections.items() if p == phase}
+        opened = stats.get("new", 0) + stats.get("reused", 0)
+        stats["reuse_ratio"] = round(stats.get("reused", 0) / opened, 3) if opened else None
+        return stats
+
+    def latency_quantile(self, phase: str, host: str, q: float):
+        """Estimate a latency quantile (seconds) from histogram bucket bounds."""
+        buckets = self.latency_buckets.get((phase, host))
+        if not buckets:
+            return None
+        target = q * sum(buckets)
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), buckets):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> dict:
+        hosts = {}
+        for (phase, host), buckets in self.latency_buckets.items():
+            count = self.latency_count[(phase, host)]
+            hosts[f"{phase}:{host}"] = {
+                "requests": count,
+                "mean_s": round(self.latency_sum[(phase, host)] / count, 4) if count else None,
+                "p50_s": self.latency_quantile(phase, host, 0.5),
+                "p95_s": self.latency_quantile(phase, host, 0.95),
+                "p99_s": self.latency_quantile(phase, host, 0.99),
+                "bytes": self.bytes[(phase, host)],
+                "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], buckets)),
+            }
+        return {
+            "timestamp": time.time(),
+            "uptime_s": round(time.time() - self.started_at, 2),
+            "phases": {p: self._phase_stats(p) for p in self.phases},
+            "hosts": hosts,
+            "requests": {"|".join(k): n for k, n in sorted(self.requests.items())},
+            "retries": {"|".join(k): n for k, n in sorted(self.retries.items())},
+            "outcomes": {"|".join(k): n for k, n in sorted(self.outcomes.items())},
+            "connections": {p: self._connection_stats(p) for p in sorted({p for p, _ in self.connections})},
+        }
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        lines = []
+
+        def emit(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_str}}} {value}")
+
+        hist = []
+        for (phase, host), buckets in sorted(self.latency_buckets.items()):
+            labels = {"phase": phase, "host": host}
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                cumulative += n
+                hist.append(({**labels, "le": bound}, cumulative))
+        lines.append("# HELP scraper_request_duration_seconds HTTP request latency")
+        lines.append("# TYPE scraper_request_duration_seconds histogram")
+        for labels, value in hist:
+            label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            lines.append(f"scraper_request_duration_seconds_bucket{{{label_str}}} {value}")
+        for (phase, host), total in sorted(self.latency_sum.items()):
+            label_str = f'phase="{phase}",host="{host}"'
+            lines.append(f"scraper_request_duration_seconds_sum{{{label_str}}} {total:.6f}")
+            lines.append(
+                f"scraper_request_duration_seconds_count{{{label_str}}} "
+                f"{self.latency_count[(phase, host)]}"
+            )
+
+        emit("scraper_response_bytes_total", "counter", "Response body bytes received",
+             [({"phase": p, "host": h}, n) for (p, h), n in sorted(self.bytes.items())])
+        emit("scraper_requests_total", "counter", "HTTP attempts by status or error cause",
+             [({"phase": p, "host": h, "status": s}, n) for (p, h, s), n in sorted(self.requests.items())])
+        emit("scraper_retries_total", "counter", "Retries by cause",
+             [({"phase": p, "cause": c}, n) for (p, c), n in sorted(self.retries.items())])
+        emit("scraper_outcomes_total", "counter", "Final per-object outcomes",
+             [({"phase": p, "outcome": o}, n) for (p, o), n in sorted(self.outcomes.items())])
+        emit("scraper_connections_total", "counter", "Connection pool and DNS cache events",
+             [({"phase": p, "event": e}, n) for (p, e), n in sorted(self.connections.items())])
+        emit("scraper_in_flight", "gauge", "Requests currently holding a concurrency slot",
+             [({"phase": p}, self.in_flight[p]) for p in sorted(self.phases)])
+        emit("scraper_queue_depth", "gauge", "Requests waiting for a concurrency slot",
+             [({"phase": p}, self.queued[p]) for p in sorted(self.phases)])
+        return "\n".join(lines) + "\n"
+
+    def report(self) -> str:
+        """Human-readable end-of-run summary."""
+        snap = self.snapshot()
+        out = ["Run report:"]
+        for phase, st in snap["phases"].items():
+            out.append(
+                f"  {phase}: {st['done']} objects ({st['ok']} ok) in {st['elapsed_s']}s "
+                f"| {st['objects_per_s']}/s | {st['bytes_per_s'] / 1e6:.2f} MB/s "
+                f"| max in-flight {st['max_in_flight']}"
+            )
+        for key, h in snap["hosts"].items():
+            out.append(
+                f"  {key}: {h['requests']} requests, mean {h['mean_s']}s, "
+                f"p50<={h['p50_s']}s p95<={h['p95_s']}s p99<={h['p99_s']}s"
+            )
+        for phase, c in snap["connections"].items():
+            reuse = f"{c['reuse_ratio']:.0%}" if c["reuse_ratio"] is not None else "n/a"
+            out.append(
+                f"  {phase} connections: {c.get('new', 0)} new, {c.get('reused', 0)} reused ({reuse}) "
+                f"| dns cache {c.get('dns_hit', 0)} hit/{c.get('dns_miss', 0)} miss "
+                f"| {c.get('compressed', 0)} compressed responses"
+            )
+        if snap["retries"]:
+            out.append("  retries: " + ", ".join(f"{k}={v}" for k, v in snap["retries"].items()))
+        failures = {k: v for k, v in snap["outcomes"].items() if not k.endswith("|ok")}
+        if failures:
+            out.append("  failures: " + ", ".join(f"{k}={v}" for k, v in failures.items()))
+        return "\n".join(out)
+
+
+# ── Exporters ──────────────────────────────────────────────────────────────────
+
+
+async def serve_metrics(metrics: ScrapeMetrics, port: int):
+    """Serve /metrics (Prometheus text) and /metrics.json on localhost:port.
+
+    Returns the aiohttp AppRunner; call `await runner.cleanup()` to stop.
+    """
+    from aiohttp import web
+
+    async def prometheus(request):
+        return web.Response(text=metrics.to_prometheus(), content_type="text/plain")
+
+    async def as_json(request):
+        return web.json_response(metrics.snapshot())
+
+    app = web.Application()
+    app.router.add_get("/metrics", prometheus)
+    app.router.add_get("/metrics.json", as_json)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def snapshot_loop(metrics: ScrapeMetrics, path: Path, interval: float):
+    """Rewrite a JSON snapshot every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        write_snapshot(metrics, path)
+
+
+def write_snapshot(metrics: ScrapeMetrics, path: Path):
+    tmp = Path(path).with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(metrics.snapshot(), f, indent=2)
+    tmp.replace(path)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Synthetic Met collection generator.
+
+Produces CSVs in the MetObjects.csv schema (the dashboard's USE_COLUMNS) with
+cardinalities, skew and null rates modelled on the real Open Access export, so
+data_utils can be benchmarked reproducibly without the 300 MB original.
+
+    python3 synthetic_data.py 100k synthetic_100k.csv
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from data_utils import USE_COLUMNS
+
+# The export also carries Link Resource; load_data skips it and derives URLs from Object ID.
+CSV_COLUMNS = USE_COLUMNS + ["Link Resource"]
+
+# Met departments with their approximate share of the collection.
+DEPARTMENTS = {
+    "Drawings and Prints": 0.37,
+    "European Sculpture and Decorative Arts": 0.11,
+    "Asian Art": 0.10,
+    "Photographs": 0.08,
+    "Costume Institute": 0.07,
+    "Egyptian Art": 0.07,
+    "Greek and Roman Art": 0.06,
+    "The American Wing": 0.04,
+    "Islamic Art": 0.03,
+    "Arms and Armor": 0.02,
+    "Medieval Art": 0.02,
+    "Modern and Contemporary Art": 0.02,
+    "Musical Instruments": 0.01,
+    "Arts of Africa, Oceania, and the Americas": 0.01,
+    "Ancient Near Eastern Art": 0.005,
+    "European Paintings": 0.005,
+    "The Cloisters": 0.005,
+    "Robert Lehman Collection": 0.003,
+    "The Libraries": 0.002,
+}
+
+# Column → (distinct values, null rate). Values are Zipf-distributed.
+CARDINALITY = {
+    "Object Name": (28_000, 0.005),
+    "Title": (240_000, 0.06),
+    "Culture": (7_200, 0.57),
+    "Period": (1_900, 0.81),
+    "Dynasty": (350, 0.95),
+    "Reign": (370, 0.98),
+    "Artist Display Name": (60_000, 0.42),
+    "Artist Display Bio": (45_000, 0.48),
+    "Medium": (40_000, 0.01),
+    "Classification": (1_200, 0.15),
+    "Country": (1_000, 0.85),
+    "City": (2_800, 0.93),
+    "State": (350, 0.99),
+    "Tags": (2_500, 0.60),
+    "Gallery Number": (800, 0.95),
+}
+
+NATIONALITIES = ["American", "French", "British", "Italian", "German", "Japanese",
+                 "Dutch", "Spanish", "Flemish", "Chinese", "Austrian", "Swiss"]
+MATERIALS = ["Bronze", "Oil on canvas", "Terracotta", "Silk", "Limestone", "Glass",
+             "Porcelain", "Albumen silver print", "Etching", "Wood", "Gold", "Faience"]
+TAG_WORDS = ["Men", "Women", "Animals", "Portraits", "Flowers", "Landscapes", "Boats",
+             "Birds", "Horses", "Gods", "Kings", "Hieroglyphs", "Buildings", "Dogs"]
+
+SIZES = {"10k": 10_000, "100k": 100_000, "375k": 375_000, "1m": 1_000_000, "5m": 5_000_000}
+
+
+def _zipf_choice(rng, vocab, n, s=1.1):
+    weights = 1.0 / np.arange(1, len(vocab) + 1) ** s
+    return rng.choice(vocab, size=n, p=weights / weights.sum())
+
+
+def _with_nulls(rng, values, null_rate):
+    values = pd.Series(values, dtype="object")
+    values[rng.random(len(values)) < null_rate] = None
+    return values
+
+
+def _vocab(prefix, n, words):
+    """n distinct strings built from real-looking words plus a disambiguating number."""
+    base = np.array(words, dtype=object)
+    return np.array([f"{base[i % len(base)]} {prefix}{i}" if i >= len(base) else base[i]
+                     for i in range(n)], dtype=object)
+
+
+def generate_collection(n: int, seed: int = 0) -> pd.DataFrame:
+    """Return an n-row DataFrame with the MetObjects.csv columns used by the dashboard."""
+    rng = np.random.default_rng(seed)
+    cols = {}
+
+    cols["Object ID"] = rng.permutation(np.arange(1, n + 1) * 3)
+    cols["Is Highlight"] = rng.random(n) < 0.005
+    cols["Is Public Domain"] = rng.random(n) < 0.53
+
+    depts = list(DEPARTMENTS)
+    p = np.array(list(DEPARTMENTS.values()))
+    cols["Department"] = rng.choice(depts, size=n, p=p / p.sum())
+
+    # Accession years: mostly plain years, some ISO dates, some missing
+    acc = rng.integers(1870, 2024, n).astype(str).astype(object)
+    iso = rng.random(n) < 0.08
+    acc[iso] = [f"{y}-02-15" for y in acc[iso]]
+    cols["AccessionYear"] = _with_nulls(rng, acc, 0.01)
+
+    # Object dates: a BCE tail (Egyptian / Near Eastern), a CE bulk skewed to 1700-1950
+    bce = rng.random(n) < 0.12
+    begin = np.where(
+        bce,
+        -rng.integers(1, 5000, n),
+        np.clip(rng.normal(1800, 180, n), 1, 2023).astype(int),
+    )
+    undated = rng.random(n) < 0.06
+    begin[undated] = 0
+    span = rng.integers(0, 150, n)
+    cols["Object Begin Date"] = begin
+    cols["Object End Date"] = np.where(undated, 0, begin + span)
+    cols["Object Date"] = [
+        f"ca. {-b} BCE" if b < 0 else (f"ca. {b}" if b else "") for b in begin
+    ]
+
+    words = {
+        "Object Name": ["Print", "Photograph", "Drawing", "Vase", "Figure", "Textile", "Coin"],
+        "Title": ["Untitled", "Portrait of a Man", "Landscape", "Head of a King", "Bowl"],
+        "Culture": ["Egyptian", "American", "French", "Japanese", "Chinese", "Greek"],
+        "Period": ["New Kingdom", "Edo period (1615–1868)", "Middle Kingdom", "Qing dynasty"],
+        "Dynasty": ["Dynasty 18", "Dynasty 12", "Dynasty 26", "Dynasty 19"],
+        "Reign": ["reign of Amenhotep III", "reign of Ramesses II", "reign of Thutmose III"],
+        "Artist Display Name": ["Edgar Degas", "Union Porcelain Works", "Louis C. Tiffany"],
+        "Artist Display Bio": ["French, Paris 1834–1917 Paris", "American, 1862–1922"],
+        "Medium": MATERIALS,
+        "Classification": ["Prints", "Photographs", "Drawings", "Ceramics", "Textiles"],
+        "Country": ["Egypt", "Iran", "United States", "Peru", "Mexico"],
+        "City": ["Paris", "London", "New York", "Thebes", "Kyoto"],
+        "State": ["New York", "Massachusetts", "Pennsylvania"],
+        "Gallery Number": ["100", "131", "774", "822", "599"],
+    }
+    for col, (distinct, null_rate) in CARDINALITY.items():
+        if col == "Tags":
+            continue
+        vocab = _vocab(col.split()[0][:3].upper(), distinct, words[col])
+        cols[col] = _with_nulls(rng, _zipf_choice(rng, vocab, n), null_rate)
+
+    # Multi-artist rows are pipe-joined, like the real export
+    multi = (rng.random(n) < 0.07) & cols["Artist Display Name"].notna().to_numpy()
+    second = _zipf_choice(rng, _vocab("ART", 2_000, words["Artist Display Name"]), int(multi.sum()))
+    artists = cols["Artist Display Name"].copy()
+    artists[multi] = [f"{a}|{b}" for a, b in zip(artists[multi], second)]
+    cols["Artist Display Name"] = artists
+
+    # Constituent IDs and life dates follow each artist, pipe-joined alongside the names
+    vocab = _vocab("ART", CARDINALITY["Artist Display Name"][0], words["Artist Display Name"])
+    born = rng.integers(1400, 1990, len(vocab))
+    died = born + rng.integers(25, 95, len(vocab))
+    index = {name: i for i, name in enumerate(vocab)}
+
+    def per_artist(values):
+        return pd.Series([
+            "|".join(str(values[index[part]]) for part in a.split("|")) if isinstance(a, str) else None
+            for a in artists
+        ], dtype="object")
+
+    cols["Constituent ID"] = per_artist(100_000 + np.arange(len(vocab)))
+    cols["Artist Begin Date"] = per_artist(born)
+    cols["Artist End Date"] = per_artist(died)
+
+    # Some rows spell the artist differently, some lack the ID, as in the real export
+    has_artist = artists.notna().to_numpy()
+    variant = has_artist & (rng.random(n) < 0.03)
+    artists[variant] = [a.lower() for a in artists[variant]]
+    cols["Constituent ID"][has_artist & (rng.random(n) < 0.02)] = None
+    nat = _zipf_choice(rng, np.array(NATIONALITIES, dtype=object), n)
+    nat = pd.Series(nat, dtype="object")
+    nat[~has_artist | (rng.random(n) < 0.2)] = None
+    second_nat = rng.choice(NATIONALITIES, size=int(multi.sum()))
+    nat[multi] = [f"{a}|{b}" for a, b in zip(nat[multi].fillna(""), second_nat)]
+    cols["Artist Nationality"] = nat
+
+    gender = pd.Series([None] * n, dtype="object")
+    g = rng.random(n)
+    gender[has_artist & (g < 0.08)] = "Female"
+    gender[multi & (g < 0.5)] = "|"
+    gender[multi & (g < 0.05)] = "Female|"
+    cols["Artist Gender"] = gender
+
+    tag_vocab = _vocab("TAG", CARDINALITY["Tags"][0], TAG_WORDS)
+    k = rng.integers(1, 4, n)
+    flat = _zipf_choice(rng, tag_vocab, int(k.sum()))
+    bounds = np.concatenate([[0], np.cumsum(k)])
+    tags = ["|".join(dict.fromkeys(flat[bounds[i]:bounds[i + 1]])) for i in range(n)]
+    cols["Tags"] = _with_nulls(rng, tags, CARDINALITY["Tags"][1])
+
+    cols["Link Resource"] = [
+        f"http://www.metmuseum.org/art/collection/search/{i}" for i in cols["Object ID"]
+    ]
+
+    return pd.DataFrame(cols)[CSV_COLUMNS]
+
+
+def write_csv(path, n: int, seed: int = 0, chunk: int = 500_000):
+    """Write an n-row synthetic CSV in chunks so 5M rows fit in modest memory."""
+    for i, start in enumerate(range(0, n, chunk)):
+        df = generate_collection(min(chunk, n - start), seed=seed + i)
+        df["Object ID"] = df["Object ID"] + start * 3
+        df["Link Resource"] = [
+            f"http://www.metmuseum.org/art/collection/search/{oid}" for oid in df["Object ID"]
+        ]
+        df.to_csv(path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1].lower() not in SIZES:
+        print(f"usage: {sys.argv[0]} {{{','.join(SIZES)}}} OUT.csv")
+        sys.exit(1)
+    write_csv(sys.argv[2], SIZES[sys.argv[1].lower()])
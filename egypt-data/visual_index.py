@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Visual descriptors and a nearest-neighbor index over the downloaded images.
+
+describe() turns one JPEG into a compact descriptor: a 72-bin HSV color
+histogram, an 8-bin gradient orientation histogram with edge density and
+contrast for texture, and a 64-bit dHash for near-duplicate checks.
+update_index() runs it in a process pool over images/ and stores the results
+in index/visual.npz. Images whose size and mtime have not changed keep their
+stored descriptors, so a run only decodes new or replaced files.
+
+VisualIndex answers "visually similar" queries by brute force, one
+matrix-vector product over every descriptor. With ivf=True it instead probes
+the nearest k-means cells and re-ranks their members exactly.
+
+    python3 visual_index.py update
+    python3 visual_index.py similar 544320 --k 5 --ivf
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+BASE_DIR = Path(__file__).parent
+IMAGES_DIR = BASE_DIR / "images"
+INDEX_PATH = BASE_DIR / "index" / "visual.npz"
+
+THUMB_SIZE = 64  # descriptors are computed on a THUMB_SIZE x THUMB_SIZE thumbnail
+HUE_BINS, SAT_BINS, VAL_BINS = 8, 3, 3
+ORIENT_BINS = 8
+EDGE_THRESHOLD = 0.1  # gradient magnitude counted as an edge (gray levels in [0, 1])
+TEXTURE_WEIGHT = 0.5  # share of the descriptor norm given to texture vs color
+DIM = HUE_BINS * SAT_BINS * VAL_BINS + ORIENT_BINS + 2
+
+IVF_MIN_OBJECTS = 2000  # below this, brute force is as fast as probing cells
+IVF_NPROBE = 4
+KMEANS_ITERATIONS = 10
+DUPLICATE_DISTANCE = 6  # dHash bits that may differ between near-duplicates
+
+
+# ── Descriptors ────────────────────────────────────────────────────────────────
+
+
+def describe(path: str | Path) -> tuple["np.ndarray", int] | None:
+    """(unit-norm float32 descriptor of length DIM, 64-bit dHash) for an image, or None if unreadable."""
+    try:
+        with Image.open(path) as im:
+            im.draft("RGB", (THUMB_SIZE * 2, THUMB_SIZE * 2))  # let the JPEG decoder downscale
+            rgb = im.convert("RGB")
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    thumb = rgb.resize((THUMB_SIZE, THUMB_SIZE), Image.BILINEAR)
+
+    hsv = np.asarray(thumb.convert("HSV"), dtype=np.int32)
+    h, s, v = (hsv[..., 0] * HUE_BINS) >> 8, (hsv[..., 1] * SAT_BINS) >> 8, (hsv[..., 2] * VAL_BINS) >> 8
+    color = np.bincount(((h * SAT_BINS + s) * VAL_BINS + v).ravel(), minlength=DIM - ORIENT_BINS - 2)
+    color = np.sqrt(color / color.sum())  # Hellinger mapping: unit norm, dot product = Bhattacharyya
+
+    gray = np.asarray(thumb.convert("L"), dtype=np.float32) / 255
+    gx, gy = np.diff(gray, axis=1)[:-1], np.diff(gray, axis=0)[:, :-1]
+    magnitude = np.hypot(gx, gy)
+    angle = np.minimum((np.arctan2(gy, gx) % np.pi) * (ORIENT_BINS / np.pi), ORIENT_BINS - 1).astype(np.int64)
+    orient = np.bincount(angle.ravel(), weights=magnitude.ravel(), minlength=ORIENT_BINS)
+    orient = np.sqrt(orient / (orient.sum() or 1))
+    texture = np.concatenate([orient, [(magnitude > EDGE_THRESHOLD).mean(), min(1.0, 2 * gray.std())]])
+    texture /= np.linalg.norm(texture) or 1
+
+    vector = np.concatenate([(1 - TEXTURE_WEIGHT) * color, TEXTURE_WEIGHT * texture]).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+
+    small = np.asarray(rgb.convert("L").resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    dhash = int.from_bytes(np.packbits(small[:, 1:] > small[:, :-1]).tobytes(), "big")
+    return vector, dhash
+
+
+def _stamp(path: Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_size, st.st_mtime_ns
+
+
+# ── Index ──────────────────────────────────────────────────────────────────────
+
+
+def _kmeans(vectors: "np.ndarray", k: int, seed: int = 0) -> "np.ndarray":
+    """Spherical k-means centroids (unit rows) of unit-norm vectors."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)]
+    for _ in range(KMEANS_ITERATIONS):
+        cells = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, cells, vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = np.where(norms > 0, sums / np.where(norms > 0, norms, 1), centroids)
+    return centroids.astype(np.float32)
+
+
+def update_index(images_dir: Path = IMAGES_DIR, path: Path = INDEX_PATH,
+                 workers: int | None = None, full: bool = False) -> dict:
+    """Bring the index at `path` up to date with the JPEGs in `images_dir`; returns counts."""
+    files = {int(p.stem): p for p in Path(images_dir).glob("*.jpg") if p.stem.isdigit()}
+    stamps = {oid: _stamp(p) for oid, p in files.items()}
+
+    kept, removed = {}, 0
+    old_centroids, old_trained = np.zeros((0, DIM), np.float32), 0
+    if path.exists() and not full:
+        with np.load(path) as data:
+            old = {name: data[name] for name in data.files}
+        for i, (oid, stamp) in enumerate(zip(old["ids"].tolist(), old["stamps"].tolist())):
+            if stamps.get(oid) == tuple(stamp):
+                kept[oid] = (old["vectors"][i], int(old["dhash"][i]), bool(old["valid"][i]))
+            removed += oid not in files
+        old_centroids, old_trained = old["centroids"], int(old["trained_on"])
+
+    todo = sorted(files.keys() - kept.keys())
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            results = pool.map(describe, [files[oid] for oid in todo], chunksize=32)
+            for oid, result in zip(todo, results):
+                kept[oid] = (result[0], result[1], True) if result else (np.zeros(DIM, np.float32), 0, False)
+
+    ids = np.array(sorted(kept), dtype=np.int64)
+    vectors = np.array([kept[oid][0] for oid in ids.tolist()], dtype=np.float32).reshape(len(ids), DIM)
+    dhash = np.array([kept[oid][1] for oid in ids.tolist()], dtype=np.uint64)
+    valid = np.array([kept[oid][2] for oid in ids.tolist()], dtype=bool)
+
+    # Coarse quantizer for IVF: retrained when the collection has doubled since the last training
+    n_valid = int(valid.sum())
+    centroids, trained_on = old_centroids, old_trained
+    if n_valid >= IVF_MIN_OBJECTS and (len(centroids) == 0 or n_valid > 2 * trained_on):
+        centroids, trained_on = _kmeans(vectors[valid], int(np.sqrt(n_valid))), n_valid
+    elif n_valid < IVF_MIN_OBJECTS:
+        centroids, trained_on = np.zeros((0, DIM), np.float32), 0
+    cells = (np.argmax(vectors @ centroids.T, axis=1) if len(centroids) else np.zeros(len(ids))).astype(np.int32)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.savez(
+            f, ids=ids, vectors=vectors, dhash=dhash, valid=valid,
+            stamps=np.array([stamps[oid] for oid in ids.tolist()], dtype=np.int64).reshape(len(ids), 2),
+            centroids=centroids, cells=cells, trained_on=np.int64(trained_on),
+        )
+    tmp.replace(path)
+    return {"objects": len(ids), "described": len(todo), "unreadable": len(ids) - n_valid,
+            "removed": removed, "ivf_cells": len(centroids)}
+
+
+class VisualIndex:
+    """Read-only view of index/visual.npz for similarity and near-duplicate queries."""
+
+    def __init__(self, path: Path = INDEX_PATH):
+        with np.load(path) as data:
+            self.ids = data["ids"]
+            self.vectors = data["vectors"]
+            self.dhash = data["dhash"]
+            self.valid = data["valid"]
+            self.centroids = data["centroids"]
+            cells = data["cells"]
+        self.pos = {oid: i for i, oid in enumerate(self.ids.tolist())}
+        # Rows of each IVF cell: self.cell_rows[self.cell_bounds[c]:self.cell_bounds[c + 1]]
+        self.cell_rows = np.argsort(cells, kind="stable")
+        self.cell_bounds = np.searchsorted(cells[self.cell_rows], np.arange(len(self.centroids) + 1))
+
+    def __len__(self):
+        return int(self.valid.sum())
+
+    def _candidates(self, query, ivf, nprobe):
+        if not ivf or len(self.centroids) == 0:
+            return np.flatnonzero(self.valid)
+        probe = np.argsort(-(self.centroids @ query))[:nprobe]
+        rows = np.concatenate([self.cell_rows[self.cell_bounds[c]:self.cell_bounds[c + 1]] for c in probe])
+        return rows[self.valid[rows]]
+
+    def similar(self, object_id: int, k: int = 10, ivf: bool = False,
+                nprobe: int = IVF_NPROBE) -> list[tuple[int, float]]:
+        """Up to k (object id, cosine similarity) pairs, most similar first; [] if not indexed."""
+        i = self.pos.get(object_id)
+        if i is None or not self.valid[i]:
+            return []
+        query = self.vectors[i]
+        rows = self._candidates(query, ivf, nprobe)
+        rows = rows[rows != i]
+        scores = self.vectors[rows] @ query
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(int(self.ids[r]), round(float(s), 4)) for r, s in zip(rows[order], scores[order])]
+
+    def duplicates(self, object_id: int, max_distance: int = DUPLICATE_DISTANCE) -> list[tuple[int, int]]:
+        """(object id, dHash Hamming distance) of images that look like near-copies, closest first."""
+        i = self.pos.get(object_id)
+        if i is None or not self.valid[i]:
+            return []
+        distance = np.bitwise_count(self.dhash ^ self.dhash[i])
+        rows = np.flatnonzero((distance <= max_distance) & self.valid)
+        rows = rows[rows != i]
+        rows = rows[np.argsort(distance[rows], kind="stable")]
+        return [(int(self.ids[r]), int(distance[r])) for r in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("update")
+    p.add_argument("--full", action="store_true", help="describe every image again")
+    p.add_argument("--workers", type=int)
+    p = sub.add_parser("similar")
+    p.add_argument("object_id", type=int)
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--ivf", action="store_true")
+    args = parser.parse_args()
+
+    if not HAS_PIL:
+        parser.exit(1, "visual_index needs numpy and Pillow (pip install pillow)\n")
+    if args.command == "update":
+        print(update_index(workers=args.workers, full=args.full))
+        return
+    index = VisualIndex()
+    for oid, score in index.similar(args.object_id, args.k, ivf=args.ivf):
+        print(f"  {oid:>8}  {score:.4f}")
+    for oid, distance in index.duplicates(args.object_id):
+        print(f"  {oid:>8}  near-duplicate (dHash distance {distance})")
+
+
+if __name__ == "__main__":
+    main()
@@ -192,15 +192,23 @@ Return JSON: { "match": true/false, "confidence": "high"/"medium"/"low", "reason
 
 // ── Catalog search endpoint (lightweight server-side search) ─────────────────
 let catalog = null;
+let catalogById = new Map();
+let catalogMtime = 0;
 
+// The scraper republishes the catalog every few minutes during a crawl, so
+// reload whenever the file has been replaced.
 function loadCatalog() {
-  if (catalog) return catalog;
   const catalogPath = path.join(__dirname, '..', 'egypt-data', 'catalog_egyptian.json');
-  if (fs.existsSync(catalogPath)) {
+  const mtime = fs.existsSync(catalogPath) ? fs.statSync(catalogPath).mtimeMs : 0;
+  if (catalog && mtime === catalogMtime) return catalog;
+  if (mtime) {
     catalog = JSON.parse(fs.readFileSync(catalogPath, 'utf8'));
+    catalogById = new Map(catalog.map(o => [String(o.object_id), o]));
+    catalogMtime = mtime;
     console.log(`Catalog loaded: ${catalog.length} objects`);
   } else {
     catalog = [];
+    catalogById = new Map();
     console.warn('Catalog not found at', catalogPath);
   }
   return catalog;
@@ -245,8 +253,8 @@ app.get('/api/catalog/search', (req, res) => {
 });
 
 app.get('/api/catalog/:id', (req, res) => {
-  const data = loadCatalog();
-  const obj = data.find(o => String(o.object_id) === req.params.id);
+  loadCatalog();
+  const obj = catalogById.get(req.params.id);
   if (obj) {
     res.json(obj);
   } else {
@@ -254,11 +262,113 @@ app.get('/api/catalog/:id', (req, res) => {
   }
 });
 
+// ── Precompressed per-gallery / per-department bundles ───────────────────────
+// Phase 3 of the scraper writes egypt-data/bundles/<kind>/<slug>.json (+ .gz,
+// .br) with slim list-view records, objects with images first.
+const BUNDLE_DIR = path.join(__dirname, '..', 'egypt-data', 'bundles');
+const BUNDLE_MANIFEST = path.join(BUNDLE_DIR, 'manifest.json');
+const BUNDLE_KINDS = new Set(['gallery', 'department']);
+const BUNDLE_ENCODINGS = [['br', '.br'], ['gzip', '.gz']];
+const bundleCache = new Map();
+let bundleNames = new Map();
+let bundleManifestMtime = 0;
+
+// File of a bundle by key ("Egyptian Art") or by name ("egyptian-art"), or
+// null. Names come from the manifest: keys whose slugs collide get a suffix.
+function bundleFile(kind, key) {
+  if (!BUNDLE_KINDS.has(kind)) return null;
+  const mtime = fs.existsSync(BUNDLE_MANIFEST) ? fs.statSync(BUNDLE_MANIFEST).mtimeMs : 0;
+  if (mtime !== bundleManifestMtime) {
+    const bundles = mtime ? JSON.parse(fs.readFileSync(BUNDLE_MANIFEST, 'utf8')).bundles : {};
+    bundleNames = new Map();
+    for (const [name, entry] of Object.entries(bundles)) {
+      bundleNames.set(name, name);
+      if (entry.key !== undefined) bundleNames.set(`${name.split('/')[0]}/${entry.key}`, name);
+    }
+    bundleManifestMtime = mtime;
+  }
+  const name = bundleNames.get(`${kind}/${key}`);
+  const file = name && path.join(BUNDLE_DIR, `${name}.json`);
+  return file && fs.existsSync(file) ? file : null;
+}
+
+function loadBundle(kind, key) {
+  const file = bundleFile(kind, key);
+  if (!file) return null;
+  const mtime = fs.statSync(file).mtimeMs;
+  const cached = bundleCache.get(file);
+  if (cached && cached.mtime === mtime) return cached.bundle;
+  const bundle = JSON.parse(fs.readFileSync(file, 'utf8'));
+  bundleCache.set(file, { mtime, bundle });
+  return bundle;
+}
+
+// k distinct indices from [0, n) — partial Fisher-Yates, O(k)
+function sampleIndices(n, k) {
+  const swapped = new Map();
+  const picks = [];
+  for (let i = 0; i < Math.min(n, k); i++) {
+    const j = i + Math.floor(Math.random() * (n - i));
+    picks.push(swapped.has(j) ? swapped.get(j) : j);
+    swapped.set(j, swapped.has(i) ? swapped.get(i) : i);
+  }
+  return picks;
+}
+
+app.get('/api/bundles/:kind/:key', (req, res) => {
+  const { kind, key } = req.params;
+  const file = bundleFile(kind, key);
+  if (!file) {
+    return res.status(404).json({ error: 'Bundle not found' });
+  }
+  res.vary('Accept-Encoding');
+  res.type('json');
+  for (const [encoding, suffix] of BUNDLE_ENCODINGS) {
+    if (req.acceptsEncodings(encoding) && fs.existsSync(file + suffix)) {
+      res.set('Content-Encoding', encoding);
+      return res.sendFile(file + suffix);
+    }
+  }
+  res.sendFile(file);
+});
+
+// ── Related objects ("more like this") ───────────────────────────────────────
+// index/related.json is precomputed by the scraper: object id -> [[id, score], ...]
+const RELATED_PATH = path.join(__dirname, '..', 'egypt-data', 'index', 'related.json');
+let related = {};
+let relatedMtime = 0;
+
+function loadRelated() {
+  const mtime = fs.existsSync(RELATED_PATH) ? fs.statSync(RELATED_PATH).mtimeMs : 0;
+  if (mtime !== relatedMtime) {
+    related = mtime ? JSON.parse(fs.readFileSync(RELATED_PATH, 'utf8')) : {};
+    relatedMtime = mtime;
+  }
+  return related;
+}
+
+app.get('/api/catalog/:id/related', (req, res) => {
+  loadCatalog();
+  const limit = parseInt(req.query.limit || '10');
+  const neighbors = (loadRelated()[req.params.id] || []).slice(0, limit);
+  res.json(neighbors
+    .filter(([id]) => catalogById.has(String(id)))
+    .map(([id, score]) => ({ ...catalogById.get(String(id)), similarity: score })));
+});
+
 // ── Catalog random artifacts for a gallery ───────────────────────────────────
 app.get('/api/catalog/gallery/:num/random', (req, res) => {
-  const data = loadCatalog();
   const gallery = req.params.num;
   const count = parseInt(req.query.count || '5');
+  const data = loadCatalog();
+  const bundle = loadBundle('gallery', gallery);
+  if (bundle) {
+    // The bundle only picks the objects; the response carries their full catalog records
+    const picks = sampleIndices(bundle.with_images, count)
+      .map(i => catalogById.get(String(bundle.objects[i].object_id)))
+      .filter(Boolean);
+    return res.json(picks);
+  }
   const inGallery = data.filter(o => o.gallery_number === gallery && o.image_url);
   const shuffled = inGallery.sort(() => Math.random() - 0.5);
   res.json(shuffled.slice(0, count));